@@ -0,0 +1,67 @@
+"""Compare the size and encoding time of sending chart data as part of the spec
+(records JSON as created by Altair) with sending it in the Apache Arrow format.
+
+Run with:
+    python benchmarks/arrow_transport.py --rows 10000 100000 1000000
+"""
+
+import argparse
+import gzip
+import json
+
+import altair as alt
+import pandas as pd
+from common import make_dataframe, timed
+from plotly.io.json import to_json_plotly
+
+import dash_vega_components as dvc
+
+
+def spec_json(df: pd.DataFrame) -> str:
+    chart = alt.Chart(df).mark_point().encode(x="x:Q", y="y:Q", color="category:N")
+    # This is what Dash sends to the browser if a callback returns the spec
+    return to_json_plotly(chart.to_dict())
+
+
+def arrow_json(df: pd.DataFrame) -> str:
+    return to_json_plotly(dvc.arrow_dataset(df))
+
+
+def run(n_rows: int) -> dict:
+    df = make_dataframe(n_rows)
+    json_payload, json_seconds = timed(lambda: spec_json(df))
+    arrow_payload, arrow_seconds = timed(lambda: arrow_json(df))
+    ipc = dvc.to_arrow_ipc(df)
+    return {
+        "rows": n_rows,
+        "spec_json_bytes": len(json_payload),
+        "spec_json_gzip_bytes": len(gzip.compress(json_payload.encode())),
+        "spec_json_seconds": json_seconds,
+        "arrow_base64_bytes": len(arrow_payload),
+        "arrow_base64_gzip_bytes": len(gzip.compress(arrow_payload.encode())),
+        "arrow_ipc_bytes": len(ipc),
+        "arrow_seconds": arrow_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--output", help="Optional path of a JSON file for the results")
+    args = parser.parse_args()
+
+    alt.data_transformers.disable_max_rows()
+    results = [run(n_rows) for n_rows in args.rows]
+    for result in results:
+        print(
+            "{rows:>9} rows | spec JSON {spec_json_bytes:>12,} B ({spec_json_seconds:.3f} s)"
+            " | Arrow base64 {arrow_base64_bytes:>11,} B, raw {arrow_ipc_bytes:>11,} B"
+            " ({arrow_seconds:.3f} s)".format(**result)
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
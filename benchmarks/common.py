@@ -0,0 +1,43 @@
+"""Synthetic datasets and timing helpers which are shared by the benchmarks."""
+
+import time
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+
+def make_dataframe(n_rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    return pd.DataFrame(
+        {
+            "x": rng.normal(size=n_rows),
+            "y": rng.normal(size=n_rows),
+            "count": rng.integers(0, 1000, size=n_rows),
+            "category": pd.Categorical(rng.choice(["a", "b", "c", "d"], size=n_rows)),
+            "date": pd.date_range("2020-01-01", periods=n_rows, freq="s"),
+        }
+    )
+
+
+def make_chart(data, brush: bool = False) -> alt.Chart:
+    """Scatter plot of x and y, optionally with an interval selection named "brush"."""
+    chart = (
+        alt.Chart(data)
+        .mark_point()
+        .encode(x="x:Q", y="y:Q", color="category:N")
+        .properties(width=400, height=300)
+    )
+    if brush:
+        chart = chart.add_params(alt.selection_interval(name="brush"))
+    return chart
+
+
+def timed(func, repeat: int = 3):
+    """Return the result of the last call of func and the fastest time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
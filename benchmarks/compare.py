@@ -0,0 +1,62 @@
+"""Compare two result files of the benchmarks, e.g. of two releases, and list
+the measurements which got worse by more than a threshold.
+
+Run with:
+    python benchmarks/compare.py results-0.10.0.json results-0.11.0.json --threshold 0.1
+
+Exits with status 1 if there are regressions.
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        results = json.load(f)["results"]
+    # A measurement is identified by its name and parameters, e.g. rows and renderer
+    return {
+        tuple(sorted((k, v) for k, v in result.items() if k != "value")): result["value"]
+        for result in results
+    }
+
+
+def describe(key: tuple) -> str:
+    fields = dict(key)
+    name = fields.pop("name")
+    unit = fields.pop("unit")
+    parameters = ", ".join(f"{k}={v}" for k, v in fields.items())
+    return f"{name} ({parameters}) [{unit}]"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative increase above which a measurement is a regression.",
+    )
+    args = parser.parse_args()
+
+    baseline = load(args.baseline)
+    current = load(args.current)
+    regressions = 0
+    for key in sorted(set(baseline) & set(current)):
+        before, after = baseline[key], current[key]
+        change = (after - before) / before if before else 0.0
+        marker = ""
+        if change > args.threshold:
+            marker = "  <-- regression"
+            regressions += 1
+        print(f"{describe(key):<60} {before:>14.1f} {after:>14.1f} {change:>+8.1%}{marker}")
+    for key in sorted(set(current) - set(baseline)):
+        print(f"{describe(key):<60} {'':>14} {current[key]:>14.1f}      new")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Options and the recording of results for the benchmarks.
+
+Run all benchmarks with:
+    pytest benchmarks --headless --results benchmarks/results.json
+
+The browser benchmarks use the dash_duo fixture and require Chrome and
+chromedriver as well as the built JavaScript bundle (npm run build).
+Add --rows 1000 10000 100000 1000000 to also measure one million rows.
+"""
+
+import datetime
+import json
+import platform
+import sys
+
+import pytest
+
+import dash_vega_components as dvc
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("dash-vega-components benchmarks")
+    group.addoption(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="Numbers of rows of the synthetic datasets.",
+    )
+    group.addoption(
+        "--renderers",
+        nargs="+",
+        default=["canvas", "svg"],
+        help="Vega renderers which are used in the browser benchmarks.",
+    )
+    group.addoption(
+        "--results",
+        help="Path of a JSON file to which the results are written.",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "n_rows" in metafunc.fixturenames:
+        metafunc.parametrize("n_rows", metafunc.config.getoption("rows"))
+    if "renderer" in metafunc.fixturenames:
+        metafunc.parametrize("renderer", metafunc.config.getoption("renderers"))
+
+
+class Results:
+    def __init__(self):
+        self.results = []
+
+    def record(self, name: str, value: float, unit: str, **parameters) -> None:
+        """Record a measurement, e.g. ``record("first_render", 120.5, "ms", rows=1000)``."""
+        self.results.append(
+            {"name": name, **parameters, "value": value, "unit": unit}
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "metadata": {
+                "version": dvc.__version__,
+                "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+            },
+            "results": self.results,
+        }
+
+
+_results = Results()
+
+
+@pytest.fixture(scope="session")
+def results() -> Results:
+    return _results
+
+
+def pytest_sessionfinish(session):
+    path = session.config.getoption("results")
+    if path and _results.results:
+        with open(path, "w") as f:
+            json.dump(_results.to_dict(), f, indent=2)
@@ -0,0 +1,279 @@
+"""Latency of rendering and updating charts in a headless browser.
+
+All times are measured in the browser with performance.now(). Rendering is
+considered done one animation frame after the marks of the chart were added
+to the page, which is close to the first paint of the chart.
+"""
+
+import statistics
+import time
+
+import altair as alt
+import pytest
+from common import make_chart, make_dataframe
+from dash import Dash, Input, Output, callback, html
+from dash.testing.wait import until
+from selenium.webdriver.common.action_chains import ActionChains
+
+import dash_vega_components as dvc
+
+# Number of measurements per benchmark of which the median is recorded
+REPEAT = 3
+
+MARKS = "#chart-container .marks"
+
+
+@pytest.fixture(autouse=True)
+def no_max_rows():
+    with alt.data_transformers.disable_max_rows():
+        yield
+
+
+def start(dash_duo, app):
+    dash_duo.start_server(app)
+    # Large datasets take a while to transfer and render
+    dash_duo.driver.set_script_timeout(300)
+
+
+def test_first_render(dash_duo, n_rows, renderer, results):
+    """Time from clicking a button which triggers a callback returning the spec
+    until the chart is rendered."""
+    spec = make_chart(make_dataframe(n_rows)).to_dict()
+    app = Dash(__name__)
+    app.layout = html.Div(
+        [
+            html.Button("Render", id="render"),
+            html.Div(
+                dvc.Vega(id="chart", opt={"renderer": renderer, "actions": False}),
+                id="chart-container",
+            ),
+        ]
+    )
+
+    @callback(
+        Output("chart", "spec"),
+        Input("render", "n_clicks"),
+        prevent_initial_call=True,
+    )
+    def render(n_clicks):
+        # A new object so that the component renders the chart every time
+        return {**spec, "description": str(n_clicks)}
+
+    start(dash_duo, app)
+    dash_duo.wait_for_element("#render")
+    durations = []
+    for _ in range(REPEAT):
+        durations.append(
+            dash_duo.driver.execute_async_script(
+                """
+                const done = arguments[arguments.length - 1];
+                const container = document.getElementById('chart-container');
+                const previous = container.querySelector('.marks');
+                const t0 = performance.now();
+                const observer = new MutationObserver(() => {
+                    const marks = container.querySelector('.marks');
+                    if (marks && marks !== previous) {
+                        observer.disconnect();
+                        requestAnimationFrame(() => done(performance.now() - t0));
+                    }
+                });
+                observer.observe(container, { childList: true, subtree: true });
+                document.getElementById('render').click();
+                """
+            )
+        )
+    results.record(
+        "first_render",
+        statistics.median(durations),
+        "ms",
+        rows=n_rows,
+        renderer=renderer,
+    )
+
+
+def test_signal_roundtrip(dash_duo, n_rows, renderer, results):
+    """Time from the last pointer event of a brush until the output of the
+    callback which receives the signal is shown. Includes debounceWait."""
+    app = Dash(__name__)
+    app.layout = html.Div(
+        [
+            html.Div(
+                dvc.Vega(
+                    id="chart",
+                    spec=make_chart(make_dataframe(n_rows), brush=True).to_dict(),
+                    opt={"renderer": renderer, "actions": False},
+                    signalsToObserve=["brush"],
+                ),
+                id="chart-container",
+            ),
+            html.Pre(id="output"),
+        ]
+    )
+
+    @callback(Output("output", "children"), Input("chart", "signalData"))
+    def show_brush(signal_data):
+        return str(signal_data.get("brush", ""))
+
+    start(dash_duo, app)
+    marks = dash_duo.wait_for_element(MARKS, timeout=300)
+    dash_duo.driver.execute_script(
+        """
+        window.benchmark = { lastMove: 0, lastOutput: 0 };
+        window.addEventListener('pointermove', () => {
+            window.benchmark.lastMove = performance.now();
+        }, true);
+        new MutationObserver(() => {
+            window.benchmark.lastOutput = performance.now();
+        }).observe(document.getElementById('output'), {
+            childList: true, subtree: true, characterData: true,
+        });
+        """
+    )
+    durations = []
+    for i in range(REPEAT):
+        # Brushes at different positions so that the signal always changes
+        ActionChains(dash_duo.driver).move_to_element_with_offset(
+            marks, -150 + 40 * i, -100
+        ).click_and_hold().move_by_offset(60, 60).release().perform()
+        dash_duo.wait_for_contains_text("#output", "x")
+        # Wait until the last update arrived
+        time.sleep(1)
+        benchmark = dash_duo.driver.execute_script("return window.benchmark;")
+        durations.append(benchmark["lastOutput"] - benchmark["lastMove"])
+    results.record(
+        "signal_roundtrip",
+        statistics.median(durations),
+        "ms",
+        rows=n_rows,
+        renderer=renderer,
+    )
+
+
+def test_update_blocking(dash_duo, n_rows, renderer, results):
+    """Time during which the main thread is blocked by long tasks while the data
+    of a chart is updated through the data property."""
+    datasets = [
+        make_dataframe(n_rows).sample(frac=1, random_state=seed).to_dict("records")
+        for seed in range(2)
+    ]
+    app = Dash(__name__)
+    app.layout = html.Div(
+        [
+            html.Button("Update", id="update"),
+            html.Div(id="updated"),
+            html.Div(
+                dvc.Vega(
+                    id="chart",
+                    spec=make_chart(alt.NamedData("points")).to_dict(),
+                    data={"points": datasets[0]},
+                    opt={"renderer": renderer, "actions": False},
+                ),
+                id="chart-container",
+            ),
+        ]
+    )
+
+    @callback(
+        Output("chart", "data"),
+        Output("updated", "children"),
+        Input("update", "n_clicks"),
+        prevent_initial_call=True,
+    )
+    def update(n_clicks):
+        return {"points": datasets[n_clicks % 2]}, str(n_clicks)
+
+    start(dash_duo, app)
+    dash_duo.wait_for_element(MARKS, timeout=300)
+    dash_duo.driver.execute_script(
+        """
+        window.longTasks = [];
+        new PerformanceObserver((list) => {
+            list.getEntries().forEach((entry) => {
+                window.longTasks.push([entry.startTime, entry.duration]);
+            });
+        }).observe({ type: 'longtask' });
+        """
+    )
+    blocking, total_blocking = [], []
+    for i in range(1, REPEAT + 1):
+        t0 = dash_duo.driver.execute_script(
+            "const t0 = performance.now();"
+            " document.getElementById('update').click(); return t0;"
+        )
+        dash_duo.wait_for_text_to_equal("#updated", str(i), timeout=300)
+        # Wait until the chart is rendered with the new data
+        time.sleep(1)
+        tasks = dash_duo.driver.execute_script("return window.longTasks;")
+        durations = [duration for start_time, duration in tasks if start_time >= t0]
+        blocking.append(sum(durations))
+        # Same definition as the Total Blocking Time of Lighthouse
+        total_blocking.append(sum(max(0, duration - 50) for duration in durations))
+    results.record(
+        "update_blocking",
+        statistics.median(blocking),
+        "ms",
+        rows=n_rows,
+        renderer=renderer,
+    )
+    results.record(
+        "update_total_blocking",
+        statistics.median(total_blocking),
+        "ms",
+        rows=n_rows,
+        renderer=renderer,
+    )
+
+
+def test_remount_memory(dash_duo, n_rows, renderer, results):
+    """Memory of the page after a chart was replaced by a new component many
+    times, e.g. when navigating between the pages of an app."""
+    spec = make_chart(make_dataframe(n_rows)).to_dict()
+    remounts = 20
+    app = Dash(__name__)
+    app.layout = html.Div(
+        [
+            html.Button("Remount", id="remount"),
+            html.Div(id="chart-container"),
+        ]
+    )
+
+    @callback(Output("chart-container", "children"), Input("remount", "n_clicks"))
+    def remount(n_clicks):
+        # A new ID so that React mounts a new component
+        return dvc.Vega(
+            id=f"chart-{n_clicks or 0}",
+            spec=spec,
+            opt={"renderer": renderer, "actions": False},
+        )
+
+    start(dash_duo, app)
+    dash_duo.wait_for_element(MARKS, timeout=300)
+
+    def memory_report():
+        return dash_duo.driver.execute_script(
+            "return window.dashVegaComponents.memoryReport();"
+        )
+
+    for i in range(1, remounts + 1):
+        dash_duo.find_element("#remount").click()
+        until(lambda: memory_report()["unmounted"] == i, timeout=300)
+        until(lambda: memory_report()["views"] == 1, timeout=300)
+    report = memory_report()
+    # Only the last chart is still mounted
+    assert report["components"] == 1
+    assert report["unmounted"] == remounts
+    results.record(
+        "remount_canvas_bytes",
+        report["canvasBytes"],
+        "bytes",
+        rows=n_rows,
+        renderer=renderer,
+    )
+    if report["heapUsed"] is not None:
+        results.record(
+            "remount_heap_used",
+            report["heapUsed"],
+            "bytes",
+            rows=n_rows,
+            renderer=renderer,
+        )
@@ -0,0 +1,49 @@
+"""Time and size of serializing a spec in Python, i.e. the work done in a callback
+before the spec is sent to the browser.
+"""
+
+import gzip
+
+import altair as alt
+import pytest
+from common import make_chart, make_dataframe, timed
+from plotly.io.json import to_json_plotly
+
+import dash_vega_components as dvc
+
+
+@pytest.fixture(autouse=True)
+def no_max_rows():
+    with alt.data_transformers.disable_max_rows():
+        yield
+
+
+def test_spec_serialization(n_rows, results):
+    chart = make_chart(make_dataframe(n_rows))
+    spec, to_dict_seconds = timed(chart.to_dict)
+    # This is what Dash sends to the browser if a callback returns the spec
+    payload, json_seconds = timed(lambda: to_json_plotly(spec))
+
+    results.record("spec_to_dict", to_dict_seconds * 1000, "ms", rows=n_rows)
+    results.record("spec_to_json", json_seconds * 1000, "ms", rows=n_rows)
+    results.record("spec_json_size", len(payload), "bytes", rows=n_rows)
+    results.record(
+        "spec_json_gzip_size", len(gzip.compress(payload.encode())), "bytes", rows=n_rows
+    )
+
+
+def test_arrow_serialization(n_rows, results):
+    pytest.importorskip("pyarrow")
+    df = make_dataframe(n_rows)
+    payload, seconds = timed(lambda: to_json_plotly(dvc.arrow_dataset(df)))
+
+    results.record("arrow_to_json", seconds * 1000, "ms", rows=n_rows)
+    results.record("arrow_json_size", len(payload), "bytes", rows=n_rows)
+
+
+def test_columnar_serialization(n_rows, results):
+    df = make_dataframe(n_rows)
+    payload, seconds = timed(lambda: to_json_plotly(dvc.columnar_dataset(df)))
+
+    results.record("columnar_to_json", seconds * 1000, "ms", rows=n_rows)
+    results.record("columnar_json_size", len(payload), "bytes", rows=n_rows)
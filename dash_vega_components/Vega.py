@@ -12,23 +12,205 @@ Keyword arguments:
 - id (string; optional):
     The ID used to identify this component in Dash callbacks.
 
+- appendData (dict with strings as keys and values of type dict; optional):
+    A dictionary with the name of a dataset as key and a dictionary
+    describing rows to append as value, e.g. for live data. Every time
+    this property is set, the rows are inserted into the existing
+    view. Supported keys are \"rows\" (list of rows or a dataset as
+    described for the data property), \"maxRows\" (maximum number of
+    rows to keep, the oldest rows are removed first), \"timeField\"
+    and \"window\" (rows whose timeField is more than window
+    milliseconds older than the latest appended row are removed), and
+    \"seq\" (increasing sequence number, updates which were already
+    applied are ignored). Rows are expected to arrive in the order of
+    timeField. Use dash_vega_components.AppendCursor to create the
+    updates.
+
 - className (string; optional):
     Additional className of the Vega div.
 
+- data (dict with strings as keys and values of type list | dict; optional):
+    A dictionary with the name of a dataset as key and a list of rows
+    (list of dictionaries) as value. If set, the values replace the
+    contents of the named datasets in the chart. Changing this
+    property updates the data of the existing view without
+    re-rendering the whole chart which is a lot faster and keeps the
+    state of the chart, e.g. the zoom level and selections. With
+    Altair, you can create a named dataset with e.g.
+    alt.NamedData(\"my_data\"). Instead of a list of rows, you can
+    also pass a dictionary as created by
+    dash_vega_components.arrow_dataset to send the data in the Apache
+    Arrow format, or by dash_vega_components.columnar_dataset to send
+    it as columns of JSON.
+
+- dataPatch (dict with strings as keys and values of type dict; optional):
+    A dictionary with the name of a dataset as key and a dictionary
+    describing incremental changes as value. These changes are applied
+    to the existing view every time this property is set. Supported
+    keys are: \"insert\" (list of rows to add or a dataset as
+    described for the data property), \"remove\" (list of rows to
+    remove or True to remove all rows), \"modify\" (list of rows with
+    new values for existing rows, requires \"key\"), and \"key\" (name
+    or list of names of the fields identifying a row). Rows to remove
+    can also be given as key values if \"key\" is a single field. If
+    no key is given, all rows are removed which match the fields of
+    one of the rows in \"remove\".
+
 - debounceWait (number; default 10):
     Debouncing wait time in milliseconds before signals property is
     updated Default value is 10.
 
+- geoLevels (dict with strings as keys and values of type dict; optional):
+    A dictionary with the name of a dataset as key and levels of
+    detail of geographic data as value, as created by
+    dash_vega_components.geo_levels. The coarsest level which is
+    detailed enough for the current value of a signal, e.g. the width
+    of the chart or the scale of a projection, is loaded into the
+    dataset and the level is switched when the signal changes. The
+    value has the keys \"signal\", \"factor\" (the level with a
+    \"size\" of at least factor times the value of the signal is
+    loaded), and \"levels\" (list of datasets as described for the
+    data property with an additional key \"size\", sorted by size).
+    Not supported for charts which are rendered in a Web Worker.
+
+- lazy (boolean; default false):
+    If true, the chart is only embedded once it comes within
+    lazyMargin of the viewport. Until then, an empty div with the
+    estimated height of the chart is shown. This speeds up loading
+    pages with many charts. Defaults to false.
+
+- lazyMargin (string; default '200px'):
+    Distance to the viewport at which a lazy chart is embedded, in the
+    format of the CSS margin property, e.g. \"200px 0px\". Defaults to
+    \"200px\".
+
+- linkedSignals (dict with strings as keys and values of type string; optional):
+    A dictionary with the name of a signal as key and the name of a
+    channel as value. Changes of a linked signal are set on the
+    signals which are linked to the same channel in all other Vega
+    components on the page, directly in the browser and without a Dash
+    callback, e.g. to synchronize the zoom level or a parameter of
+    several charts. Only link signals which can be set, e.g.
+    parameters with a value. Signals of charts which are rendered in a
+    Web Worker cannot be linked.
+
+- maxWait (number; optional):
+    Maximum time in milliseconds a change of a signal is delayed if
+    signalUpdatePolicy is \"debounce\". Defaults to debounceWait.
+
+- offscreenBehavior (a value equal to: 'keep', 'suspend', 'finalize'; default 'keep'):
+    What happens to a chart which is further away from the viewport
+    than offscreenMargin. \"keep\" (default) keeps the chart.
+    \"suspend\" frees the memory of the chart and embeds it again with
+    the same state, e.g. selections and data, once it comes back.
+    \"finalize\" also frees the memory but embeds the chart from
+    scratch.
+
+- offscreenMargin (string; default '1000px'):
+    Distance to the viewport beyond which offscreenBehavior applies,
+    in the format of the CSS margin property. Defaults to \"1000px\".
+
 - opt (dict; optional):
     Vega-Embed options. See https://github.com/vega/vega-embed#options
     for more details.
 
+- pauseWhenHidden (boolean; default false):
+    If true, the chart is paused while it is hidden, i.e. while the
+    browser tab is in the background or while the chart is not
+    displayed, e.g. in an inactive tab or inside an element with
+    display: none. A paused chart does not evaluate or render changes
+    of its data and signals. They are applied at once when it is shown
+    again, without embedding the chart again. Charts which are hidden
+    before they are embedded are embedded once they are shown, so
+    signalData is only reported after that. Defaults to false.
+
+- prerendered (string; optional):
+    URL of an image of the chart, e.g. a data URL created with
+    dash_vega_components.prerender. It is shown until the interactive
+    chart is rendered, including while the JavaScript of this
+    component is loaded and while a lazy chart is not embedded yet.
+    Always update it together with the spec.
+
+- preserveState (boolean; default false):
+    If true, the state of the interactions with the chart is kept when
+    the spec is replaced: the observed signals, the selections, and
+    the zoom levels of scales which are bound to a selection. Only the
+    signals and selections which exist in the new spec are restored.
+    Charts which are rendered in a Web Worker do not keep their state.
+    Defaults to false.
+
+- renderInWorker (boolean; default false):
+    If true, the chart is rendered in a Web Worker to an
+    OffscreenCanvas so that parsing and rendering large charts does
+    not block the rest of the app. Signals are reported as usual.
+    Tooltips are shown as plain text, bindings of parameters to input
+    elements are not supported, and the renderer option of opt as well
+    as the theme option for Vega specs are ignored. Browsers without
+    support for OffscreenCanvas render the chart as usual. Defaults to
+    false.
+
+- renderStats (dict; optional):
+    A read-only dictionary with measurements of the latest sampled
+    render (\"event\" is \"embed\") or data update (\"event\" is
+    \"data\"), see renderStatsSampleRate. \"timings\" contains the
+    durations in milliseconds of the phases \"compile\" (Vega-Lite to
+    Vega), \"parse\", \"run\" (evaluation of the dataflow including
+    \"render\"), \"render\", \"dataflow\" (run without render),
+    \"embed\", and \"load\" (decoding data), and the \"total\"
+    duration. \"rows\" contains the number of rows per dataset,
+    \"bytes\" the approximate size of the received spec or data, and
+    \"signals\" the number of signal changes (\"events\") and of
+    updates of the signal properties (\"reports\") since the previous
+    measurement. Charts which are rendered in a Web Worker only report
+    the total duration. Use dash_vega_components.forward_render_stats
+    to pass them to a function.
+
+- renderStatsSampleRate (number; default 0):
+    Fraction of renders and data updates, between 0 and 1, for which
+    measurements are reported in the renderStats property. Defaults to
+    0 which disables the measurements.
+
 - signalData (dict; optional):
     A read-only dictionary of signals with the key being the name of
     the signal. The easiest way to make sense of it is to display the
     whole signalData dictionary in your app layout or print it to the
     console so that you see what the structure looks like.
 
+- signalDataFormat (a value equal to: 'full', 'delta'; default 'full'):
+    Set to \"delta\" to report changes of the observed signals in the
+    signalDelta property instead of the signalData property. Defaults
+    to \"full\".
+
+- signalDelta (dict; optional):
+    A dictionary which is updated instead of signalData if
+    signalDataFormat is \"delta\". It only contains the signals which
+    changed since the last update under the key \"signals\", together
+    with an increasing sequence number \"seq\" and the \"id\" of the
+    component instance which sent it. If \"reset\" is true,
+    \"signals\" contains all observed signals, e.g. after the chart
+    was rendered again. Use dash_vega_components.SignalState to merge
+    the updates into the full state. Set it to {\"resync\": True} from
+    a callback to receive all observed signals again with \"reset\".
+
+- signalUpdatePolicy (a value equal to: 'debounce', 'throttle', 'animationFrame'; default 'debounce'):
+    How changes of the observed signals are reported to Dash. Changes
+    of all signals are always collected and sent with a single update
+    of signalData. \"debounce\" (default) sends the changes once no
+    signal changed for debounceWait milliseconds, but at the latest
+    after maxWait milliseconds. \"throttle\" sends changes at most
+    once every debounceWait milliseconds. \"animationFrame\" sends
+    changes at most once per frame rendered by the browser. In all
+    cases, the last state of the signals is always sent.
+
+- signalValues (dict; optional):
+    A dictionary with the name of a signal as key and its new value as
+    value, e.g. to set a parameter of the chart from a Dash control.
+    Every time this property is set, the values are set on the
+    existing view without embedding the chart again. Values which are
+    already set are skipped and all others are evaluated with a single
+    run of the view. Changes caused by this property are not reported
+    back in signalData or signalDelta.
+
 - signalsToObserve (list of strings; optional):
     A list of signal names to observe for changes. If you use Altair,
     these are the names of the parameters you define. The values of
@@ -39,6 +221,13 @@ Keyword arguments:
     A Vega or Vega-Lite spec. To pass an Altair chart, use
     chart.to_dict().
 
+- specHash (string; optional):
+    An optional hash of the spec, e.g. created with
+    dash_vega_components.spec_hash. If set, it is used to detect
+    changes of the spec instead of comparing the whole spec which is a
+    lot faster for large specs. Always update it together with the
+    spec.
+
 - style (dict; optional):
     Generic style overrides on the Vega div.
 
@@ -52,10 +241,10 @@ Keyword arguments:
     _namespace = 'dash_vega_components'
     _type = 'Vega'
     @_explicitize_args
-    def __init__(self, id=Component.UNDEFINED, spec=Component.UNDEFINED, opt=Component.UNDEFINED, svgRendererScaleFactor=Component.UNDEFINED, signalsToObserve=Component.UNDEFINED, signalData=Component.UNDEFINED, style=Component.UNDEFINED, className=Component.UNDEFINED, debounceWait=Component.UNDEFINED, **kwargs):
-        self._prop_names = ['id', 'className', 'debounceWait', 'opt', 'signalData', 'signalsToObserve', 'spec', 'style', 'svgRendererScaleFactor']
+    def __init__(self, id=Component.UNDEFINED, spec=Component.UNDEFINED, specHash=Component.UNDEFINED, prerendered=Component.UNDEFINED, opt=Component.UNDEFINED, svgRendererScaleFactor=Component.UNDEFINED, signalsToObserve=Component.UNDEFINED, preserveState=Component.UNDEFINED, signalValues=Component.UNDEFINED, linkedSignals=Component.UNDEFINED, signalData=Component.UNDEFINED, signalDataFormat=Component.UNDEFINED, signalDelta=Component.UNDEFINED, data=Component.UNDEFINED, geoLevels=Component.UNDEFINED, dataPatch=Component.UNDEFINED, appendData=Component.UNDEFINED, lazy=Component.UNDEFINED, lazyMargin=Component.UNDEFINED, offscreenBehavior=Component.UNDEFINED, offscreenMargin=Component.UNDEFINED, renderInWorker=Component.UNDEFINED, pauseWhenHidden=Component.UNDEFINED, renderStatsSampleRate=Component.UNDEFINED, renderStats=Component.UNDEFINED, style=Component.UNDEFINED, className=Component.UNDEFINED, debounceWait=Component.UNDEFINED, signalUpdatePolicy=Component.UNDEFINED, maxWait=Component.UNDEFINED, **kwargs):
+        self._prop_names = ['id', 'appendData', 'className', 'data', 'dataPatch', 'debounceWait', 'geoLevels', 'lazy', 'lazyMargin', 'linkedSignals', 'maxWait', 'offscreenBehavior', 'offscreenMargin', 'opt', 'pauseWhenHidden', 'prerendered', 'preserveState', 'renderInWorker', 'renderStats', 'renderStatsSampleRate', 'signalData', 'signalDataFormat', 'signalDelta', 'signalUpdatePolicy', 'signalValues', 'signalsToObserve', 'spec', 'specHash', 'style', 'svgRendererScaleFactor']
         self._valid_wildcard_attributes =            []
-        self.available_properties = ['id', 'className', 'debounceWait', 'opt', 'signalData', 'signalsToObserve', 'spec', 'style', 'svgRendererScaleFactor']
+        self.available_properties = ['id', 'appendData', 'className', 'data', 'dataPatch', 'debounceWait', 'geoLevels', 'lazy', 'lazyMargin', 'linkedSignals', 'maxWait', 'offscreenBehavior', 'offscreenMargin', 'opt', 'pauseWhenHidden', 'prerendered', 'preserveState', 'renderInWorker', 'renderStats', 'renderStatsSampleRate', 'signalData', 'signalDataFormat', 'signalDelta', 'signalUpdatePolicy', 'signalValues', 'signalsToObserve', 'spec', 'specHash', 'style', 'svgRendererScaleFactor']
         self.available_wildcard_properties =            []
         _explicit_args = kwargs.pop('_explicit_args')
         _locals = locals()
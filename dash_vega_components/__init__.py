@@ -9,6 +9,26 @@ import dash as _dash
 # noinspection PyUnresolvedReferences
 from ._imports_ import *
 from ._imports_ import __all__
+from ._append import AppendCursor
+from ._arrow import arrow_dataset, to_arrow_ipc
+from ._cache import DiskBackend, MemoryBackend, cached_spec, fingerprint
+from ._columnar import columnar_dataset, to_columnar
+from ._compile import compile_spec
+from ._datasets import DatasetStore
+from ._export import ChartExporter
+from ._geo import geo_levels, simplify_geo
+from ._hashing import spec_hash
+from ._lod import LevelOfDetail, lttb
+from ._prerender import prerender
+from ._pushdown import TransformPushdown
+from ._selection import (
+    SelectionIndex,
+    filter_selection,
+    selection_mask,
+    selection_types,
+)
+from ._signals import SignalState
+from ._stats import forward_render_stats, render_stats_metrics
 
 if not hasattr(_dash, '__plotly_dash') and not hasattr(_dash, 'development'):
     print('Dash was not successfully imported. '
@@ -28,7 +48,7 @@ _current_path = _os.path.dirname(_os.path.abspath(__file__))
 
 _this_module = _sys.modules[__name__]
 
-async_resources = ["Vega",]
+async_resources = ["Vega", "VegaLite", "Arrow"]
 
 _js_dist = []
 
@@ -63,6 +83,22 @@ _js_dist.extend(
     ]
 )
 
+# Script of the Web Worker which is used if renderInWorker is set.
+# It is only requested by the worker and never loaded as part of the page.
+_js_dist.extend(
+    [
+        {
+            "relative_package_path": "async-VegaWorker.js",
+            "external_url": (
+                "https://unpkg.com/{0}@{2}"
+                "/{1}/async-VegaWorker.js"
+            ).format(package_name, __name__, __version__),
+            "namespace": package_name,
+            "dynamic": True,
+        }
+    ]
+)
+
 _js_dist.extend(
     [
         {
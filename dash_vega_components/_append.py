@@ -0,0 +1,165 @@
+import sys
+from typing import Any, Dict, Hashable, Optional, Union
+
+from dash import no_update
+
+from ._cache import DiskBackend, MemoryBackend
+from ._hashing import content_hash
+
+
+def _to_milliseconds(window: Any) -> Optional[float]:
+    if window is None:
+        return None
+    # datetime.timedelta and pandas.Timedelta
+    if hasattr(window, "total_seconds"):
+        return window.total_seconds() * 1000
+    return float(window)
+
+
+def _cursor_value(value: Any) -> Any:
+    # Stored as JSON so that it also works with a DiskBackend
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+class AppendCursor:
+    """Track per session which rows of a growing dataset were already sent to
+    the ``appendData`` property of a ``Vega`` component.
+
+    Every call of :meth:`append` returns only the rows which were added since
+    the previous call for the same session, together with the retention policy
+    which the browser applies. The cost of an update is therefore proportional
+    to the number of new rows and not to the size of the chart.
+
+    Example::
+
+        cursor = dvc.AppendCursor("telemetry", key="time", window=60_000)
+
+        @callback(
+            Output("chart", "appendData"),
+            Input("interval", "n_intervals"),
+            State("session-id", "data"),
+        )
+        def append_telemetry(n_intervals, session_id):
+            return cursor.append(session_id, load_telemetry())
+
+    Here, ``session-id`` is a ``dcc.Store`` which holds a unique id per
+    browser session. The spec of the chart has to contain a dataset with
+    the same name, e.g. created with ``alt.NamedData("telemetry")``.
+
+    Parameters
+    ----------
+    name
+        Name of the dataset in the chart.
+    key
+        Column which increases with every new row, e.g. a timestamp. Rows with
+        a larger value than the last row which was sent are new. If not given,
+        the data is expected to only grow at the end and new rows are found
+        by their position.
+    max_rows
+        Maximum number of rows which the chart keeps. The oldest rows are removed first.
+    window
+        Only rows whose ``time_field`` is within this time span of the latest row
+        are kept in the chart. A number of milliseconds or a ``timedelta``.
+    time_field
+        Field with the time of a row for the ``window``. Defaults to ``key``.
+    max_sessions
+        Maximum number of sessions for which the cursor is kept in memory if no
+        ``backend`` is passed. The least recently used sessions are removed first.
+    backend
+        Where to keep the cursors. Defaults to a :class:`MemoryBackend`. Use a
+        :class:`DiskBackend` if your app runs with multiple worker processes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        key: Optional[str] = None,
+        max_rows: Optional[int] = None,
+        window: Any = None,
+        time_field: Optional[str] = None,
+        max_sessions: int = 10_000,
+        backend: Optional[Union[MemoryBackend, DiskBackend]] = None,
+    ):
+        if backend is None:
+            backend = MemoryBackend(maxsize=max_sessions)
+        self.name = name
+        self.key = key
+        self.max_rows = max_rows
+        self.window = _to_milliseconds(window)
+        self.time_field = time_field or key
+        if self.window is not None and self.time_field is None:
+            raise ValueError("A window requires a time_field or a key.")
+        self.backend = backend
+
+    def _key(self, session_id: Hashable) -> str:
+        return f"append-{self.name}-" + content_hash(str(session_id))
+
+    def _new_rows(self, data: Any, cursor: Any) -> Any:
+        if cursor is None:
+            return data
+        if self.key is None:
+            return data[cursor:] if isinstance(data, list) else data.iloc[cursor:]
+        if isinstance(data, list):
+            # Values of the key are compared in the same form as they are stored
+            return [row for row in data if _cursor_value(row[self.key]) > cursor]
+        column = data[self.key]
+        pd = sys.modules.get("pandas")
+        if pd is not None and pd.api.types.is_datetime64_any_dtype(column):
+            cursor = pd.Timestamp(cursor)
+        return data[column > cursor]
+
+    def _cursor(self, data: Any, cursor: Any) -> Any:
+        if self.key is None:
+            return len(data)
+        if len(data) == 0:
+            return cursor
+        if isinstance(data, list):
+            return max(_cursor_value(row[self.key]) for row in data)
+        return _cursor_value(data[self.key].max())
+
+    def append(self, session_id: Hashable, data: Any) -> Any:
+        """Return the value of the ``appendData`` property with the rows of ``data``
+        which were not sent to the session yet.
+
+        ``data`` is a DataFrame or a list of rows with all rows which are currently
+        available, or at least all rows since the previous call. Returns
+        ``dash.no_update`` if there are no new rows.
+        """
+        key = self._key(session_id)
+        entry = self.backend.get(key) or {"seq": 0, "cursor": None}
+        rows = self._new_rows(data, entry["cursor"])
+        if len(rows) == 0:
+            return no_update
+        # For positions, the cursor is the number of rows of all of the data
+        cursor = self._cursor(data if self.key is None else rows, entry["cursor"])
+        self.backend.set(key, {"seq": entry["seq"] + 1, "cursor": cursor})
+
+        update: Dict[str, Any] = {
+            "rows": rows if isinstance(rows, list) else rows.to_dict("records"),
+            "seq": entry["seq"] + 1,
+        }
+        if self.max_rows is not None:
+            update["maxRows"] = self.max_rows
+        if self.window is not None:
+            update["timeField"] = self.time_field
+            update["window"] = self.window
+        return {self.name: update}
+
+    def reset(self, session_id: Hashable, data: Any = None) -> None:
+        """Move the cursor of a session to the end of ``data``, or to the start
+        if no data is given.
+
+        Call it when the chart is embedded again with a new spec which already
+        contains ``data`` so that the next call of :meth:`append` only returns
+        the rows after it.
+        """
+        key = self._key(session_id)
+        entry = self.backend.get(key) or {"seq": 0, "cursor": None}
+        cursor = None if data is None else self._cursor(data, entry["cursor"])
+        # The sequence number keeps increasing as the browser ignores updates
+        # with a number which it has already seen
+        self.backend.set(key, {"seq": entry["seq"], "cursor": cursor})
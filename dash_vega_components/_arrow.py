@@ -0,0 +1,61 @@
+import base64
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from ._datasets import DatasetStore
+
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as err:
+        raise ImportError(
+            "Sending data in the Apache Arrow format requires pyarrow."
+            " You can install it with 'pip install pyarrow'."
+        ) from err
+    return pa
+
+
+def to_arrow_ipc(data: Any) -> bytes:
+    """Serialize a pandas DataFrame or a pyarrow Table to the Arrow IPC stream format.
+
+    The index of a DataFrame is not included. Call ``df.reset_index()`` first
+    if you need it in the chart.
+    """
+    pa = _import_pyarrow()
+    if isinstance(data, pa.RecordBatch):
+        data = pa.Table.from_batches([data])
+    elif not isinstance(data, pa.Table):
+        data = pa.Table.from_pandas(data, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, data.schema) as writer:
+        writer.write_table(data)
+    return sink.getvalue().to_pybytes()
+
+
+def arrow_dataset(
+    data: Any, store: Optional["DatasetStore"] = None
+) -> Dict[str, Any]:
+    """Prepare a pandas DataFrame or a pyarrow Table to be passed to the ``data``
+    or ``dataPatch`` properties of the ``Vega`` component in the Apache Arrow format.
+
+    Arrow is a binary, columnar format which is a lot smaller and faster to
+    create and to read than a list of records, especially for large datasets.
+
+    Parameters
+    ----------
+    data
+        A pandas DataFrame or a pyarrow Table.
+    store
+        If given, the data is registered with this :class:`DatasetStore` and
+        the browser fetches it as binary data from its URL. Else, the data
+        is base64 encoded and sent as part of the callback response.
+    """
+    body = to_arrow_ipc(data)
+    data_format = {"type": "arrow"}
+    if store is not None:
+        url = store.register(body, mimetype=ARROW_MIMETYPE, extension="arrow")
+        return {"url": url, "format": data_format}
+    return {"base64": base64.b64encode(body).decode("ascii"), "format": data_format}
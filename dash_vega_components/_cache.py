@@ -0,0 +1,279 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Union
+
+from ._arrow import to_arrow_ipc
+from ._hashing import content_hash, to_json_bytes
+
+
+class MemoryBackend:
+    """Keep cached specs in the memory of the current process.
+
+    Parameters
+    ----------
+    maxsize
+        Maximum number of entries. The least recently used entries are
+        evicted first.
+    ttl
+        Optional time in seconds after which an entry expires.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskBackend:
+    """Store cached specs as JSON files in a directory.
+
+    All worker processes which use the same directory share the cache, e.g.
+    all gunicorn workers of an app. Use a directory in ``/dev/shm`` on Linux
+    to keep the files in shared memory.
+
+    Parameters
+    ----------
+    directory
+        The directory in which the specs are stored. It is created if it
+        does not exist.
+    maxsize
+        Maximum number of files. The least recently used files are
+        removed first.
+    ttl
+        Optional time in seconds after which an entry expires.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (key + ".json")
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            mtime = path.stat().st_mtime
+            if self.ttl is not None and mtime + self.ttl < time.time():
+                path.unlink(missing_ok=True)
+                return None
+            value = json.loads(path.read_bytes())
+        except (FileNotFoundError, ValueError):
+            return None
+        # Keep track of the last access for the least recently used eviction.
+        # The modification time is not updated when a ttl is set, as it
+        # is then used to determine when the entry expires.
+        if self.ttl is None:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+        return value
+
+    def set(self, key: str, value: dict) -> None:
+        path = self._path(key)
+        # Write to a temporary file first so that other processes never
+        # read a partially written file
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(to_json_bytes(value))
+        tmp_path.replace(path)
+        self._evict()
+
+    def _evict(self) -> None:
+        files = list(self.directory.glob("*.json"))
+        if len(files) <= self.maxsize:
+            return
+        mtimes = []
+        for file in files:
+            try:
+                mtimes.append((file.stat().st_mtime, file))
+            except FileNotFoundError:
+                continue
+        mtimes.sort()
+        for _, file in mtimes[: len(mtimes) - self.maxsize]:
+            file.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        for file in self.directory.glob("*.json"):
+            file.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.directory.glob("*.json"))
+
+
+def fingerprint(data: Any) -> str:
+    """Return a hash of the content of a pandas DataFrame or Series, a pyarrow
+    Table, bytes, or any JSON-serializable object. Changes to the data lead
+    to a different fingerprint.
+    """
+    # If pandas was never imported, data can't be a pandas object
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(data, (pd.DataFrame, pd.Series)):
+        digest = hashlib.blake2b(digest_size=16)
+        try:
+            digest.update(
+                pd.util.hash_pandas_object(data, index=True).values.tobytes()
+            )
+        except TypeError:
+            # Object columns with unhashable values such as lists or dicts
+            frame = data if isinstance(data, pd.DataFrame) else data.to_frame()
+            digest.update(to_json_bytes(frame.to_dict(orient="split")))
+        columns = data.columns if isinstance(data, pd.DataFrame) else [data.name]
+        dtypes = data.dtypes if isinstance(data, pd.DataFrame) else [data.dtype]
+        digest.update(to_json_bytes([list(columns), [str(t) for t in dtypes]]))
+        return digest.hexdigest()
+    if type(data).__module__.startswith("pyarrow"):
+        return content_hash(to_arrow_ipc(data))
+    return content_hash(data)
+
+
+def cached_spec(
+    func: Optional[Callable] = None,
+    *,
+    maxsize: int = 128,
+    ttl: Optional[float] = None,
+    data: Any = None,
+    backend: Optional[Union[MemoryBackend, DiskBackend]] = None,
+) -> Callable:
+    """Cache the specs returned by a function, e.g. a Dash callback.
+
+    The cache key consists of the arguments of the function and, if
+    given, a fingerprint of the data. If the function returns an
+    Altair chart, it is converted to a dictionary with ``to_dict`` before
+    it is cached so that also the schema validation and data serialization
+    are only done once.
+
+    The returned specs are shared between calls and must not be modified.
+
+    Example::
+
+        @callback(Output("chart", "spec"), Input("origin-dropdown", "value"))
+        @dvc.cached_spec(maxsize=32, data=source)
+        def display_chart(origin):
+            return make_chart(origin)
+
+        # Optionally, precompute specs at startup
+        display_chart.warm_up(["All", "USA", "Europe", "Japan"])
+
+    Parameters
+    ----------
+    maxsize
+        Maximum number of cached specs if no ``backend`` is passed.
+    ttl
+        Optional time in seconds after which a cached spec expires if no
+        ``backend`` is passed.
+    data
+        A DataFrame, any other object, or a function which returns one of these.
+        Its fingerprint is part of the cache key so that cached specs are not
+        used anymore after the data changed. Pass a function if the data is
+        reloaded while the app is running.
+    backend
+        Where to store the specs. Defaults to a :class:`MemoryBackend`. Use a
+        :class:`DiskBackend` to share the cache between worker processes.
+    """
+    if backend is None:
+        backend = MemoryBackend(maxsize=maxsize, ttl=ttl)
+
+    def decorator(func: Callable) -> Callable:
+        name = f"{func.__module__}.{func.__qualname__}"
+        # Fingerprints of static data are only computed once
+        static_fingerprint = (
+            fingerprint(data) if data is not None and not callable(data) else None
+        )
+
+        signature = inspect.signature(func)
+
+        def make_key(args: tuple, kwargs: dict) -> str:
+            # Bind the arguments to the parameters so that f(a) and f(a=a)
+            # as well as omitted defaults lead to the same key
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            for param in signature.parameters.values():
+                if param.kind is inspect.Parameter.VAR_KEYWORD:
+                    arguments[param.name] = sorted(arguments[param.name].items())
+            data_fingerprint = static_fingerprint
+            if callable(data):
+                data_fingerprint = fingerprint(data())
+            return content_hash([name, list(arguments.items()), data_fingerprint])
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            spec = backend.get(key)
+            if spec is None:
+                spec = func(*args, **kwargs)
+                if hasattr(spec, "to_dict"):
+                    spec = spec.to_dict()
+                backend.set(key, spec)
+            return spec
+
+        def warm_up(inputs: Iterable[Any]) -> int:
+            """Compute and cache the specs for the given inputs.
+
+            Each input is either a tuple of positional arguments, a dictionary
+            of keyword arguments, or a single argument. Returns the number
+            of computed specs.
+            """
+            count = 0
+            for item in inputs:
+                if isinstance(item, tuple):
+                    wrapper(*item)
+                elif isinstance(item, dict):
+                    wrapper(**item)
+                else:
+                    wrapper(item)
+                count += 1
+            return count
+
+        wrapper.warm_up = warm_up
+        wrapper.cache = backend
+        wrapper.cache_clear = backend.clear
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
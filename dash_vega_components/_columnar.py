@@ -0,0 +1,113 @@
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from ._datasets import DatasetStore
+
+
+def _to_list(values: "np.ndarray", mask: "Optional[np.ndarray]" = None) -> List[Any]:
+    # NaN is not valid JSON. Missing values are sent as null.
+    if mask is not None and mask.any():
+        values = values.astype(object)
+        values[mask] = None
+    return values.tolist()
+
+
+def _dictionary(codes: "np.ndarray", values: Any) -> Dict[str, Any]:
+    # Codes of missing values are -1
+    import pandas as pd
+    return {
+        "type": "dictionary",
+        "codes": codes.tolist(),
+        "values": _encode_column(pd.Series(values), dictionary_threshold=0),
+    }
+
+
+def _encode_column(series: "pd.Series", dictionary_threshold: float = 0.5) -> Any:
+    import numpy as np
+    import pandas as pd
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return _dictionary(series.cat.codes.to_numpy(), series.cat.categories)
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        local = getattr(dtype, "tz", None) is None
+        if not local:
+            series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+        mask = series.isna().to_numpy()
+        epochs = series.to_numpy(dtype="datetime64[ms]").astype("int64")
+        # Timestamps without a time zone are shown in the local time of the
+        # browser, the same as Vega-Lite does for dates without a time zone
+        return {"type": "timestamp", "values": _to_list(epochs, mask), "local": local}
+    if pd.api.types.is_timedelta64_dtype(dtype):
+        mask = series.isna().to_numpy()
+        return _to_list(series.to_numpy(dtype="timedelta64[ms]").astype("int64"), mask)
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_numeric_dtype(dtype):
+        if isinstance(dtype, np.dtype):
+            values = series.to_numpy()
+            return _to_list(values, np.isnan(values) if values.dtype.kind == "f" else None)
+        # Nullable extension types such as Int64 or boolean
+        return series.to_numpy(dtype=object, na_value=None).tolist()
+    if pd.api.types.is_string_dtype(dtype) or dtype == object:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        if len(series) and len(uniques) <= dictionary_threshold * len(series):
+            return _dictionary(codes, uniques)
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def to_columnar(data: Any, dictionary_threshold: float = 0.5) -> Dict[str, Any]:
+    """Encode a pandas DataFrame column by column in a compact JSON format which
+    the ``Vega`` component expands to rows when it loads the data.
+
+    Converting a DataFrame this way is a lot faster than ``df.to_dict("records")``
+    and the result is smaller as the field names are not repeated for every
+    row. Categorical columns, and string columns with few distinct values, are
+    dictionary-encoded. Timestamps are sent as milliseconds since the epoch.
+    The index is not included.
+
+    The result is plain JSON. To append rows with a Dash ``Patch``, extend every
+    column, e.g. ``patch["columns"]["x"].extend(values)``. This requires columns
+    which are not dictionary-encoded. Use :func:`columnar_dataset` to pass it to
+    the ``data`` property.
+
+    Parameters
+    ----------
+    data
+        A pandas DataFrame.
+    dictionary_threshold
+        String columns are dictionary-encoded if the number of distinct values is at
+        most this fraction of the number of rows. Set it to 0 to disable it.
+    """
+    return {
+        "columns": {
+            str(name): _encode_column(data[name], dictionary_threshold)
+            for name in data.columns
+        }
+    }
+
+
+def columnar_dataset(
+    data: Any, store: Optional["DatasetStore"] = None, dictionary_threshold: float = 0.5
+) -> Dict[str, Any]:
+    """Prepare a pandas DataFrame to be passed to the ``data``, ``dataPatch``, or
+    ``appendData`` properties of the ``Vega`` component in a columnar JSON format.
+
+    See :func:`to_columnar` for details. Unlike :func:`arrow_dataset`, this does
+    not require pyarrow and the data stays JSON.
+
+    Parameters
+    ----------
+    data
+        A pandas DataFrame.
+    store
+        If given, the data is registered with this :class:`DatasetStore` and
+        the browser fetches it from its URL. Else, the data is sent as part of
+        the callback response.
+    dictionary_threshold
+        See :func:`to_columnar`.
+    """
+    values = to_columnar(data, dictionary_threshold)
+    data_format = {"type": "columnar"}
+    if store is not None:
+        return {"url": store.register(values), "format": data_format}
+    return {"values": values, "format": data_format}
@@ -0,0 +1,98 @@
+from typing import Any, Dict, Optional
+
+from ._cache import MemoryBackend
+from ._hashing import content_hash
+
+# Compiled Vega specs without the datasets, shared by all calls of compile_spec
+_compiled_specs = MemoryBackend(maxsize=256)
+
+
+def _import_vl_convert():
+    try:
+        import vl_convert as vlc
+    except ImportError as err:
+        raise ImportError(
+            "Compiling Vega-Lite specs on the server requires vl-convert-python."
+            " You can install it with 'pip install vl-convert-python'."
+        ) from err
+    return vlc
+
+
+def _is_vega(spec: Dict[str, Any]) -> bool:
+    schema = spec.get("$schema")
+    return isinstance(schema, str) and "/vega/" in schema
+
+
+def _bind_datasets(
+    vg_spec: Dict[str, Any], datasets: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    # Same as bindDatasets in src/lib/utils/compile.js. Returns a copy so that
+    # the cached spec is never modified.
+    data = [
+        {**source, "values": datasets[source["name"]]}
+        if datasets
+        and source.get("name") in datasets
+        and "values" not in source
+        and "url" not in source
+        else source
+        for source in vg_spec.get("data", [])
+    ]
+    vg_spec = dict(vg_spec)
+    if data:
+        vg_spec["data"] = data
+    return vg_spec
+
+
+def compile_spec(
+    spec: Any,
+    config: Optional[Dict[str, Any]] = None,
+    theme: Optional[str] = None,
+    vl_version: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Compile a Vega-Lite spec or an Altair chart to a Vega spec on the server.
+
+    The browser then embeds the Vega spec directly and never loads the
+    Vega-Lite compiler, which is a large part of the JavaScript of this
+    package. Compiled specs are cached by the hash of the spec without its
+    datasets so that charts which only differ in their data are compiled once.
+    Requires `vl-convert-python <https://github.com/vega/vl-convert>`_.
+
+    Example::
+
+        dvc.Vega(id="chart", spec=dvc.compile_spec(chart))
+
+    Parameters
+    ----------
+    spec
+        An Altair chart, or a Vega-Lite spec as a dictionary. Vega specs are
+        returned unchanged.
+    config
+        Vega-Lite config which is applied during the compilation. Pass it here
+        instead of as ``opt={"config": ...}`` which has no effect on Vega specs.
+    theme
+        Name of a Vega theme, e.g. ``"dark"``, which is applied during the compilation.
+    vl_version
+        Version of Vega-Lite to use, e.g. ``"5.20"``. Defaults to the latest
+        version supported by vl-convert.
+    """
+    if hasattr(spec, "to_dict"):
+        spec = spec.to_dict()
+    if _is_vega(spec):
+        return spec
+
+    spec = dict(spec)
+    datasets = spec.pop("datasets", None)
+    key = content_hash([spec, config, theme, vl_version])
+    vg_spec = _compiled_specs.get(key)
+    if vg_spec is None:
+        vlc = _import_vl_convert()
+        options: Dict[str, Any] = {}
+        if config is not None:
+            options["config"] = config
+        if theme is not None:
+            options["theme"] = theme
+        if vl_version is not None:
+            options["vl_version"] = vl_version
+        vg_spec = vlc.vegalite_to_vega(spec, **options)
+        _compiled_specs.set(key, vg_spec)
+    return _bind_datasets(vg_spec, datasets)
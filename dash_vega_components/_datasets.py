@@ -0,0 +1,210 @@
+import copy
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import flask
+
+from ._arrow import ARROW_MIMETYPE
+from ._hashing import content_hash, to_json_bytes
+
+_ROUTE_NAME = "dash_vega_components_datasets"
+_MIMETYPES = {".json": "application/json", ".arrow": ARROW_MIMETYPE}
+
+
+class DatasetStore:
+    """Serve the datasets of Vega and Vega-Lite specs under content-addressed URLs.
+
+    Instead of sending all rows inline with every spec, :meth:`externalize`
+    moves the datasets into this store and replaces them with ``url`` data.
+    The browser then fetches each dataset once and, as the URL only changes if the
+    content changes, it can cache it indefinitely and reuse it across charts
+    and page loads.
+
+    The store keeps the most recently used datasets in memory. If your app runs
+    with multiple worker processes, pass a ``directory`` which all workers can
+    access so that a dataset registered in one worker can be served by any other.
+
+    Parameters
+    ----------
+    app
+        A Dash or Flask app. The route is registered on it. You can also pass the
+        app later to :meth:`init_app`.
+    route
+        The path under which the datasets are served.
+    max_entries
+        Maximum number of datasets which are kept in memory.
+    max_age
+        Value in seconds of the ``max-age`` directive of the ``Cache-Control`` header.
+    directory
+        Optional directory in which the datasets are stored in addition to memory.
+    min_bytes
+        Datasets smaller than this size are left inline in the spec as
+        an additional request would cost more than it saves.
+    """
+
+    def __init__(
+        self,
+        app=None,
+        route: str = "/_dash-vega-components/datasets/",
+        max_entries: int = 256,
+        max_age: int = 31536000,
+        directory: Optional[Union[str, Path]] = None,
+        min_bytes: int = 1024,
+    ):
+        self.route = "/" + route.strip("/") + "/"
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.directory = Path(directory) if directory is not None else None
+        self.min_bytes = min_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._url_prefix = self.route
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        """Register the route of the store on a Dash or Flask app."""
+        server = getattr(app, "server", app)
+        rule = self.route
+        if hasattr(app, "get_relative_path"):
+            # Dash apps can be served under a prefix, e.g. behind a proxy
+            rule = app.config.routes_pathname_prefix + self.route.lstrip("/")
+            self._url_prefix = app.get_relative_path(self.route)
+        server.add_url_rule(
+            rule + "<key>",
+            endpoint=_ROUTE_NAME,
+            view_func=self._serve,
+        )
+
+    def register(
+        self, values: Any, mimetype: str = "application/json", extension: str = "json"
+    ) -> str:
+        """Add a dataset to the store and return the URL under which it is served.
+
+        ``values`` can either be raw bytes or a JSON-serializable object such as
+        a list of records.
+        """
+        body = values if isinstance(values, bytes) else to_json_bytes(values)
+        key = content_hash(body) + "." + extension
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            else:
+                self._entries[key] = (body, mimetype)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        if self.directory is not None:
+            path = self.directory / key
+            if not path.exists():
+                # Write to a temporary file first so that other workers never
+                # read a partially written file. Its name is unique so that
+                # processes and threads writing the same dataset don't collide.
+                tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+                tmp_path.write_bytes(body)
+                tmp_path.replace(path)
+        return self._url_prefix + key
+
+    def externalize(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a copy of a Vega or Vega-Lite spec in which inline datasets
+        are replaced by URLs pointing to this store.
+
+        The names of the datasets are kept so that they can still be updated
+        through the ``data`` and ``dataPatch`` properties of the ``Vega`` component.
+        """
+        spec = copy.copy(spec)
+        datasets = spec.pop("datasets", None) or {}
+        urls = {}
+        inline = {}
+        for name, values in datasets.items():
+            body = to_json_bytes(values)
+            if len(body) < self.min_bytes:
+                inline[name] = values
+            else:
+                urls[name] = self.register(body)
+        if inline:
+            spec["datasets"] = inline
+        return self._rewrite(spec, urls)
+
+    def _rewrite(self, obj: Any, urls: Dict[str, str]) -> Any:
+        if isinstance(obj, list):
+            return [self._rewrite(item, urls) for item in obj]
+        if not isinstance(obj, dict):
+            return obj
+        rewritten = {}
+        for key, value in obj.items():
+            if key == "data" and isinstance(value, dict):
+                value = self._rewrite_data(value, urls)
+            elif key == "data" and isinstance(value, list):
+                # Vega specs define a list of datasets
+                value = [
+                    self._rewrite_data(d, urls) if isinstance(d, dict) else d
+                    for d in value
+                ]
+            elif key != "datasets":
+                value = self._rewrite(value, urls)
+            rewritten[key] = value
+        return rewritten
+
+    def _rewrite_data(self, data: Dict[str, Any], urls: Dict[str, str]) -> Dict[str, Any]:
+        if "url" in data or "source" in data:
+            return data
+        name = data.get("name")
+        if "values" not in data:
+            if name in urls:
+                return {**data, "url": urls[name], "format": _json_format(data)}
+            return data
+        values = data["values"]
+        # Strings are inline CSV or similar which are better left as they are
+        if isinstance(values, str):
+            return data
+        body = to_json_bytes(values)
+        if len(body) < self.min_bytes:
+            return data
+        data = {key: value for key, value in data.items() if key != "values"}
+        return {**data, "url": self.register(body), "format": _json_format(data)}
+
+    def _lookup(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        if self.directory is not None:
+            path = self.directory / key
+            # Keys are hex digests plus an extension. Checking the name protects
+            # against requests for files outside of the directory.
+            if path.name == key and path.is_file():
+                mimetype = _MIMETYPES.get(path.suffix, "application/octet-stream")
+                return path.read_bytes(), mimetype
+        return None
+
+    def _serve(self, key: str):
+        request = flask.request
+        # The content behind a key never changes. If the browser already
+        # has a version of it, we can confirm it even if the entry
+        # was evicted from the store in the meantime.
+        if key in request.if_none_match:
+            response = flask.Response(status=304)
+        else:
+            entry = self._lookup(key)
+            if entry is None:
+                flask.abort(404)
+            body, mimetype = entry
+            response = flask.Response(body, mimetype=mimetype)
+        response.set_etag(key)
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        response.cache_control.immutable = True
+        return response
+
+
+
+def _json_format(data: Dict[str, Any]) -> Dict[str, Any]:
+    data_format = dict(data.get("format") or {})
+    data_format.setdefault("type", "json")
+    return data_format
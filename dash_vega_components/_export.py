@@ -0,0 +1,345 @@
+import base64
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+import flask
+
+from ._cache import MemoryBackend
+from ._hashing import content_hash, to_json_bytes
+from ._prerender import _render
+
+_ROUTE_NAME = "dash_vega_components_export"
+_MIMETYPES = {"svg": "image/svg+xml", "png": "image/png", "pdf": "application/pdf"}
+
+Charts = Union[Mapping[Any, Any], Iterable[Any]]
+
+
+def _render_task(task: Tuple[Any, ...]) -> bytes:
+    # Runs in the worker processes and therefore has to be a module-level function
+    return _render(*task)
+
+
+def _canonical_hash(obj: Any) -> str:
+    # The order of the keys does not change the image but is not preserved,
+    # e.g. by JSON encoders which sort the keys
+    return content_hash(
+        json.dumps(json.loads(to_json_bytes(obj)), sort_keys=True).encode("utf-8")
+    )
+
+
+class ChartExporter:
+    """Render charts to SVG, PNG, or PDF files on the server, e.g. for reports.
+
+    Charts are rendered with `vl-convert-python <https://github.com/vega/vl-convert>`_
+    in a pool of worker processes so that rendering many charts scales with the
+    number of cores. Identical charts are only rendered once and the results are
+    cached by the hash of the spec and the options. Pass a
+    :class:`DiskBackend` as ``cache`` to keep the images across runs, e.g. for
+    nightly reports in which most charts do not change.
+
+    Example::
+
+        with dvc.ChartExporter(format="png", scale=2) as exporter:
+            for name, image in exporter.export_many({"sales": chart1, "costs": chart2}):
+                Path(f"{name}.png").write_bytes(image)
+
+    Parameters
+    ----------
+    app
+        A Dash or Flask app on which the export route is registered, see
+        :meth:`init_app`. You can also pass the app later to :meth:`init_app`.
+    format
+        Default format: "svg", "png", or "pdf".
+    scale
+        Scale factor of PNG and PDF images.
+    ppi
+        Pixels per inch of PNG images.
+    config
+        Vega-Lite config which is applied to Vega-Lite specs.
+    theme
+        Name of a Vega theme which is applied to Vega-Lite specs.
+    processes
+        Number of worker processes. Defaults to the number of CPUs. With 0, the
+        charts are rendered in the current process. The workers are started with
+        the "spawn" method and import the main module of your app again, so
+        start the server under ``if __name__ == "__main__":``.
+    cache
+        A :class:`MemoryBackend` or :class:`DiskBackend` in which the images are
+        cached. Defaults to an in-memory cache of 256 images.
+    route
+        The path of the export route.
+    allowed_base_urls
+        Base URLs from which charts rendered by the export route may load data,
+        e.g. ``["https://example.com/data/"]``. By default, these charts cannot
+        load any remote data. Charts passed to :meth:`export` and
+        :meth:`export_many` are not restricted.
+    max_body_size
+        Maximum size in bytes of the JSON body of requests to the export route.
+    max_charts
+        Maximum number of charts per request to the export route.
+    """
+
+    def __init__(
+        self,
+        app=None,
+        format: str = "png",
+        scale: float = 1,
+        ppi: Optional[float] = None,
+        config: Optional[Dict[str, Any]] = None,
+        theme: Optional[str] = None,
+        processes: Optional[int] = None,
+        cache=None,
+        route: str = "/_dash-vega-components/export",
+        allowed_base_urls: Optional[List[str]] = None,
+        max_body_size: int = 10 * 1024 * 1024,
+        max_charts: int = 100,
+    ):
+        self._check_format(format)
+        self.format = format
+        self.scale = scale
+        self.ppi = ppi
+        self.config = config
+        self.theme = theme
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.cache = cache if cache is not None else MemoryBackend(maxsize=256)
+        self.route = "/" + route.strip("/")
+        self.allowed_base_urls = list(allowed_base_urls or [])
+        self.max_body_size = max_body_size
+        self.max_charts = max_charts
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def __enter__(self) -> "ChartExporter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker processes. They are started again if needed."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    @staticmethod
+    def _check_format(format: str) -> None:
+        if format not in _MIMETYPES:
+            raise ValueError(
+                f"format must be one of {', '.join(_MIMETYPES)}, got {format!r}."
+            )
+
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                # vl-convert keeps threads in the parent process once it was
+                # used there, e.g. by prerender, and forked workers deadlock.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _task(
+        self,
+        spec: Any,
+        format: Optional[str],
+        allowed_base_urls: Optional[List[str]] = None,
+    ) -> Tuple[str, Tuple[Any, ...]]:
+        format = format or self.format
+        self._check_format(format)
+        if hasattr(spec, "to_dict"):
+            spec = spec.to_dict()
+        task = (
+            spec,
+            format,
+            self.scale,
+            self.config,
+            self.theme,
+            self.ppi,
+            allowed_base_urls,
+        )
+        return _canonical_hash(list(task)), task
+
+    def _cached(self, key: str) -> Optional[bytes]:
+        entry = self.cache.get(key)
+        return base64.b64decode(entry["image"]) if entry is not None else None
+
+    def _store(self, key: str, image: bytes) -> None:
+        # Encoded so that the images can also be stored in a DiskBackend
+        self.cache.set(key, {"image": base64.b64encode(image).decode("ascii")})
+
+    def export(self, spec: Any, format: Optional[str] = None) -> bytes:
+        """Render a single chart in the current process and return the image.
+
+        Parameters
+        ----------
+        spec
+            An Altair chart, or a Vega-Lite or Vega spec as a dictionary.
+        format
+            Overrides the default format of the exporter.
+        """
+        key, task = self._task(spec, format)
+        image = self._cached(key)
+        if image is None:
+            image = _render_task(task)
+            self._store(key, image)
+        return image
+
+    def export_many(
+        self,
+        charts: Charts,
+        format: Optional[str] = None,
+        raise_errors: bool = True,
+    ) -> Iterator[Tuple[Any, Union[bytes, Exception]]]:
+        """Render many charts in the worker processes and yield ``(name, image)``
+        tuples as soon as each chart is done, i.e. not in the order of ``charts``.
+
+        Cached images are yielded first. Charts with the same spec are rendered
+        once and yielded under each of their names.
+
+        Parameters
+        ----------
+        charts
+            A dictionary of names and charts, or a list of charts in which case
+            the names are the positions in the list. Charts are Altair charts, or
+            Vega-Lite or Vega specs as dictionaries.
+        format
+            Overrides the default format of the exporter.
+        raise_errors
+            If False, charts which cannot be rendered are yielded with the
+            exception instead of the image and the other charts are still rendered.
+        """
+        return self._export_many(charts, format, raise_errors)
+
+    def _export_many(
+        self,
+        charts: Charts,
+        format: Optional[str],
+        raise_errors: bool,
+        allowed_base_urls: Optional[List[str]] = None,
+    ) -> Iterator[Tuple[Any, Union[bytes, Exception]]]:
+        items = charts.items() if isinstance(charts, Mapping) else enumerate(charts)
+        pending: Dict[str, Tuple[Tuple[Any, ...], List[Any]]] = {}
+        for name, spec in items:
+            key, task = self._task(spec, format, allowed_base_urls)
+            if key in pending:
+                pending[key][1].append(name)
+                continue
+            image = self._cached(key)
+            if image is not None:
+                yield name, image
+                # Later charts with the same spec are served from the cache
+                continue
+            pending[key] = (task, [name])
+        if not pending:
+            return
+
+        futures: Dict[Any, str] = {}
+        if self.processes == 0:
+            results: Iterable[Tuple[str, Any]] = (
+                (key, self._run(task)) for key, (task, _) in pending.items()
+            )
+        else:
+            pool = self._get_pool()
+            futures = {
+                pool.submit(_render_task, task): key
+                for key, (task, _) in pending.items()
+            }
+            results = (
+                (futures[future], future.exception() or future.result())
+                for future in as_completed(futures)
+            )
+        try:
+            for key, result in results:
+                if isinstance(result, Exception):
+                    if raise_errors:
+                        raise result
+                else:
+                    self._store(key, result)
+                for name in pending[key][1]:
+                    yield name, result
+        finally:
+            # Charts which were not started yet are not rendered anymore if an
+            # error is raised or the caller stops iterating
+            for future in futures:
+                future.cancel()
+
+    @staticmethod
+    def _run(task: Tuple[Any, ...]) -> Union[bytes, Exception]:
+        try:
+            return _render_task(task)
+        except Exception as err:
+            return err
+
+    def init_app(self, app) -> None:
+        """Register the export route on a Dash or Flask app.
+
+        ``POST`` requests with a JSON body ``{"spec": ..., "format": "png"}``
+        return the image, or a 400 response with the error if the spec cannot be
+        rendered. Requests with ``{"charts": {name: spec, ...}}`` instead return
+        one line of JSON per chart as soon as it is rendered, with the keys
+        "name", "mimetype", and "data" (base64-encoded image) or "error".
+
+        All charts are rendered in the worker processes. Requests whose body is
+        larger than ``max_body_size`` or which contain more than ``max_charts``
+        charts are rejected, and the charts can only load data from
+        ``allowed_base_urls``.
+
+        The route is not authenticated and lets its callers use the CPUs of the
+        server. Only register it on apps which require authentication for all
+        routes of the server, e.g. with dash-auth, or which are not reachable
+        from untrusted networks.
+        """
+        server = getattr(app, "server", app)
+        rule = self.route
+        if hasattr(app, "get_relative_path"):
+            rule = app.config.routes_pathname_prefix + self.route.lstrip("/")
+        server.add_url_rule(
+            rule, endpoint=_ROUTE_NAME, view_func=self._serve, methods=["POST"]
+        )
+
+    def _serve(self):
+        length = flask.request.content_length
+        if length is None:
+            flask.abort(411)
+        if length > self.max_body_size:
+            flask.abort(413)
+        body = flask.request.get_json(silent=True)
+        if not isinstance(body, dict):
+            flask.abort(400)
+        format = body.get("format") or self.format
+        if format not in _MIMETYPES or not ("spec" in body or "charts" in body):
+            flask.abort(400)
+        charts = body["charts"] if "charts" in body else [body["spec"]]
+        if not isinstance(charts, (dict, list)):
+            flask.abort(400)
+        if len(charts) > self.max_charts:
+            flask.abort(413)
+        results = self._export_many(
+            charts, format, raise_errors=False, allowed_base_urls=self.allowed_base_urls
+        )
+        if "charts" not in body:
+            _, result = next(results)
+            if isinstance(result, Exception):
+                return flask.Response(str(result), status=400, mimetype="text/plain")
+            return flask.Response(result, mimetype=_MIMETYPES[format])
+
+        def lines():
+            for name, result in results:
+                line: Dict[str, Any] = {"name": name, "mimetype": _MIMETYPES[format]}
+                if isinstance(result, Exception):
+                    line["error"] = str(result)
+                else:
+                    line["data"] = base64.b64encode(result).decode("ascii")
+                yield json.dumps(line) + "\n"
+
+        return flask.Response(
+            flask.stream_with_context(lines()), mimetype="application/x-ndjson"
+        )
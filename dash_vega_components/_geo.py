@@ -0,0 +1,401 @@
+import math
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ._cache import MemoryBackend
+from ._hashing import content_hash
+
+if TYPE_CHECKING:
+    import numpy as np
+    from ._datasets import DatasetStore
+
+Projection = Callable[["np.ndarray", "np.ndarray"], Tuple["np.ndarray", "np.ndarray"]]
+BBox = Tuple[float, float, float, float]
+
+# Simplified geometries, shared by all calls of simplify_geo
+_simplified = MemoryBackend(maxsize=64)
+
+
+def _douglas_peucker(points: "np.ndarray", tolerance: float) -> "np.ndarray":
+    """Keep the points of a line which deviate more than ``tolerance`` from
+    the simplified line. The first and last point are always kept."""
+    import numpy as np
+    n = len(points)
+    if n <= 2:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = points[start], points[end]
+        inner = points[start + 1 : end]
+        dx, dy = b - a
+        length = math.hypot(dx, dy)
+        if length == 0:
+            # Closed rings start and end at the same point
+            distances = np.hypot(inner[:, 0] - a[0], inner[:, 1] - a[1])
+        else:
+            distances = (
+                np.abs(dx * (inner[:, 1] - a[1]) - dy * (inner[:, 0] - a[0])) / length
+            )
+        i = int(np.argmax(distances))
+        if distances[i] > tolerance:
+            i += start + 1
+            keep[i] = True
+            stack.append((start, i))
+            stack.append((i, end))
+    return points[keep]
+
+
+def _drop_duplicates(points: "np.ndarray", min_points: int) -> "np.ndarray":
+    """Remove consecutive duplicates, e.g. after rounding, but keep at least
+    ``min_points`` points."""
+    import numpy as np
+    if len(points) < 2:
+        return points
+    keep = np.concatenate([[True], np.any(points[1:] != points[:-1], axis=1)])
+    if keep.sum() < min(min_points, len(points)):
+        return points
+    return points[keep]
+
+
+def _min_ring(ring: "np.ndarray") -> "np.ndarray":
+    # Rings which collapse are kept as triangles so that small regions of a
+    # choropleth do not disappear
+    n = len(ring)
+    return ring[[0, n // 3, 2 * n // 3, 0]] if n >= 4 else ring
+
+
+def _is_topology(geo: Dict[str, Any]) -> bool:
+    return geo.get("type") == "Topology"
+
+
+def _project(points: "np.ndarray", project: Optional[Projection]) -> "np.ndarray":
+    import numpy as np
+    if project is None or not len(points):
+        return points
+    x, y = project(points[:, 0], points[:, 1])
+    return np.column_stack([np.asarray(x, dtype=float), np.asarray(y, dtype=float)])
+
+
+def _bbox(parts: "Sequence[np.ndarray]") -> BBox:
+    import numpy as np
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return (0.0, 0.0, 1.0, 1.0)
+    points = np.concatenate(parts)
+    return (
+        float(points[:, 0].min()),
+        float(points[:, 1].min()),
+        float(points[:, 0].max()),
+        float(points[:, 1].max()),
+    )
+
+
+# TopoJSON
+
+
+def _topology_points(obj: Dict[str, Any]) -> List[Any]:
+    """Coordinates of the points in the objects of a topology. Unlike arcs,
+    they are not delta-encoded."""
+    points = []
+    if obj.get("type") == "Point":
+        points.append(obj["coordinates"])
+    elif obj.get("type") == "MultiPoint":
+        points.extend(obj["coordinates"])
+    for child in obj.get("geometries") or []:
+        points.extend(_topology_points(child))
+    return points
+
+
+def _replace_topology_points(obj: Dict[str, Any], points: List[Any]) -> Dict[str, Any]:
+    # Consumes ``points`` in the order of _topology_points
+    obj = dict(obj)
+    if obj.get("type") == "Point":
+        obj["coordinates"] = points.pop(0)
+    elif obj.get("type") == "MultiPoint":
+        obj["coordinates"] = [points.pop(0) for _ in obj["coordinates"]]
+    if obj.get("geometries"):
+        obj["geometries"] = [
+            _replace_topology_points(child, points) for child in obj["geometries"]
+        ]
+    return obj
+
+
+def _decode_topology(
+    topology: Dict[str, Any], project: Optional[Projection]
+) -> "Tuple[List[np.ndarray], np.ndarray]":
+    import numpy as np
+    transform = topology.get("transform")
+    scale = np.asarray(transform["scale"], dtype=float) if transform else None
+    translate = np.asarray(transform["translate"], dtype=float) if transform else None
+    arcs = []
+    for arc in topology.get("arcs", []):
+        points = np.asarray(arc, dtype=float).reshape(-1, len(arc[0]) if arc else 2)[:, :2]
+        if transform:
+            points = np.cumsum(points, axis=0) * scale + translate
+        arcs.append(_project(points, project))
+    points = np.asarray(
+        [
+            point[:2]
+            for name in topology.get("objects", {})
+            for point in _topology_points(topology["objects"][name])
+        ],
+        dtype=float,
+    ).reshape(-1, 2)
+    if transform and len(points):
+        points = points * scale + translate
+    return arcs, _project(points, project)
+
+
+def _encode_topology(
+    topology: Dict[str, Any],
+    arcs: "List[np.ndarray]",
+    points: "np.ndarray",
+    bbox: BBox,
+    size: float,
+    precision: float,
+) -> Dict[str, Any]:
+    import numpy as np
+    x0, y0, x1, y1 = bbox
+    extent = max(x1 - x0, y1 - y0) or 1.0
+    tolerance = extent / size
+    # Integer coordinates between 0 and steps, see the TopoJSON specification
+    steps = max(int(math.ceil(size * precision)), 1)
+    k = steps / extent
+    encoded = []
+    for arc in arcs:
+        simplified = _douglas_peucker(arc, tolerance)
+        # Arcs which start and end at the same point form a ring on their own
+        closed = len(arc) >= 4 and bool(np.all(arc[0] == arc[-1]))
+        if closed and len(simplified) < 4:
+            simplified = _min_ring(arc)
+        quantized = _drop_duplicates(
+            np.round((simplified - (x0, y0)) * k).astype(np.int64), 4 if closed else 2
+        )
+        delta = np.diff(quantized, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+        encoded.append(delta.tolist())
+    quantized_points = np.round((points - (x0, y0)) * k).astype(np.int64).tolist()
+    objects = {
+        name: _replace_topology_points(obj, quantized_points)
+        for name, obj in topology.get("objects", {}).items()
+    }
+    return {
+        **topology,
+        "bbox": list(bbox),
+        "transform": {"scale": [1 / k, 1 / k], "translate": [x0, y0]},
+        "objects": objects,
+        "arcs": encoded,
+    }
+
+
+# GeoJSON
+
+
+def _map_geometry(
+    geometry: Optional[Dict[str, Any]],
+    line: "Callable[[np.ndarray], Optional[np.ndarray]]",
+    ring: "Callable[[np.ndarray], Optional[np.ndarray]]",
+    point: "Callable[[np.ndarray], np.ndarray]",
+) -> Optional[Dict[str, Any]]:
+    import numpy as np
+    if geometry is None:
+        return None
+    kind = geometry.get("type")
+    coordinates = geometry.get("coordinates")
+
+    def array(coords: Any) -> np.ndarray:
+        return np.asarray(coords, dtype=float).reshape(-1, len(coords[0]) if len(coords) else 2)[:, :2]
+
+    def polygon(rings: Any) -> Optional[List[Any]]:
+        mapped = [ring(array(r)) for r in rings]
+        # A polygon without an exterior ring is dropped, as are holes
+        # which collapsed
+        if not mapped or mapped[0] is None:
+            return None
+        return [r.tolist() for r in mapped if r is not None]
+
+    if kind == "Point":
+        coordinates = point(array([coordinates]))[0].tolist()
+    elif kind == "MultiPoint":
+        coordinates = point(array(coordinates)).tolist()
+    elif kind == "LineString":
+        coordinates = line(array(coordinates)).tolist()
+    elif kind == "MultiLineString":
+        coordinates = [line(array(c)).tolist() for c in coordinates]
+    elif kind == "Polygon":
+        coordinates = polygon(coordinates) or []
+    elif kind == "MultiPolygon":
+        coordinates = [p for p in (polygon(c) for c in coordinates) if p]
+    elif kind == "GeometryCollection":
+        return {
+            **geometry,
+            "geometries": [
+                _map_geometry(g, line, ring, point) for g in geometry["geometries"]
+            ],
+        }
+    return {**geometry, "coordinates": coordinates}
+
+
+def _map_geojson(geo: Dict[str, Any], *functions: Callable) -> Dict[str, Any]:
+    kind = geo.get("type")
+    if kind == "FeatureCollection":
+        return {**geo, "features": [_map_geojson(f, *functions) for f in geo["features"]]}
+    if kind == "Feature":
+        return {**geo, "geometry": _map_geometry(geo.get("geometry"), *functions)}
+    return _map_geometry(geo, *functions)
+
+
+def _simplify_geojson(
+    geo: Dict[str, Any], size: float, precision: float, project: Optional[Projection]
+) -> Dict[str, Any]:
+    import numpy as np
+    if project is not None:
+        geo = _map_geojson(geo, *([lambda p: _project(p, project)] * 3))
+    parts: List[np.ndarray] = []
+
+    def collect(points: np.ndarray) -> np.ndarray:
+        parts.append(points)
+        return points
+
+    _map_geojson(geo, collect, collect, collect)
+    x0, y0, x1, y1 = _bbox(parts)
+    extent = max(x1 - x0, y1 - y0) or 1.0
+    tolerance = extent / size
+    # Coordinates are rounded to decimal digits so that they stay short in JSON
+    digits = max(int(math.ceil(-math.log10(extent / (size * precision)))), 0)
+
+    def line(points: np.ndarray) -> np.ndarray:
+        return _drop_duplicates(np.round(_douglas_peucker(points, tolerance), digits), 2)
+
+    def ring(points: np.ndarray) -> Optional[np.ndarray]:
+        if len(points) < 4:
+            return None
+        simplified = line(points)
+        return simplified if len(simplified) >= 4 else np.round(_min_ring(points), digits)
+
+    def point(points: np.ndarray) -> np.ndarray:
+        return np.round(points, digits)
+
+    return {**_map_geojson(geo, line, ring, point), "bbox": [x0, y0, x1, y1]}
+
+
+def simplify_geo(
+    geo: Any,
+    size: float,
+    precision: float = 4,
+    project: Optional[Projection] = None,
+) -> Dict[str, Any]:
+    """Simplify and quantize GeoJSON or TopoJSON for a map which shows the whole
+    extent of the geometries in ``size`` pixels.
+
+    Lines and rings are simplified with the Douglas-Peucker algorithm so that
+    they deviate by at most one pixel, and coordinates are quantized to
+    ``precision`` steps per pixel. TopoJSON is preferable for choropleths as the
+    borders which regions share are simplified once and stay gap-free. Results are
+    cached by the hash of the input unless ``project`` is given.
+
+    Parameters
+    ----------
+    geo
+        GeoJSON or TopoJSON as a dictionary, or an object with a
+        ``__geo_interface__`` such as a geopandas GeoDataFrame.
+    size
+        Size in pixels of the larger side of the extent of the geometries.
+    precision
+        Number of quantization steps per pixel.
+    project
+        Optional function which projects arrays of x and y coordinates,
+        e.g. ``pyproj.Transformer.from_crs(4326, 3857, always_xy=True).transform``.
+        Projected geometries are shown with ``{"type": "identity", "reflectY": True}``
+        as projection of the chart so that the browser does not need to project them.
+    """
+    if hasattr(geo, "__geo_interface__"):
+        geo = geo.__geo_interface__
+    key = content_hash([geo, size, precision]) if project is None else None
+    cached = _simplified.get(key) if key is not None else None
+    if cached is not None:
+        return cached
+    if _is_topology(geo):
+        arcs, points = _decode_topology(geo, project)
+        bbox = _bbox(arcs + [points])
+        result = _encode_topology(geo, arcs, points, bbox, size, precision)
+    else:
+        result = _simplify_geojson(geo, size, precision, project)
+    if key is not None:
+        _simplified.set(key, result)
+    return result
+
+
+def geo_levels(
+    geo: Any,
+    sizes: Sequence[float] = (250, 500, 1000, 2000),
+    feature: Optional[str] = None,
+    signal: str = "width",
+    factor: float = 1,
+    precision: float = 4,
+    project: Optional[Projection] = None,
+    store: Optional["DatasetStore"] = None,
+) -> Dict[str, Any]:
+    """Prepare GeoJSON or TopoJSON in several levels of detail for the
+    ``geoLevels`` property of the ``Vega`` component.
+
+    The component loads the coarsest level which is detailed enough for the
+    current value of ``signal``, e.g. the width of the chart or the scale of
+    a zoomable projection, into the dataset and switches the level when the
+    signal changes. See :func:`simplify_geo` for how each level is created.
+
+    Example::
+
+        dvc.Vega(
+            id="map",
+            spec=spec,  # with an empty dataset named "world"
+            geoLevels={"world": dvc.geo_levels(topology, feature="countries")},
+        )
+
+    Parameters
+    ----------
+    geo
+        GeoJSON or TopoJSON as a dictionary, or an object with a
+        ``__geo_interface__`` such as a geopandas GeoDataFrame.
+    sizes
+        Sizes in pixels of the extent of the geometries for which a level is created.
+    feature
+        For TopoJSON, the name of the object whose features are loaded.
+    signal
+        Name of the signal which determines the level.
+    factor
+        The level for a size of at least ``factor`` times the value of the signal is
+        loaded, e.g. 2 to account for screens with a high pixel density, or the ratio
+        between the scale of the projection and the size of the map.
+    precision
+        Number of quantization steps per pixel.
+    project
+        See :func:`simplify_geo`.
+    store
+        If given, the levels are registered with this :class:`DatasetStore` and the
+        browser only downloads the levels which it shows. Else, all levels are
+        sent as part of the property.
+    """
+    if hasattr(geo, "__geo_interface__"):
+        geo = geo.__geo_interface__
+    if _is_topology(geo):
+        if feature is None:
+            raise ValueError("feature is required for TopoJSON.")
+        data_format: Dict[str, Any] = {"type": "topojson", "feature": feature}
+    elif geo.get("type") == "FeatureCollection":
+        data_format = {"type": "json", "property": "features"}
+    else:
+        data_format = {"type": "json"}
+    levels = []
+    for size in sorted(sizes):
+        values = simplify_geo(geo, size, precision=precision, project=project)
+        level: Dict[str, Any] = {"size": size, "format": data_format}
+        if store is not None:
+            level["url"] = store.register(values)
+        else:
+            level["values"] = values
+        levels.append(level)
+    return {"signal": signal, "factor": factor, "levels": levels}
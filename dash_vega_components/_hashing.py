@@ -0,0 +1,34 @@
+import hashlib
+from typing import Any, Union
+
+from plotly.io.json import to_json_plotly
+
+
+def to_json_bytes(obj: Any) -> bytes:
+    """Serialize an object to compact JSON using the same encoder as Dash.
+
+    This takes care of numpy and pandas types so that the output matches what
+    Dash would send to the browser.
+    """
+    return to_json_plotly(obj).encode("utf-8")
+
+
+def content_hash(obj: Union[bytes, Any]) -> str:
+    """Return a short hex digest identifying the given bytes or JSON-serializable
+    object. Equal content always leads to the same hash.
+    """
+    if not isinstance(obj, bytes):
+        obj = to_json_bytes(obj)
+    return hashlib.blake2b(obj, digest_size=16).hexdigest()
+
+
+def spec_hash(spec: Any) -> str:
+    """Return a hash of a Vega or Vega-Lite spec or an Altair chart.
+
+    Pass it to the ``specHash`` property of the ``Vega`` component together with
+    the spec so that the component can detect changes to the spec without
+    comparing large specs in the browser.
+    """
+    if hasattr(spec, "to_dict"):
+        spec = spec.to_dict()
+    return content_hash(spec)
@@ -0,0 +1,435 @@
+import math
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from ._cache import MemoryBackend
+from ._hashing import content_hash
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_METHODS = ("lttb", "grid")
+# A level of the pyramid is used if it has at least this many times as many
+# visible points as the final result so that the final reduction has enough
+# candidates to pick from
+_OVERSAMPLING = 4
+# Each level of the pyramid has about a quarter of the points of the previous one
+_LEVEL_FACTOR = 4
+
+Domain = Tuple[float, float]
+
+
+def _as_float(values: Any) -> "np.ndarray":
+    """Numeric values as floats and timestamps as milliseconds since the epoch."""
+    import numpy as np
+    import pandas as pd
+    series = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        if getattr(series.dtype, "tz", None) is not None:
+            series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+        mask = series.isna().to_numpy()
+        result = series.to_numpy(dtype="datetime64[ms]").astype("int64").astype(float)
+        result[mask] = np.nan
+        return result
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def _domain_value(value: Any) -> float:
+    import pandas as pd
+
+    # Dates are reported by the browser as ISO strings
+    if isinstance(value, str):
+        timestamp = pd.Timestamp(value)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+        return timestamp.value / 1e6
+    return float(value)
+
+
+def _utc_timestamps(frame: Any) -> Any:
+    # Vega parses timestamps without a time zone in the local time of the
+    # browser while the zoom domains are compared to them as UTC. Send them
+    # as UTC so that both agree.
+    import pandas as pd
+
+    naive = [
+        column
+        for column, dtype in frame.dtypes.items()
+        if pd.api.types.is_datetime64_dtype(dtype)
+    ]
+    if not naive:
+        return frame
+    frame = frame.copy()
+    for column in naive:
+        frame[column] = frame[column].dt.tz_localize("UTC")
+    return frame
+
+
+def lttb(x: Any, y: Any, n_out: int) -> "np.ndarray":
+    """Select ``n_out`` points of a series with the Largest-Triangle-Three-Buckets
+    algorithm which keeps the visual shape of the series.
+
+    Returns the positions of the selected points. ``x`` has to be sorted.
+    """
+    import numpy as np
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # Bucket i covers the points [edges[i], edges[i + 1]). The first and last
+    # points are always kept.
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(int) + 1
+    edges[-1] = n - 1
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[1 : n - 1], edges[:-1] - 1) / counts
+    mean_y = np.add.reduceat(y[1 : n - 1], edges[:-1] - 1) / counts
+    # The mean of the bucket after the last one is the last point
+    mean_x = np.append(mean_x, x[-1])
+    mean_y = np.append(mean_y, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        bx, by = x[start:end], y[start:end]
+        areas = np.abs(
+            (x[a] - mean_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (mean_y[i + 1] - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def _min_max(
+    y: "np.ndarray", positions: "np.ndarray", bucket_size: int
+) -> "np.ndarray":
+    """Keep the points with the smallest and largest value of every bucket, and
+    the first and last point so that the range of x does not shrink."""
+    import numpy as np
+    n = len(positions)
+    n_full = n - n % bucket_size
+    buckets = y[positions[:n_full]].reshape(-1, bucket_size)
+    offsets = np.arange(0, n_full, bucket_size)
+    keep = [
+        np.array([0, n - 1]),
+        offsets + buckets.argmin(axis=1),
+        offsets + buckets.argmax(axis=1),
+    ]
+    if n_full < n:
+        rest = y[positions[n_full:]]
+        keep.append(np.array([n_full + rest.argmin(), n_full + rest.argmax()]))
+    return positions[np.unique(np.concatenate(keep))]
+
+
+def grid_bin(
+    x: Any,
+    y: Any,
+    x_domain: Domain,
+    y_domain: Domain,
+    shape: Tuple[int, int],
+    weights: "Optional[np.ndarray]" = None,
+) -> "Tuple[np.ndarray, np.ndarray]":
+    """Bin points into a grid of ``shape`` cells over the given domains and keep
+    the first point of every non-empty cell.
+
+    Returns the positions of the kept points and the number of points, or the
+    sum of ``weights``, in their cells.
+    """
+    import numpy as np
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    nx, ny = shape
+
+    def cell(values: np.ndarray, domain: Domain, n_cells: int) -> np.ndarray:
+        span = (domain[1] - domain[0]) or 1.0
+        return np.clip(((values - domain[0]) / span * n_cells).astype(np.int64), 0, n_cells - 1)
+
+    cells = cell(x, x_domain, nx) * ny + cell(y, y_domain, ny)
+    _, first, inverse = np.unique(cells, return_index=True, return_inverse=True)
+    counts = np.bincount(inverse, weights=weights, minlength=len(first))
+    order = np.argsort(first)
+    return first[order], counts[order]
+
+
+class LevelOfDetail:
+    """Send only the points of a large dataset which are needed to draw a line or
+    scatter chart at its current zoom level and width.
+
+    For series (``method="lttb"``), the points are reduced with the
+    Largest-Triangle-Three-Buckets algorithm to about ``points_per_pixel`` points per
+    pixel of the width. For scatter plots (``method="grid"``), the visible area is
+    divided into cells of ``cell_size`` pixels and one point per cell is kept,
+    together with the number of points in its cell in ``count_field``.
+
+    To answer requests for any zoom level quickly, a pyramid of reduced versions of
+    the data is computed once. Each request only reduces the visible part of the
+    coarsest level which still has enough detail.
+
+    The zoom level is read from ``signalData``: give the interval selection which is
+    bound to the scales a name and pass it as ``param``. Also observe the ``width``
+    and ``height`` signals to adapt the resolution to the size of the chart::
+
+        zoom = alt.selection_interval(bind="scales", name="zoom")
+        chart = alt.Chart(alt.NamedData("lod")).mark_line().encode(
+            x="time:T", y="value:Q"
+        ).add_params(zoom)
+
+        lod = dvc.LevelOfDetail(df, x="time", y="value", param="zoom")
+        app.layout = html.Div(
+            dvc.Vega(
+                id="chart",
+                spec=chart.to_dict(),
+                data=lod.data(),
+                signalsToObserve=["zoom", "width"],
+            )
+        )
+        lod.register_callback("chart")
+
+    Timestamps without a time zone are treated as UTC, also in the data which
+    is sent to the chart. Use a ``utc`` scale to show their wall-clock time, e.g.
+    ``alt.X("time:T", scale=alt.Scale(type="utc"))``.
+
+    Parameters
+    ----------
+    data
+        A pandas DataFrame.
+    x
+        Column on the x axis. For series, the points are sorted by it.
+    y
+        Column on the y axis.
+    name
+        Name of the dataset in the chart.
+    method
+        "lttb" for series and "grid" for scatter plots.
+    param
+        Name of the interval selection which is bound to the scales.
+    width, height
+        Size of the chart in pixels if it is not reported in ``signalData``.
+    points_per_pixel
+        Number of points per pixel of the width which are kept of a series.
+    cell_size
+        Size of the cells in pixels which are used for scatter plots.
+    count_field
+        Name of the field with the number of points per cell for scatter plots.
+        Set it to None to leave it out.
+    margin
+        Fraction of the visible domain which is added on each side so that
+        panning the chart does not immediately show empty areas.
+    cache_size
+        Number of results for different zoom levels which are kept in memory.
+    """
+
+    def __init__(
+        self,
+        data: Any,
+        x: str,
+        y: str,
+        name: str = "lod",
+        method: str = "lttb",
+        param: Optional[str] = None,
+        width: int = 800,
+        height: int = 400,
+        points_per_pixel: float = 1.0,
+        cell_size: float = 4.0,
+        count_field: Optional[str] = "count",
+        margin: float = 0.1,
+        cache_size: int = 32,
+    ):
+        import numpy as np
+        if method not in _METHODS:
+            raise ValueError(
+                f"method must be one of {', '.join(_METHODS)}, got {method!r}."
+            )
+        self.x = x
+        self.y = y
+        self.name = name
+        self.method = method
+        self.param = param
+        self.width = width
+        self.height = height
+        self.points_per_pixel = points_per_pixel
+        self.cell_size = cell_size
+        self.count_field = count_field
+        self.margin = margin
+        self._cache = MemoryBackend(maxsize=cache_size)
+
+        x_values = _as_float(data[x])
+        y_values = _as_float(data[y])
+        valid = ~(np.isnan(x_values) | np.isnan(y_values))
+        order = np.argsort(x_values[valid], kind="stable")
+        self._frame = data[valid].iloc[order].reset_index(drop=True)
+        self._x = x_values[valid][order]
+        self._y = y_values[valid][order]
+        self.x_domain: Domain = (
+            (float(self._x[0]), float(self._x[-1])) if len(self._x) else (0.0, 1.0)
+        )
+        self.y_domain: Domain = (
+            (float(self._y.min()), float(self._y.max())) if len(self._y) else (0.0, 1.0)
+        )
+        # Levels from coarse to fine as positions into the sorted data, and for
+        # grids the number of points which each position represents
+        self._levels: List[Tuple[np.ndarray, Optional[np.ndarray], int]] = (
+            self._grid_levels() if method == "grid" else self._series_levels()
+        )
+
+    def _series_levels(self) -> "List[Tuple[np.ndarray, Optional[np.ndarray], int]]":
+        import numpy as np
+        positions = np.arange(len(self._x))
+        levels = [(positions, None, 0)]
+        minimum = _OVERSAMPLING * self.width * self.points_per_pixel
+        bucket_size = 2 * _LEVEL_FACTOR
+        while len(positions) > _LEVEL_FACTOR * minimum:
+            positions = _min_max(self._y, positions, bucket_size)
+            levels.append((positions, None, 0))
+        return levels[::-1]
+
+    def _grid_levels(self) -> "List[Tuple[np.ndarray, Optional[np.ndarray], int]]":
+        import numpy as np
+        levels: List[Tuple[np.ndarray, Optional[np.ndarray], int]] = [
+            (np.arange(len(self._x)), None, 0)
+        ]
+        resolution = int(math.ceil(max(self.width, self.height) / self.cell_size))
+        while resolution**2 * _LEVEL_FACTOR < len(self._x):
+            positions, counts = grid_bin(
+                self._x, self._y, self.x_domain, self.y_domain, (resolution, resolution)
+            )
+            # Sorted by x so that the visible part can be found by bisection
+            order = np.argsort(self._x[positions], kind="stable")
+            levels.append((positions[order], counts[order], resolution))
+            resolution *= 2
+        # The raw data comes after the finest grid
+        return levels[1:] + levels[:1]
+
+    def domains(
+        self, signal_data: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Domain, Domain, float, float]:
+        """Return the visible x and y domains as well as the width and height of
+        the chart according to ``signalData``."""
+        signal_data = signal_data or {}
+        zoom = (signal_data.get(self.param) if self.param else None) or {}
+        x_domain, y_domain = self.x_domain, self.y_domain
+        if zoom.get(self.x):
+            x_domain = tuple(sorted(_domain_value(v) for v in zoom[self.x]))
+        if zoom.get(self.y):
+            y_domain = tuple(sorted(_domain_value(v) for v in zoom[self.y]))
+        width = signal_data.get("width")
+        height = signal_data.get("height")
+        return (
+            x_domain,
+            y_domain,
+            width if isinstance(width, (int, float)) and width > 0 else self.width,
+            height if isinstance(height, (int, float)) and height > 0 else self.height,
+        )
+
+    def points(
+        self,
+        x_domain: Optional[Domain] = None,
+        y_domain: Optional[Domain] = None,
+        width: Optional[float] = None,
+        height: Optional[float] = None,
+    ) -> Any:
+        """Return the rows of the DataFrame which are needed to draw the given
+        domains at the given size. Defaults to the whole data and the configured size.
+        """
+        x_domain = self._expand(x_domain or self.x_domain)
+        y_domain = self._expand(y_domain or self.y_domain)
+        width = width or self.width
+        height = height or self.height
+        if self.method == "grid":
+            return self._grid_points(x_domain, y_domain, width, height)
+        return self._series_points(x_domain, width)
+
+    def _expand(self, domain: Domain) -> Domain:
+        padding = (domain[1] - domain[0]) * self.margin
+        return (domain[0] - padding, domain[1] + padding)
+
+    def _visible(self, positions: "np.ndarray", x_domain: Domain) -> slice:
+        import numpy as np
+        x = self._x[positions]
+        return slice(
+            int(np.searchsorted(x, x_domain[0], side="left")),
+            int(np.searchsorted(x, x_domain[1], side="right")),
+        )
+
+    def _series_points(self, x_domain: Domain, width: float) -> Any:
+        target = max(int(width * self.points_per_pixel), 3)
+        # The last level is the raw data which is used if no level has enough
+        # visible points
+        for positions, _, _ in self._levels:
+            visible = self._visible(positions, x_domain)
+            if visible.stop - visible.start >= _OVERSAMPLING * target:
+                break
+        # Include the neighbors of the visible points so that lines continue
+        # to the edges of the chart
+        start = max(visible.start - 1, 0)
+        stop = min(visible.stop + 1, len(positions))
+        candidates = positions[start:stop]
+        selected = candidates[lttb(self._x[candidates], self._y[candidates], target)]
+        return self._frame.iloc[selected].reset_index(drop=True)
+
+    def _grid_points(
+        self, x_domain: Domain, y_domain: Domain, width: float, height: float
+    ) -> Any:
+        import numpy as np
+        shape = (
+            max(int(math.ceil(width / self.cell_size)), 1),
+            max(int(math.ceil(height / self.cell_size)), 1),
+        )
+        # Resolution of a grid over the whole data which matches the cells of the
+        # visible domains
+        x_span = (self.x_domain[1] - self.x_domain[0]) or 1.0
+        y_span = (self.y_domain[1] - self.y_domain[0]) or 1.0
+        needed = max(
+            shape[0] * x_span / ((x_domain[1] - x_domain[0]) or x_span),
+            shape[1] * y_span / ((y_domain[1] - y_domain[0]) or y_span),
+        )
+        for positions, counts, resolution in self._levels:
+            if resolution == 0 or resolution >= needed:
+                break
+        visible = self._visible(positions, x_domain)
+        positions = positions[visible]
+        counts = counts[visible] if counts is not None else None
+        y = self._y[positions]
+        in_y = (y >= y_domain[0]) & (y <= y_domain[1])
+        positions = positions[in_y]
+        counts = counts[in_y] if counts is not None else None
+        kept, cell_counts = grid_bin(
+            self._x[positions], self._y[positions], x_domain, y_domain, shape, counts
+        )
+        frame = self._frame.iloc[positions[kept]].reset_index(drop=True)
+        if self.count_field is not None:
+            frame[self.count_field] = cell_counts.astype(np.int64)
+        return frame
+
+    def data(self, signal_data: Optional[Dict[str, Any]] = None) -> Dict[str, list]:
+        """Return the value of the ``data`` property of the ``Vega`` component for
+        the zoom level and size in ``signalData``.
+        """
+        x_domain, y_domain, width, height = self.domains(signal_data)
+        key = content_hash([x_domain, y_domain, width, height])
+        records = self._cache.get(key)
+        if records is None:
+            points = self.points(x_domain, y_domain, width, height)
+            records = _utc_timestamps(points).to_dict("records")
+            self._cache.set(key, records)
+        return {self.name: records}
+
+    def register_callback(self, component_id: Any) -> None:
+        """Register a Dash callback which updates the data of the chart whenever
+        the zoom level or the size of the chart changes.
+
+        The chart has to observe ``param`` and the ``width`` and ``height`` signals
+        with ``signalsToObserve``. Changes are reported with the usual
+        ``debounceWait`` so that zooming does not trigger a callback per frame.
+        """
+        from dash import Input, Output, callback
+
+        @callback(
+            Output(component_id, "data"),
+            Input(component_id, "signalData"),
+            prevent_initial_call=True,
+        )
+        def update_level_of_detail(signal_data):
+            return self.data(signal_data)
@@ -0,0 +1,90 @@
+import base64
+from typing import Any, Dict, List, Optional
+
+from ._cache import MemoryBackend
+from ._compile import _import_vl_convert, _is_vega
+from ._hashing import content_hash
+
+_MIMETYPES = {"svg": "image/svg+xml", "png": "image/png"}
+
+# Data URLs of rendered images, shared by all calls of prerender
+_images = MemoryBackend(maxsize=128)
+
+
+def _render(
+    spec: Dict[str, Any],
+    format: str,
+    scale: float,
+    config: Optional[Dict[str, Any]],
+    theme: Optional[str],
+    ppi: Optional[float] = None,
+    allowed_base_urls: Optional[List[str]] = None,
+) -> bytes:
+    vlc = _import_vl_convert()
+    options: Dict[str, Any] = {}
+    if allowed_base_urls is not None:
+        options["allowed_base_urls"] = allowed_base_urls
+    if format in ("png", "pdf"):
+        options["scale"] = scale
+    if format == "png" and ppi is not None:
+        options["ppi"] = ppi
+    if _is_vega(spec):
+        image = getattr(vlc, f"vega_to_{format}")(spec, **options)
+    else:
+        if config is not None:
+            options["config"] = config
+        if theme is not None:
+            options["theme"] = theme
+        image = getattr(vlc, f"vegalite_to_{format}")(spec, **options)
+    return image.encode() if isinstance(image, str) else image
+
+
+def prerender(
+    spec: Any,
+    format: str = "svg",
+    scale: float = 1,
+    config: Optional[Dict[str, Any]] = None,
+    theme: Optional[str] = None,
+) -> str:
+    """Render a chart to an image on the server and return it as a data URL.
+
+    Pass the result to the ``prerendered`` property of the ``Vega`` component.
+    The image is shown immediately and replaced by the interactive chart once
+    it is rendered. Images are cached by the hash of the spec.
+    Requires `vl-convert-python <https://github.com/vega/vl-convert>`_.
+
+    Example::
+
+        spec = chart.to_dict()
+        dvc.Vega(id="chart", spec=spec, prerendered=dvc.prerender(spec))
+
+    Parameters
+    ----------
+    spec
+        An Altair chart, or a Vega-Lite or Vega spec as a dictionary.
+    format
+        "svg" (default) or "png". PNG images are shown with their size in pixels,
+        i.e. a scale of 2 doubles the size of the image in the browser.
+    scale
+        Scale factor of PNG images.
+    config
+        Vega-Lite config which is applied to Vega-Lite specs.
+    theme
+        Name of a Vega theme which is applied to Vega-Lite specs.
+    """
+    if format not in _MIMETYPES:
+        raise ValueError(
+            f"format must be one of {', '.join(_MIMETYPES)}, got {format!r}."
+        )
+    if hasattr(spec, "to_dict"):
+        spec = spec.to_dict()
+    key = content_hash([spec, format, scale, config, theme])
+    cached = _images.get(key)
+    if cached is None:
+        image = _render(spec, format, scale, config, theme)
+        cached = {
+            "url": f"data:{_MIMETYPES[format]};base64,"
+            + base64.b64encode(image).decode("ascii")
+        }
+        _images.set(key, cached)
+    return cached["url"]
@@ -0,0 +1,954 @@
+import ast
+import copy
+import functools
+import math
+import operator
+import re
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
+
+from ._cache import MemoryBackend
+from ._hashing import content_hash
+from ._selection import selection_mask
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Aggregation operations of Vega which have an equivalent in pandas
+_AGGREGATE_OPS: Dict[str, Callable[[Any], Any]] = {
+    "count": lambda s: s.size,
+    "valid": lambda s: s.count(),
+    "missing": lambda s: s.size - s.count(),
+    "distinct": lambda s: s.nunique(dropna=False),
+    "sum": lambda s: s.sum(),
+    "product": lambda s: s.prod(),
+    "mean": lambda s: s.mean(),
+    "average": lambda s: s.mean(),
+    "median": lambda s: s.median(),
+    "q1": lambda s: s.quantile(0.25),
+    "q3": lambda s: s.quantile(0.75),
+    "variance": lambda s: s.var(ddof=1),
+    "variancep": lambda s: s.var(ddof=0),
+    "stdev": lambda s: s.std(ddof=1),
+    "stdevp": lambda s: s.std(ddof=0),
+    "stderr": lambda s: s.sem(),
+    "min": lambda s: s.min(),
+    "max": lambda s: s.max(),
+}
+# Faster built-in aggregations of pandas for some of the operations
+_PANDAS_AGGREGATIONS = {
+    "valid": "count",
+    "sum": "sum",
+    "product": "prod",
+    "mean": "mean",
+    "average": "mean",
+    "median": "median",
+    "variance": "var",
+    "stdev": "std",
+    "stderr": "sem",
+    "min": "min",
+    "max": "max",
+}
+_TIME_UNIT_PARTS = (
+    "year",
+    "quarter",
+    "month",
+    "week",
+    "day",
+    "dayofyear",
+    "date",
+    "hours",
+    "minutes",
+    "seconds",
+    "milliseconds",
+)
+# Composite marks aggregate the raw rows themselves
+_COMPOSITE_MARKS = ("boxplot", "errorbar", "errorband")
+_POSITION_CHANNELS = {"x": "x2", "y": "y2"}
+_BIN_EPSILON = 1e-14
+
+
+class _Unsupported(Exception):
+    """Raised if a part of a spec cannot be evaluated on the server."""
+
+
+class TransformPushdown:
+    """Evaluate the transforms of a Vega-Lite spec with pandas on the server so that
+    only the reduced data is sent to the browser.
+
+    The leading ``filter``, ``bin``, ``timeUnit``, ``aggregate`` and ``joinaggregate``
+    transforms of the spec are evaluated on the server. If all of them can be
+    evaluated, aggregations in the encoding, e.g. ``y="count()"`` together with
+    ``alt.X("Horsepower", bin=True)``, are computed as well. All other transforms
+    stay in the spec and run in the browser on the reduced data.
+
+    If a pushed-down filter depends on parameters, e.g. a slider bound to
+    ``alt.param(name="threshold")`` or a selection, the transforms have to be
+    evaluated again whenever the parameter changes. The names of these parameters
+    are available as ``params``. Observe them with ``signalsToObserve`` and pass the
+    new data to the ``data`` property of the ``Vega`` component, which updates
+    the chart without re-rendering it. ``register_callback`` sets this up::
+
+        pushdown = dvc.TransformPushdown(chart)
+        app.layout = html.Div(
+            dvc.Vega(id="chart", spec=pushdown.spec, signalsToObserve=pushdown.params)
+        )
+        pushdown.register_callback("chart")
+
+    Parameters
+    ----------
+    chart
+        An Altair chart or a Vega-Lite spec as a dictionary.
+    data
+        The pandas DataFrame of the chart. Defaults to the data of the chart.
+    name
+        Name of the dataset in the rewritten spec.
+    cache_size
+        Number of results for different parameter values which are kept in memory.
+    """
+
+    def __init__(
+        self,
+        chart: Any,
+        data: Any = None,
+        name: str = "pushdown",
+        cache_size: int = 32,
+    ):
+        spec, self.source = _split_data(chart, data)
+        self.name = name
+        self._params = _collect_params(spec)
+        self._steps: List[Callable[[Any, Dict[str, Any]], Any]] = []
+        self._dependencies: Set[str] = set()
+        self._cache = MemoryBackend(maxsize=cache_size)
+
+        transforms = spec.get("transform", [])
+        n_pushed = 0
+        for transform in transforms:
+            dependencies = set(self._dependencies)
+            try:
+                self._steps.append(self._compile_transform(transform))
+            except _Unsupported:
+                self._dependencies = dependencies
+                break
+            n_pushed += 1
+        self.n_transforms = n_pushed
+
+        spec = copy.deepcopy(spec)
+        if n_pushed < len(transforms):
+            spec["transform"] = transforms[n_pushed:]
+        else:
+            spec.pop("transform", None)
+            try:
+                encoding, step = self._compile_encoding(spec)
+            except _Unsupported:
+                pass
+            else:
+                spec["encoding"] = encoding
+                self._steps.append(step)
+        spec["data"] = {"name": name}
+        self._spec = spec
+
+    @property
+    def params(self) -> List[str]:
+        """Names of the parameters on which the evaluated transforms depend."""
+        return sorted(self._dependencies)
+
+    @property
+    def spec(self) -> Dict[str, Any]:
+        """The rewritten spec including the reduced data for the default values
+        of the parameters."""
+        spec = copy.deepcopy(self._spec)
+        spec.setdefault("datasets", {})[self.name] = self.data()[self.name]
+        return spec
+
+    def evaluate(self, signal_data: Optional[Dict[str, Any]] = None) -> Any:
+        """Return the reduced data as a DataFrame.
+
+        Parameters
+        ----------
+        signal_data
+            The ``signalData`` property of the ``Vega`` component. Parameters which
+            are not part of it use the default value in the spec.
+        """
+        values = self._param_values(signal_data)
+        df = self.source
+        for step in self._steps:
+            df = step(df, values)
+        return df
+
+    def data(self, signal_data: Optional[Dict[str, Any]] = None) -> Dict[str, list]:
+        """Return the reduced data in the format of the ``data`` property of
+        the ``Vega`` component.
+        """
+        values = self._param_values(signal_data)
+        key = content_hash({p: values.get(p) for p in self.params})
+        records = self._cache.get(key)
+        if records is None:
+            records = self.evaluate(signal_data).to_dict("records")
+            self._cache.set(key, records)
+        return {self.name: records}
+
+    def register_callback(self, component_id: Any) -> None:
+        """Register a Dash callback which updates the data of the chart whenever
+        one of the ``params`` changes.
+
+        The chart has to observe the parameters with ``signalsToObserve``.
+        """
+        from dash import Input, Output, callback
+
+        if not self.params:
+            return
+
+        @callback(
+            Output(component_id, "data"),
+            Input(component_id, "signalData"),
+            prevent_initial_call=True,
+        )
+        def update_pushdown_data(signal_data):
+            return self.data(signal_data)
+
+    def _param_values(self, signal_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        values = {
+            name: param.get("value")
+            for name, param in self._params.items()
+            if "select" not in param
+        }
+        values.update(signal_data or {})
+        return values
+
+    def _compile_transform(
+        self, transform: Dict[str, Any]
+    ) -> Callable[[Any, Dict[str, Any]], Any]:
+        if "filter" in transform and len(transform) == 1:
+            predicate = self._compile_predicate(transform["filter"])
+            return lambda df, values: df[predicate(df, values)]
+        if "bin" in transform:
+            field = _field_name(transform.get("field"))
+            bin_params = _bin_params(transform["bin"])
+            default = _bin_name(bin_params, field)
+            names = transform.get("as", default)
+            if isinstance(names, str):
+                names = [names, names + "_end"]
+
+            def apply_bin(df, values):
+                start, end = _bin(df[field], **bin_params)
+                return df.assign(**{names[0]: start, names[1]: end})
+
+            return apply_bin
+        if "timeUnit" in transform:
+            field = _field_name(transform.get("field"))
+            unit = _time_unit(transform["timeUnit"])
+            name = transform.get("as", f"{unit}_{field}")
+            return lambda df, values: df.assign(
+                **{name: _apply_time_unit(df[field], unit)}
+            )
+        if "aggregate" in transform:
+            aggregates = [self._aggregate_def(a) for a in transform["aggregate"]]
+            groupby = [_field_name(f) for f in transform.get("groupby", [])]
+            return lambda df, values: _aggregate(df, groupby, aggregates)
+        if "joinaggregate" in transform:
+            aggregates = [self._aggregate_def(a) for a in transform["joinaggregate"]]
+            groupby = [_field_name(f) for f in transform.get("groupby", [])]
+            return lambda df, values: _join_aggregate(df, groupby, aggregates)
+        raise _Unsupported()
+
+    def _aggregate_def(self, aggregate: Dict[str, Any]) -> Tuple[str, str, str]:
+        op = aggregate.get("op")
+        if not isinstance(op, str) or op not in _AGGREGATE_OPS:
+            raise _Unsupported()
+        field = aggregate.get("field")
+        field = _field_name(field) if field is not None else None
+        if field is None and op != "count":
+            raise _Unsupported()
+        return op, field, aggregate.get("as", f"{op}_{field}" if field else "__count")
+
+    def _compile_predicate(self, predicate: Any) -> Callable[[Any, Dict], Any]:
+        import numpy as np
+        if isinstance(predicate, str):
+            return self._compile_expression(predicate)
+        if not isinstance(predicate, dict):
+            raise _Unsupported()
+        if "and" in predicate or "or" in predicate:
+            key = "and" if "and" in predicate else "or"
+            combine = np.logical_and if key == "and" else np.logical_or
+            parts = [self._compile_predicate(p) for p in predicate[key]]
+            return lambda df, values: functools.reduce(
+                combine,
+                (_mask(p(df, values), len(df)) for p in parts),
+                np.full(len(df), key == "and"),
+            )
+        if "not" in predicate:
+            inner = self._compile_predicate(predicate["not"])
+            return lambda df, values: ~_mask(inner(df, values), len(df))
+        if "param" in predicate:
+            return self._compile_param_predicate(predicate)
+        if "field" in predicate and "timeUnit" not in predicate:
+            return self._compile_field_predicate(predicate)
+        raise _Unsupported()
+
+    def _compile_param_predicate(self, predicate: Dict[str, Any]):
+        import numpy as np
+        name = predicate["param"]
+        param = self._params.get(name)
+        if param is None:
+            raise _Unsupported()
+        self._dependencies.add(name)
+        select = param.get("select")
+        if select is None:
+            return lambda df, values: np.full(len(df), bool(values.get(name)))
+        select_type = select if isinstance(select, str) else select.get("type")
+        empty = "all" if predicate.get("empty", True) else "none"
+        return lambda df, values: selection_mask(
+            df, values, selections={name: select_type}, empty=empty
+        )
+
+    def _compile_field_predicate(self, predicate: Dict[str, Any]):
+        import numpy as np
+        field = _field_name(predicate["field"])
+        tests = []
+        for key, compare in (
+            ("equal", operator.eq),
+            ("lt", operator.lt),
+            ("lte", operator.le),
+            ("gt", operator.gt),
+            ("gte", operator.ge),
+        ):
+            if key in predicate:
+                value = self._literal(predicate[key])
+                tests.append(
+                    lambda s, values, v=value, c=compare: c(s, _coerce(s, v(values)))
+                )
+        if "range" in predicate:
+            bounds = predicate["range"]
+            if not isinstance(bounds, list) or len(bounds) != 2:
+                raise _Unsupported()
+            low, high = (self._literal(b) for b in bounds)
+
+            def in_range(s, values):
+                mask = np.ones(len(s), dtype=bool)
+                lo, hi = low(values), high(values)
+                if lo is not None:
+                    mask &= s >= _coerce(s, lo)
+                if hi is not None:
+                    mask &= s <= _coerce(s, hi)
+                return mask
+
+            tests.append(in_range)
+        if "oneOf" in predicate:
+            options = [self._literal(v) for v in predicate["oneOf"]]
+            tests.append(
+                lambda s, values: s.isin([_coerce(s, o(values)) for o in options])
+            )
+        if "valid" in predicate:
+            valid = bool(predicate["valid"])
+            tests.append(lambda s, values: s.notna() == valid)
+        if not tests:
+            raise _Unsupported()
+
+        def test(df, values):
+            series = df[field]
+            mask = np.ones(len(df), dtype=bool)
+            for t in tests:
+                mask &= _mask(t(series, values), len(df))
+            return mask
+
+        return test
+
+    def _literal(self, value: Any) -> Callable[[Dict[str, Any]], Any]:
+        if isinstance(value, dict) and "expr" in value:
+            name = value["expr"].strip()
+            if name not in self._params:
+                raise _Unsupported()
+            self._dependencies.add(name)
+            return lambda values: values.get(name)
+        if isinstance(value, dict):
+            timestamp = _datetime_literal(value)
+            return lambda values: timestamp
+        return lambda values: value
+
+    def _compile_expression(self, expression: str):
+        tree = _ExpressionParser(expression).parse()
+        names = _expression_params(tree)
+        if not names.issubset(self._params):
+            raise _Unsupported()
+        self._dependencies.update(names)
+        return lambda df, values: _mask(
+            _evaluate_expression(tree, df, values), len(df)
+        )
+
+    def _compile_encoding(self, spec: Dict[str, Any]):
+        mark = spec.get("mark")
+        mark_type = mark.get("type") if isinstance(mark, dict) else mark
+        encoding = spec.get("encoding")
+        if mark_type is None or mark_type in _COMPOSITE_MARKS or not encoding:
+            raise _Unsupported()
+
+        definitions = []
+        for channel, value in encoding.items():
+            for position, fdef in enumerate(value if isinstance(value, list) else [value]):
+                if not isinstance(fdef, dict) or not (
+                    "field" in fdef or "aggregate" in fdef
+                ):
+                    continue
+                condition = fdef.get("condition")
+                if isinstance(condition, dict) and "field" in condition:
+                    raise _Unsupported()
+                if isinstance(fdef.get("sort"), dict) and "op" in fdef["sort"]:
+                    raise _Unsupported()
+                definitions.append((channel, position, fdef))
+        if not any("aggregate" in fdef for _, _, fdef in definitions):
+            raise _Unsupported()
+
+        groupby: List[str] = []
+        derived: List[Callable[[Any], Dict[str, Any]]] = []
+        aggregates: List[Tuple[str, str, str]] = []
+        new_encoding = copy.deepcopy(encoding)
+
+        def set_definition(channel, position, fdef):
+            if isinstance(new_encoding[channel], list):
+                new_encoding[channel][position] = fdef
+            else:
+                new_encoding[channel] = fdef
+
+        for channel, position, fdef in definitions:
+            field = _field_name(fdef["field"]) if "field" in fdef else None
+            new_def = copy.deepcopy(fdef)
+            if "aggregate" in fdef:
+                op = fdef["aggregate"]
+                # Also argmin and argmax, which are given as dictionaries
+                if not isinstance(op, str) or op not in _AGGREGATE_OPS:
+                    raise _Unsupported()
+                if field is None and op != "count":
+                    raise _Unsupported()
+                name = f"{op}_{field}" if op != "count" else "__count"
+                aggregates.append((op, field, name))
+                new_def.pop("aggregate")
+                new_def.setdefault("type", "quantitative")
+                new_def.setdefault(
+                    "title", "Count of Records" if op == "count" else f"{op.title()} of {field}"
+                )
+            elif fdef.get("bin"):
+                secondary = _POSITION_CHANNELS.get(channel)
+                if secondary is None or secondary in encoding:
+                    raise _Unsupported()
+                bin_params = _bin_params(fdef["bin"])
+                name = _bin_name(bin_params, field)
+                derived.append(
+                    lambda df, f=field, n=name, p=bin_params: dict(
+                        zip((n, n + "_end"), _bin(df[f], **p))
+                    )
+                )
+                groupby += [name, name + "_end"]
+                new_def["bin"] = "binned"
+                new_def.setdefault("title", f"{field} (binned)")
+                new_encoding[secondary] = {"field": name + "_end"}
+            elif "timeUnit" in fdef:
+                unit = _time_unit(fdef["timeUnit"])
+                name = f"{unit}_{field}"
+                derived.append(
+                    lambda df, f=field, n=name, u=unit: {n: _apply_time_unit(df[f], u)}
+                )
+                groupby.append(name)
+                # Applying the time unit again in the browser does not change
+                # the values but keeps the formatting of the axis
+                new_def.setdefault(
+                    "title", f"{field} ({'-'.join(_time_unit_parts(unit)[1])})"
+                )
+            else:
+                name = field
+                groupby.append(name)
+            new_def["field"] = name
+            set_definition(channel, position, new_def)
+
+        groupby = list(dict.fromkeys(groupby))
+
+        def apply_encoding(df, values):
+            columns = {}
+            for derive in derived:
+                columns.update(derive(df))
+            if columns:
+                df = df.assign(**columns)
+            return _aggregate(df, groupby, aggregates)
+
+        return new_encoding, apply_encoding
+
+
+def _split_data(chart: Any, data: Any) -> Tuple[Dict[str, Any], Any]:
+    import pandas as pd
+
+    if hasattr(chart, "to_dict"):
+        chart_data = getattr(chart, "data", None)
+        if data is None and isinstance(chart_data, pd.DataFrame):
+            data = chart_data
+        if data is None:
+            raise ValueError(
+                "The data of the chart has to be a pandas DataFrame. "
+                "Alternatively, pass it as data."
+            )
+        # Use an empty DataFrame with the same columns so that Altair can
+        # infer the types of the fields without serializing the data
+        chart = chart.copy(deep=False)
+        chart.data = data.iloc[:0]
+        spec = chart.to_dict()
+        spec.pop("datasets", None)
+        return spec, data
+    spec = dict(chart)
+    if data is None:
+        spec_data = spec.get("data") or {}
+        if "values" in spec_data:
+            data = pd.DataFrame(spec_data["values"])
+        elif spec_data.get("name") in spec.get("datasets", {}):
+            data = pd.DataFrame(spec["datasets"][spec_data["name"]])
+        else:
+            raise ValueError(
+                "The spec has to contain the data inline. Alternatively, pass it as data."
+            )
+    if "datasets" in spec and spec.get("data", {}).get("name") in spec["datasets"]:
+        spec["datasets"] = {
+            k: v for k, v in spec["datasets"].items() if k != spec["data"]["name"]
+        }
+        if not spec["datasets"]:
+            del spec["datasets"]
+    return spec, data
+
+
+def _collect_params(spec: Any) -> Dict[str, Dict[str, Any]]:
+    params = {}
+
+    def visit(obj: Any) -> None:
+        if isinstance(obj, list):
+            for item in obj:
+                visit(item)
+        elif isinstance(obj, dict):
+            for param in obj.get("params", None) or []:
+                if isinstance(param, dict) and "name" in param:
+                    params[param["name"]] = param
+            for key, value in obj.items():
+                if key not in ("params", "data", "datasets"):
+                    visit(value)
+
+    visit(spec)
+    return params
+
+
+def _field_name(field: Any) -> str:
+    # Nested fields and escaped characters are resolved differently by Vega
+    if not isinstance(field, str) or any(c in field for c in ".[\\"):
+        raise _Unsupported()
+    return field
+
+
+def _mask(result: Any, length: int) -> "np.ndarray":
+    # Comparisons of constants return a single boolean for all rows
+    import numpy as np
+    return np.broadcast_to(np.asarray(result, dtype=bool), (length,)).copy()
+
+
+def _aggregate(df: Any, groupby: List[str], aggregates: List[Tuple[str, str, str]]):
+    """Aggregate like Vega, i.e. one row per group in the order in which the groups
+    appear in the data and missing values form a group of their own."""
+    import pandas as pd
+
+    if not groupby:
+        return pd.DataFrame(
+            [
+                {
+                    name: len(df) if op == "count" else _AGGREGATE_OPS[op](df[field])
+                    for op, field, name in aggregates
+                }
+            ]
+        )
+    grouped = df.groupby(groupby, sort=False, dropna=False)
+    columns = {}
+    for op, field, name in aggregates:
+        if op == "count":
+            columns[name] = grouped.size()
+        else:
+            columns[name] = grouped[field].agg(
+                _PANDAS_AGGREGATIONS.get(op, _AGGREGATE_OPS[op])
+            )
+    return pd.DataFrame(columns).reset_index()
+
+
+def _join_aggregate(df: Any, groupby: List[str], aggregates: List[Tuple[str, str, str]]):
+    columns = {}
+    grouped = df.groupby(groupby, sort=False, dropna=False) if groupby else None
+    for op, field, name in aggregates:
+        if grouped is None:
+            columns[name] = len(df) if op == "count" else _AGGREGATE_OPS[op](df[field])
+        elif op == "count":
+            columns[name] = grouped[groupby[0]].transform("size")
+        else:
+            columns[name] = grouped[field].transform(
+                _PANDAS_AGGREGATIONS.get(op, _AGGREGATE_OPS[op])
+            )
+    return df.assign(**columns)
+
+
+def _bin_params(bin: Any) -> Dict[str, Any]:
+    if bin is True:
+        return {"maxbins": 10}
+    if not isinstance(bin, dict):
+        raise _Unsupported()
+    supported = {"maxbins", "base", "divide", "extent", "step", "steps", "minstep", "nice"}
+    if not set(bin).issubset(supported) or isinstance(bin.get("extent"), dict):
+        raise _Unsupported()
+    return {"maxbins": 10, **bin}
+
+
+def _bin_name(bin_params: Dict[str, Any], field: str) -> str:
+    parts = "".join(
+        "_{}_{}".format(key, re.sub(r"\W", "_", str(value)))
+        for key, value in bin_params.items()
+    )
+    return f"bin{parts}_{field}"
+
+
+def _bin_extent(
+    extent: Tuple[float, float],
+    maxbins: int = 10,
+    base: float = 10,
+    divide: Tuple[float, ...] = (5, 2),
+    step: Optional[float] = None,
+    steps: Optional[List[float]] = None,
+    minstep: float = 0,
+    nice: bool = True,
+) -> Tuple[float, float, float]:
+    """Compute the start, stop and step of the bins in the same way as Vega."""
+    low, high = extent
+    logb = math.log(base)
+    span = (high - low) or abs(low) or 1
+    if step is None and steps:
+        target = span / maxbins
+        i = 0
+        while i < len(steps) and steps[i] < target:
+            i += 1
+        step = steps[max(0, i - 1)]
+    elif step is None:
+        level = math.ceil(math.log(maxbins) / logb)
+        step = max(minstep, base ** (round(math.log(span) / logb) - level))
+        while math.ceil(span / step) > maxbins:
+            step *= base
+        for div in divide:
+            v = step / div
+            if v >= minstep and span / v <= maxbins:
+                step = v
+    v = math.log(step)
+    precision = 0 if v >= 0 else int(-v / logb) + 1
+    eps = base ** (-precision - 1)
+    if nice:
+        v = math.floor(low / step + eps) * step
+        low = v - step if low < v else v
+        high = math.ceil(high / step) * step
+    return low, (low + step if high == low else high), step
+
+
+def _bin(series: Any, extent: Optional[List[float]] = None, **params: Any):
+    import numpy as np
+    values = series.to_numpy(dtype="float64", na_value=np.nan)
+    if extent is None:
+        valid = values[~np.isnan(values)]
+        if not len(valid):
+            return values, values
+        extent = (valid.min(), valid.max())
+    start, stop, step = _bin_extent(tuple(extent), **params)
+    clipped = np.clip(values, start, stop - step)
+    bins = start + step * np.floor(_BIN_EPSILON + (clipped - start) / step)
+    # Values outside of an explicit extent are not part of any bin
+    bins[(values < start) | (values > stop)] = np.nan
+    return bins, bins + step
+
+
+def _time_unit(time_unit: Any) -> str:
+    if isinstance(time_unit, dict):
+        if not set(time_unit).issubset({"unit", "utc"}) or "unit" not in time_unit:
+            raise _Unsupported()
+        unit = time_unit["unit"]
+        if time_unit.get("utc") and not unit.startswith("utc"):
+            unit = "utc" + unit
+        time_unit = unit
+    _time_unit_parts(time_unit)
+    return time_unit
+
+
+def _time_unit_parts(unit: str) -> Tuple[bool, List[str]]:
+    utc = unit.startswith("utc")
+    full_unit = unit[3:] if utc else unit
+    parts = []
+    for part in _TIME_UNIT_PARTS:
+        index = full_unit.find(part)
+        if index < 0:
+            continue
+        if part == "seconds" and index > 0 and full_unit[index - 1] == "i":
+            continue
+        if part == "day" and full_unit[index + 3 : index + 4] == "o":
+            continue
+        parts.append(part)
+    if "".join(parts) != full_unit or not parts:
+        raise _Unsupported()
+    if {"week", "dayofyear"} & set(parts) or (
+        "day" in parts and {"year", "quarter", "month", "date"} & set(parts)
+    ):
+        # Vega uses week-based calendars for these units
+        raise _Unsupported()
+    return utc, parts
+
+
+def _apply_time_unit(series: Any, unit: str) -> Any:
+    """Truncate timestamps to a time unit. As in Vega-Lite, missing parts default
+    to the start of the year 2012."""
+    import pandas as pd
+
+    utc, parts = _time_unit_parts(unit)
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = pd.to_datetime(series)
+    if getattr(series.dtype, "tz", None) is not None:
+        series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+    dt = series.dt
+    if "month" in parts:
+        month = dt.month
+    elif "quarter" in parts:
+        month = (dt.quarter - 1) * 3 + 1
+    else:
+        month = 1
+    if "date" in parts:
+        day = dt.day
+    elif "day" in parts:
+        # 2012-01-01 is a Sunday which is day 0 in JavaScript
+        day = 1 + (dt.dayofweek + 1) % 7
+    else:
+        day = 1
+    components = pd.DataFrame(
+        {
+            "year": dt.year if "year" in parts else 2012,
+            "month": month,
+            "day": day,
+            "hour": dt.hour if "hours" in parts else 0,
+            "minute": dt.minute if "minutes" in parts else 0,
+            "second": dt.second if "seconds" in parts else 0,
+            "ms": dt.microsecond // 1000 if "milliseconds" in parts else 0,
+        },
+        index=series.index,
+    )
+    result = pd.to_datetime(components.where(series.notna()), errors="coerce")
+    return result.dt.tz_localize("UTC") if utc else result
+
+
+def _datetime_literal(value: Dict[str, Any]) -> Any:
+    import pandas as pd
+
+    if not set(value).issubset(
+        {"year", "quarter", "month", "date", "hours", "minutes", "seconds", "milliseconds", "utc"}
+    ):
+        raise _Unsupported()
+    month = value.get("month", 1)
+    if isinstance(month, str):
+        month = pd.Timestamp(f"{month} 1 2012").month
+    elif "quarter" in value:
+        month = (value["quarter"] - 1) * 3 + 1
+    timestamp = pd.Timestamp(
+        year=value.get("year", 2012),
+        month=month,
+        day=value.get("date", 1),
+        hour=value.get("hours", 0),
+        minute=value.get("minutes", 0),
+        second=value.get("seconds", 0),
+        microsecond=value.get("milliseconds", 0) * 1000,
+    )
+    return timestamp.tz_localize("UTC") if value.get("utc") else timestamp
+
+
+def _coerce(series: Any, value: Any) -> Any:
+    """Convert a literal so that it can be compared with the values of a column.
+    Vega compares timestamps as milliseconds since the epoch."""
+    import pandas as pd
+
+    if value is None or not pd.api.types.is_datetime64_any_dtype(series):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = pd.Timestamp(value, unit="ms")
+    else:
+        value = pd.Timestamp(value)
+    tz = getattr(series.dtype, "tz", None)
+    if tz is not None and value.tzinfo is None:
+        value = value.tz_localize("UTC")
+    elif tz is None and value.tzinfo is not None:
+        value = value.tz_convert(None)
+    return value
+
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+        |(?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+        |(?P<op>===|!==|==|!=|<=|>=|&&|\|\||[<>!()\[\].-])
+        |(?P<name>[A-Za-z_$][\w$]*)
+    )""",
+    re.VERBOSE,
+)
+_COMPARISONS = {
+    "==": operator.eq,
+    "===": operator.eq,
+    "!=": operator.ne,
+    "!==": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+_CONSTANTS = {"true": True, "false": False, "null": None}
+
+
+def _string_literal(token: str) -> str:
+    # The escape sequences of JavaScript strings which filters use are the
+    # same as in Python. Others, e.g. \u{1F600}, are left to the browser.
+    try:
+        value = ast.literal_eval(token)
+    except (SyntaxError, ValueError):
+        raise _Unsupported() from None
+    if not isinstance(value, str):
+        raise _Unsupported()
+    return value
+
+
+class _ExpressionParser:
+    """Parse the subset of Vega expressions which filters typically use, i.e.
+    comparisons of fields with constants or parameters combined with ``&&``,
+    ``||`` and ``!``, e.g. ``(datum.Horsepower > threshold)``.
+    """
+
+    def __init__(self, expression: str):
+        self.tokens = []
+        position = 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = _TOKEN.match(expression, position)
+            if match is None or match.end() == position:
+                raise _Unsupported()
+            self.tokens.append((match.lastgroup, match.group(match.lastgroup)))
+            position = match.end()
+        self.position = 0
+
+    def parse(self) -> tuple:
+        tree = self.parse_or()
+        if self.position != len(self.tokens):
+            raise _Unsupported()
+        return tree
+
+    def peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self, value: Optional[str] = None) -> Tuple[str, str]:
+        token = self.peek()
+        if token is None or (value is not None and token[1] != value):
+            raise _Unsupported()
+        self.position += 1
+        return token
+
+    def parse_or(self) -> tuple:
+        tree = self.parse_and()
+        while self.peek() == ("op", "||"):
+            self.take()
+            tree = ("or", tree, self.parse_and())
+        return tree
+
+    def parse_and(self) -> tuple:
+        tree = self.parse_not()
+        while self.peek() == ("op", "&&"):
+            self.take()
+            tree = ("and", tree, self.parse_not())
+        return tree
+
+    def parse_not(self) -> tuple:
+        if self.peek() == ("op", "!"):
+            self.take()
+            return ("not", self.parse_not())
+        if self.peek() == ("op", "("):
+            self.take()
+            tree = self.parse_or()
+            self.take(")")
+            return tree
+        left = self.parse_operand()
+        token = self.peek()
+        if token is None or token[1] not in _COMPARISONS:
+            if left[0] != "param":
+                raise _Unsupported()
+            return ("truthy", left)
+        self.take()
+        return ("compare", token[1], left, self.parse_operand())
+
+    def parse_operand(self) -> tuple:
+        kind, value = self.take()
+        if kind == "number":
+            return ("constant", float(value))
+        if kind == "string":
+            return ("constant", _string_literal(value))
+        if kind == "op" and value == "-":
+            kind, value = self.take()
+            if kind != "number":
+                raise _Unsupported()
+            return ("constant", -float(value))
+        if kind != "name":
+            raise _Unsupported()
+        if value in _CONSTANTS:
+            return ("constant", _CONSTANTS[value])
+        if value != "datum":
+            return ("param", value)
+        if self.peek() == ("op", "."):
+            self.take()
+            kind, field = self.take()
+            if kind != "name":
+                raise _Unsupported()
+        else:
+            self.take("[")
+            kind, field = self.take()
+            if kind != "string":
+                raise _Unsupported()
+            field = _string_literal(field)
+            self.take("]")
+        return ("field", field)
+
+
+def _expression_params(tree: tuple) -> Set[str]:
+    if tree[0] == "param":
+        return {tree[1]}
+    return set().union(
+        *(_expression_params(node) for node in tree[1:] if isinstance(node, tuple))
+    )
+
+
+def _evaluate_expression(tree: tuple, df: Any, values: Dict[str, Any]) -> Any:
+    import numpy as np
+    kind = tree[0]
+    if kind == "and":
+        return np.logical_and(
+            _evaluate_expression(tree[1], df, values),
+            _evaluate_expression(tree[2], df, values),
+        )
+    if kind == "or":
+        return np.logical_or(
+            _evaluate_expression(tree[1], df, values),
+            _evaluate_expression(tree[2], df, values),
+        )
+    if kind == "not":
+        return np.logical_not(_evaluate_expression(tree[1], df, values))
+    if kind == "truthy":
+        return bool(_evaluate_expression(tree[1], df, values))
+    if kind == "constant":
+        return tree[1]
+    if kind == "param":
+        return values.get(tree[1])
+    if kind == "field":
+        return df[tree[1]]
+    _, op, left, right = tree
+    left = _evaluate_expression(left, df, values)
+    right = _evaluate_expression(right, df, values)
+    if not hasattr(left, "dtype"):
+        if not hasattr(right, "dtype"):
+            return _COMPARISONS[op](left, right)
+        left, right = right, left
+        op = {"<": ">", "<=": ">=", ">": "<", ">=": "<="}.get(op, op)
+    if right is None and op in ("==", "===", "!=", "!=="):
+        return left.isna() if op in ("==", "===") else left.notna()
+    if not hasattr(right, "dtype"):
+        right = _coerce(left, right)
+    return _COMPARISONS[op](left, right)
@@ -0,0 +1,347 @@
+import warnings
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+_VEGA_ID = "_vgsid_"
+_POINT_KEYS = ("vlPoint", "vlMulti")
+
+
+def selection_types(spec: Dict[str, Any]) -> Dict[str, str]:
+    """Return the names of all selection parameters in a Vega-Lite spec, e.g. as
+    created by Altair, together with their type ("interval" or "point").
+    """
+    types = {}
+
+    def visit(obj: Any) -> None:
+        if isinstance(obj, list):
+            for item in obj:
+                visit(item)
+        elif isinstance(obj, dict):
+            for param in obj.get("params", None) or []:
+                select = param.get("select") if isinstance(param, dict) else None
+                if select is None:
+                    continue
+                select_type = select if isinstance(select, str) else select.get("type")
+                types[param["name"]] = select_type
+            for key, value in obj.items():
+                if key not in ("params", "data", "datasets"):
+                    visit(value)
+
+    visit(spec)
+    return types
+
+
+class SelectionIndex:
+    """Precomputed lookup structures for fast, repeated filtering of a DataFrame
+    based on selections, e.g. when a user moves a brush over a chart with
+    millions of rows.
+
+    For numeric and temporal columns, the sort order is computed once so that
+    an interval can be found with a binary search. For all other columns,
+    the values are encoded as integer codes so that a point selection only
+    compares integers.
+
+    Parameters
+    ----------
+    data
+        The pandas DataFrame or pyarrow Table which is filtered. The index
+        is only valid as long as the data is not modified.
+    columns
+        The columns to index. Defaults to all columns.
+    """
+
+    def __init__(self, data: Any, columns: Optional[Iterable[str]] = None):
+        import numpy as np
+        self.n_rows = len(data)
+        self._sorted: Dict[str, tuple] = {}
+        self._codes: Dict[str, tuple] = {}
+        for column in columns if columns is not None else _column_names(data):
+            values = _column_values(data, column)
+            if _is_orderable(values):
+                order = np.argsort(values, kind="stable")
+                self._sorted[column] = (order, values[order])
+            else:
+                import pandas as pd
+
+                codes, uniques = pd.factorize(values, use_na_sentinel=True)
+                self._codes[column] = (
+                    codes,
+                    {value: code for code, value in enumerate(uniques)},
+                )
+
+    def range_mask(self, column: str, low: Any, high: Any) -> "Optional[np.ndarray]":
+        import numpy as np
+        if column not in self._sorted:
+            return None
+        order, sorted_values = self._sorted[column]
+        low, high = _coerce_bounds(sorted_values, low, high)
+        start = np.searchsorted(sorted_values, low, side="left")
+        stop = np.searchsorted(sorted_values, high, side="right")
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[order[start:stop]] = True
+        return mask
+
+    def isin_mask(self, column: str, values: Sequence[Any]) -> "Optional[np.ndarray]":
+        import numpy as np
+        if column not in self._codes:
+            return None
+        codes, lookup = self._codes[column]
+        selected = np.zeros(len(lookup) + 1, dtype=bool)
+        for value in values:
+            code = lookup.get(value)
+            if code is not None:
+                selected[code] = True
+        # Missing values have the code -1 and therefore map to the last
+        # entry which is never selected
+        return selected[codes]
+
+
+def selection_mask(
+    data: Any,
+    signal_data: Dict[str, Any],
+    spec: Optional[Dict[str, Any]] = None,
+    selections: Optional[Union[Sequence[str], Mapping[str, str]]] = None,
+    index: Optional[SelectionIndex] = None,
+    empty: str = "all",
+) -> "np.ndarray":
+    """Return a boolean array which is True for all rows of ``data`` which are
+    part of the selections in ``signal_data``.
+
+    See :func:`filter_selection` for a description of the parameters.
+    """
+    import numpy as np
+    if empty not in ("all", "none"):
+        raise ValueError("empty must be either 'all' or 'none'.")
+    types = _resolve_types(signal_data, spec, selections)
+    mask = np.ones(len(data), dtype=bool)
+    for name, select_type in types.items():
+        value = signal_data.get(name)
+        if not value:
+            if empty == "none":
+                mask[:] = False
+            continue
+        if select_type == "interval":
+            mask &= _interval_mask(data, value, index)
+        else:
+            mask &= _point_mask(data, value, index)
+    return mask
+
+
+def filter_selection(
+    data: Any,
+    signal_data: Dict[str, Any],
+    spec: Optional[Dict[str, Any]] = None,
+    selections: Optional[Union[Sequence[str], Mapping[str, str]]] = None,
+    index: Optional[SelectionIndex] = None,
+    empty: str = "all",
+) -> Any:
+    """Filter a DataFrame to the rows which are selected in a chart.
+
+    Supports interval selections (e.g. brushes), point selections on one or multiple
+    fields, and point selections without fields which are identified by
+    the ``_vgsid_`` of a row. Multiple selections are combined with a logical AND.
+    The ``_vgsid_`` is mapped to the position of the row, which is only correct
+    for a chart with a single dataset whose data was never updated, and a
+    warning is emitted. Define point selections with ``fields`` instead.
+
+    Example::
+
+        @callback(Output("table", "data"), Input("chart", "signalData"))
+        def update_table(signal_data):
+            filtered = dvc.filter_selection(
+                source, signal_data, selections=["brush_selection"]
+            )
+            return filtered.to_dict("records")
+
+    Parameters
+    ----------
+    data
+        A pandas DataFrame or a pyarrow Table. It has to be the same data,
+        in the same order, as the one used in the chart.
+    signal_data
+        The ``signalData`` property of the ``Vega`` component.
+    spec
+        The spec of the chart. It is used to find the selections and their types.
+    selections
+        Names of the selections to apply, or a dictionary of names and types
+        ("interval" or "point"). If neither ``spec`` nor ``selections``
+        are given, all dictionaries in ``signal_data`` are treated as selections.
+    index
+        A :class:`SelectionIndex` of ``data`` to speed up repeated filtering.
+    empty
+        Which rows to return if a selection is empty: "all" (the default, which is
+        also the default in Vega-Lite) or "none".
+
+    Timestamps of interval selections on temporal fields are interpreted as UTC.
+    """
+    mask = selection_mask(
+        data, signal_data, spec=spec, selections=selections, index=index, empty=empty
+    )
+    if hasattr(data, "iloc"):
+        return data[mask]
+    import pyarrow as pa
+
+    return data.filter(pa.array(mask))
+
+
+def _resolve_types(
+    signal_data: Dict[str, Any],
+    spec: Optional[Dict[str, Any]],
+    selections: Optional[Union[Sequence[str], Mapping[str, str]]],
+) -> Dict[str, str]:
+    spec_types = selection_types(spec) if spec is not None else {}
+    if isinstance(selections, Mapping):
+        return dict(selections)
+    if selections is not None:
+        names: List[str] = list(selections)
+    elif spec is not None:
+        names = list(spec_types)
+    else:
+        names = [name for name, value in signal_data.items() if isinstance(value, dict)]
+    return {
+        name: spec_types.get(name) or _infer_type(signal_data.get(name))
+        for name in names
+    }
+
+
+def _infer_type(value: Any) -> str:
+    if not isinstance(value, dict) or not value:
+        return "point"
+    if any(key in value for key in _POINT_KEYS + (_VEGA_ID,)):
+        return "point"
+    if all(
+        isinstance(v, list) and len(v) == 2 and not isinstance(v[0], str)
+        for v in value.values()
+    ):
+        return "interval"
+    return "point"
+
+
+def _interval_mask(
+    data: Any, value: Dict[str, Any], index: Optional[SelectionIndex]
+) -> "np.ndarray":
+    import numpy as np
+    mask = np.ones(len(data), dtype=bool)
+    for field, extent in value.items():
+        if index is not None:
+            if _is_range(extent):
+                field_mask = index.range_mask(field, min(extent), max(extent))
+            else:
+                field_mask = index.isin_mask(field, extent)
+            if field_mask is not None:
+                mask &= field_mask
+                continue
+        values = _column_values(data, field)
+        if _is_range(extent) and _is_orderable(values):
+            low, high = _coerce_bounds(values, min(extent), max(extent))
+            mask &= (values >= low) & (values <= high)
+        else:
+            # Interval selections over discrete scales contain the selected values
+            mask &= _isin(values, extent)
+    return mask
+
+
+def _point_mask(
+    data: Any, value: Dict[str, Any], index: Optional[SelectionIndex]
+) -> "np.ndarray":
+    import numpy as np
+    fields = {k: v for k, v in value.items() if k not in _POINT_KEYS}
+    if not fields:
+        # Fall back to the selected tuples, e.g. {"vlPoint": {"or": [{"a": 1}]}}
+        tuples = (value.get("vlPoint") or {}).get("or") or []
+        if not tuples:
+            return np.zeros(len(data), dtype=bool)
+        fields = {field: [t.get(field) for t in tuples] for field in tuples[0]}
+    if _VEGA_ID in fields:
+        # Points without fields are identified by the position of the row in
+        # the data, starting at 1. Vega assigns the ids when the rows are
+        # ingested, so they only match positions for a chart with a single
+        # dataset which was never updated.
+        warnings.warn(
+            "A point selection without fields is identified by the _vgsid_ of "
+            "the rows, which is mapped to the position in the data. This is "
+            "wrong if the chart has several datasets or its data was updated. "
+            "Select on fields instead, e.g. alt.selection_point(fields=[...]).",
+            UserWarning,
+            stacklevel=4,
+        )
+        mask = np.zeros(len(data), dtype=bool)
+        ids = np.asarray(fields[_VEGA_ID], dtype=np.int64) - 1
+        mask[ids[(ids >= 0) & (ids < len(data))]] = True
+        return mask
+    if len(fields) == 1:
+        (field, values), = fields.items()
+        if index is not None:
+            field_mask = index.isin_mask(field, values)
+            if field_mask is not None:
+                return field_mask
+        return _isin(_column_values(data, field), values)
+    # With multiple fields, a row is selected if the combination of its
+    # values equals one of the selected points
+    import pandas as pd
+
+    selected = pd.MultiIndex.from_arrays([list(v) for v in fields.values()])
+    rows = pd.MultiIndex.from_arrays([_column_values(data, f) for f in fields])
+    return np.asarray(rows.isin(selected))
+
+
+def _is_range(extent: Any) -> bool:
+    return (
+        isinstance(extent, list)
+        and len(extent) == 2
+        and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in extent)
+    )
+
+
+def _is_orderable(values: "np.ndarray") -> bool:
+    return values.dtype.kind in "iufM"
+
+
+def _coerce_bounds(values: "np.ndarray", low: Any, high: Any) -> tuple:
+    import numpy as np
+    if values.dtype.kind == "M":
+        # Vega represents timestamps as milliseconds since the epoch
+        unit = np.datetime_data(values.dtype)[0]
+        low = np.datetime64(int(low), "ms").astype(f"datetime64[{unit}]")
+        high = np.datetime64(int(np.ceil(high)), "ms").astype(f"datetime64[{unit}]")
+    return low, high
+
+
+def _isin(values: "np.ndarray", selected: Sequence[Any]) -> "np.ndarray":
+    import numpy as np
+    import pandas as pd
+
+    return np.asarray(pd.Series(values).isin(list(selected)))
+
+
+def _column_names(data: Any) -> List[str]:
+    return list(data.column_names if hasattr(data, "column_names") else data.columns)
+
+
+def _column_values(data: Any, column: str) -> "np.ndarray":
+    import numpy as np
+    if hasattr(data, "column_names"):
+        # pyarrow Table
+        return data.column(column).to_numpy()
+    series = data[column]
+    dtype = series.dtype
+    if getattr(dtype, "tz", None) is not None:
+        # Compare timezone-aware timestamps in UTC
+        return series.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+    if dtype.kind in "iuf" and not isinstance(dtype, np.dtype):
+        # Nullable extension types such as Int64
+        return series.to_numpy(dtype="float64", na_value=np.nan)
+    return series.to_numpy()
@@ -0,0 +1,134 @@
+import logging
+from typing import Any, Dict, Hashable, Optional, Union
+
+from ._cache import DiskBackend, MemoryBackend
+from ._hashing import content_hash
+
+logger = logging.getLogger(__name__)
+
+# Number of replaced component instances per session whose late updates are
+# still recognized and dropped
+_MAX_RETIRED = 8
+
+
+class SignalState:
+    """Merge the updates of the ``signalDelta`` property of a ``Vega`` component
+    into the full state of the signals, separately for every session.
+
+    Set ``signalDataFormat="delta"`` on the component so that it only sends the
+    signals which changed. This keeps the payload of the callbacks small
+    even if many signals are observed.
+
+    Example::
+
+        signal_state = dvc.SignalState()
+
+        @callback(
+            Output("table", "data"),
+            Output("chart", "signalDelta"),
+            Input("chart", "signalDelta"),
+            State("session-id", "data"),
+        )
+        def update_table(signal_delta, session_id):
+            signals = signal_state.update(session_id, signal_delta)
+            if signal_state.needs_resync(session_id):
+                return no_update, {"resync": True}
+            ...
+            return table_data, no_update
+
+    Here, ``session-id`` is a ``dcc.Store`` which holds a unique id per
+    browser session, e.g. created with ``uuid.uuid4()`` in the layout function.
+    Use a separate ``SignalState`` for every ``Vega`` component. Setting
+    ``signalDelta`` to ``{"resync": True}`` makes the component send all
+    observed signals again if updates were missed.
+
+    Parameters
+    ----------
+    max_sessions
+        Maximum number of sessions for which the state is kept in memory if no
+        ``backend`` is passed. The least recently used sessions are removed first.
+    backend
+        Where to keep the state. Defaults to a :class:`MemoryBackend`. Use a
+        :class:`DiskBackend` if your app runs with multiple worker processes.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 10_000,
+        backend: Optional[Union[MemoryBackend, DiskBackend]] = None,
+    ):
+        if backend is None:
+            backend = MemoryBackend(maxsize=max_sessions)
+        self.backend = backend
+
+    def _key(self, session_id: Hashable) -> str:
+        return "signals-" + content_hash(str(session_id))
+
+    def update(
+        self, session_id: Hashable, signal_delta: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Merge an update of ``signalDelta`` into the state of the session and
+        return the full state of the signals.
+
+        Sequence numbers are only compared between updates with the same
+        ``id``, i.e. from the same component instance. Updates which are older
+        than the current state, including older resets, are ignored and so are
+        updates of components which were replaced by a newer one. If updates
+        were missed, e.g. because Dash skipped intermediate values, the
+        returned state is not changed until the next reset. Use
+        :meth:`needs_resync` to request one.
+        """
+        key = self._key(session_id)
+        entry = self.backend.get(key) or {"id": None, "seq": 0, "signals": {}}
+        if not signal_delta or signal_delta.get("resync"):
+            return dict(entry["signals"])
+        stream = signal_delta.get("id")
+        seq = signal_delta.get("seq", 0)
+        retired = entry.get("retired", [])
+        if stream != entry.get("id"):
+            # Only a reset can start a new stream as the state of the new
+            # component is unknown otherwise
+            if stream in retired or not signal_delta.get("reset"):
+                return dict(entry["signals"])
+            if entry.get("id") is not None:
+                retired = (retired + [entry["id"]])[-_MAX_RETIRED:]
+        elif seq <= entry["seq"]:
+            # Already merged, e.g. if the same callback is triggered by
+            # another input, or an older update which arrived late
+            return dict(entry["signals"])
+        elif not signal_delta.get("reset") and (
+            entry.get("resync") or seq != entry["seq"] + 1
+        ):
+            # Dash can skip intermediate values of a property if it changes
+            # faster than the callbacks are executed. Merging the later updates
+            # would silently keep outdated values of the signals which only
+            # changed in the skipped ones.
+            if not entry.get("resync"):
+                logger.warning(
+                    "Missed %d signalDelta update(s) for a session.",
+                    seq - entry["seq"] - 1,
+                )
+            entry = {**entry, "seq": seq, "resync": True}
+            self.backend.set(key, entry)
+            return dict(entry["signals"])
+        if signal_delta.get("reset"):
+            signals = dict(signal_delta.get("signals", {}))
+        else:
+            signals = {**entry["signals"], **signal_delta.get("signals", {})}
+        entry = {"id": stream, "seq": seq, "signals": signals, "retired": retired}
+        self.backend.set(key, entry)
+        return dict(entry["signals"])
+
+    def needs_resync(self, session_id: Hashable) -> bool:
+        """Return whether updates were missed for a session.
+
+        Set ``signalDelta`` to ``{"resync": True}`` in the same callback to let
+        the component send the full state of the signals again.
+        """
+        entry = self.backend.get(self._key(session_id))
+        return bool(entry and entry.get("resync"))
+
+    def get(self, session_id: Hashable) -> Dict[str, Any]:
+        """Return the current state of the signals of a session."""
+        entry = self.backend.get(self._key(session_id))
+        return dict(entry["signals"]) if entry else {}
@@ -0,0 +1,75 @@
+from typing import Any, Callable, Dict, Optional
+
+
+def render_stats_metrics(
+    stats: Optional[Dict[str, Any]], prefix: str = "dvc"
+) -> Dict[str, float]:
+    """Flatten the ``renderStats`` property of a ``Vega`` component to metrics
+    with dotted names, e.g. ``{"dvc.embed.timings.total": 120.5, ...}``.
+
+    The measurements of renders and data updates are kept apart by the event
+    in the name. This format can be passed to most metrics clients, e.g. as gauges.
+
+    Parameters
+    ----------
+    stats
+        The value of the ``renderStats`` property.
+    prefix
+        Prefix of all metric names.
+    """
+    if not stats:
+        return {}
+    base = f"{prefix}.{stats.get('event', 'unknown')}"
+    metrics: Dict[str, float] = {}
+    for group in ("timings", "rows", "bytes", "signals"):
+        for name, value in (stats.get(group) or {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                metrics[f"{base}.{group}.{name}"] = value
+    return metrics
+
+
+def forward_render_stats(
+    component_id: Any,
+    handler: Callable[[Dict[str, Any]], None],
+    flatten: bool = False,
+) -> Callable[[Optional[Dict[str, Any]]], None]:
+    """Register a Dash callback which passes every update of the ``renderStats``
+    property of a ``Vega`` component to ``handler``, e.g. to forward the
+    measurements to a metrics pipeline.
+
+    Set ``renderStatsSampleRate`` on the component to enable the measurements.
+    Requires Dash 2.17 or later as the callback has no outputs.
+
+    Example::
+
+        dvc.Vega(id="chart", spec=spec, renderStatsSampleRate=0.1)
+
+        dvc.forward_render_stats(
+            "chart",
+            lambda metrics: statsd_client.gauges(metrics),
+            flatten=True,
+        )
+
+    Parameters
+    ----------
+    component_id
+        ID of the ``Vega`` component.
+    handler
+        Function which is called with the value of ``renderStats``.
+    flatten
+        If True, the handler is called with the result of :func:`render_stats_metrics`
+        instead.
+
+    Returns
+    -------
+    The function which is called by the callback. Call it directly to test a handler.
+    """
+    from dash import Input, callback
+
+    def forward(stats: Optional[Dict[str, Any]]) -> None:
+        if not stats:
+            return
+        handler(render_stats_metrics(stats) if flatten else stats)
+
+    callback(Input(component_id, "renderStats"), prevent_initial_call=True)(forward)
+    return forward
@@ -170,6 +170,7 @@ def format_json(json_data):
     Output("altair-chart", "spec"),
     Input("origin-dropdown", "value"),
 )
+@dvc.cached_spec(data=source)
 def display_altair_chart_1(origin):
     chart = make_chart(origin, add_circle_size_slider=True, add_histogram=True)
     return chart.to_dict()
@@ -182,14 +183,9 @@ def display_altair_chart_1(origin):
     prevent_initial_call=True,
 )
 def update_datatable(signal_data, origin):
-    brush_selection = signal_data.get("brush_selection", {})
-    if brush_selection:
-        filter = " and ".join(
-            [f"{v[0]} <= `{k}` <= {v[1]}" for k, v in brush_selection.items()]
-        )
-        filtered_source = source.query(filter)
-    else:
-        filtered_source = source
+    filtered_source = dvc.filter_selection(
+        source, signal_data, selections=["brush_selection"]
+    )
     if origin != "All":
         filtered_source = filtered_source[filtered_source["Origin"] == origin]
     return filtered_source.to_dict("records")
@@ -1,9 +1,18 @@
 import React, { Component } from 'react';
 import PropTypes from 'prop-types';
 import { v4 as uuidv4 } from 'uuid';
-import vegaEmbed, { EmbedOptions } from 'vega-embed';
-import * as d3 from 'd3';
-import * as debounce from 'lodash.debounce';
+import { View } from 'vega';
+import vegaEmbed from 'vega-embed';
+import { compileSpec, embedArguments } from '../utils/compile';
+import { deepEqual } from '../utils/compare';
+import { changeData, loadDataset, loadDatasets, loadFormats, loadPatch } from '../utils/data';
+import { pausableView, register, scenegraphItems, unregister } from '../utils/lifecycle';
+import { publish, subscribe } from '../utils/links';
+import SignalScheduler from '../utils/scheduler';
+import { cleanJson, filterSignals, setSignalValues } from '../utils/signals';
+import { restoreState, snapshotState } from '../utils/state';
+import { datasetRows, instrumentedView, jsonSize, now } from '../utils/stats';
+import WorkerView from '../utils/worker';
 
 
 export default class Vega extends Component {
@@ -12,6 +21,81 @@ export default class Vega extends Component {
         this.getRef = this.getRef.bind(this);
         this.divId = "vega-".concat(uuidv4());
         this.finalize = null;
+        // Generation of the latest call of update. Views which are embedded
+        // for an earlier call, e.g. while their spec was compiled, are discarded.
+        this.embedding = 0;
+        this.vegaView = null;
+        // Set instead of vegaView if the chart is rendered in a Web Worker
+        this.workerView = null;
+        // Patches which arrived while no view was available. They are applied
+        // as soon as the next view has been embedded.
+        this.pendingDataPatches = [];
+        // Sequence number of the last update of appendData per dataset
+        this.appendSeqs = {};
+        // Datasets might need to be loaded first, e.g. if they are passed
+        // as Arrow data. This promise makes sure that changes are
+        // applied in the order in which they arrived.
+        this.dataUpdates = Promise.resolve();
+        // Signal listeners which are currently registered on the view
+        this.signalListeners = [];
+        // Collects signal changes to report them in batches to Dash
+        this.signalScheduler = null;
+        // Latest signal values which were reported to Dash. this.props.signalData
+        // can lag behind as Dash updates the props asynchronously.
+        this.signalData = {};
+        // Identifies the updates of signalDelta of this component so that
+        // SignalState only compares their sequence numbers with each other
+        this.signalStream = uuidv4();
+        // Sequence number of the last update of signalDelta
+        this.signalSeq = 0;
+        // Signal listeners and channel subscriptions of linkedSignals
+        this.signalLinks = [];
+        // Latest value per signal which was received through a channel. It is
+        // not published again when the signal listener reports it.
+        this.linkedValues = {};
+        // Signal values which are set on the view with the next run
+        this.pendingSignals = null;
+        // Signal listeners of geoLevels, the index of the level which is loaded
+        // per dataset, and the loaded levels
+        this.geoListeners = [];
+        this.geoLevelIndex = {};
+        this.geoLevelRows = {};
+        // Measurements for the renderStats property. The totals are collected
+        // by the view if renderStatsSampleRate is set, see utils/stats.js.
+        this.statsTotals = null;
+        this.statsSeq = 0;
+        this.dataNames = [];
+        this.signalEvents = 0;
+        this.signalReports = 0;
+        this.signalWindowStart = now();
+        // Width and height of the svg element as rendered by Vega, before
+        // it was scaled by svgRendererScaleFactor
+        this.svgSize = null;
+        // Observers which track the distance of the chart to the viewport,
+        // see the lazy and offscreenBehavior properties
+        this.lazyObserver = null;
+        this.offscreenObserver = null;
+        this.nearViewport = true;
+        // A chart is hidden if the browser tab is in the background or if it
+        // is not displayed, e.g. in an inactive tab of the page. Its view
+        // is paused, see the pauseWhenHidden property.
+        this.hiddenObserver = null;
+        this.elementHidden = false;
+        this.paused = false;
+        this.updatePaused = this.updatePaused.bind(this);
+        // True if the chart should be embedded but this was postponed until
+        // it comes close to the viewport
+        this.deferred = false;
+        // State of the view before it was suspended and whether the data
+        // property changed in the meantime
+        this.suspendedState = null;
+        this.staleData = false;
+        // Interaction state of the previous view which is restored into the
+        // next view if preserveState is set
+        this.preservedState = null;
+        // While no chart is embedded, the div keeps a minimum height so
+        // that the layout of the page does not shift
+        this.state = { placeholderHeight: props.lazy ? estimateHeight(props.spec) : null };
     }
 
     getRef(el) {
@@ -19,94 +103,799 @@ export default class Vega extends Component {
     }
 
     componentDidMount() {
+        register(this);
+        if (this.props.appendData) {
+            this.appendRows(this.props.appendData);
+        }
+        this.observeHidden();
+        this.observeVisibility();
         this.update();
     }
 
+    componentWillUnmount() {
+        // Release everything which could keep the view alive after the
+        // component is removed from the page, e.g. when navigating between
+        // pages. Pending signal changes are dropped as the component can
+        // no longer update its properties.
+        this.disconnectObservers();
+        this.disconnectHiddenObserver();
+        this.unlinkSignals();
+        this.unobserveGeoLevels();
+        if (this.signalScheduler) { this.signalScheduler.cancel(); }
+        this.signalScheduler = null;
+        this.pendingSignals = null;
+        this.pendingDataPatches = [];
+        this.suspendedState = null;
+        this.preservedState = null;
+        this.embedding += 1;
+        if (this.finalize) { this.finalize(); }
+        this.finalize = null;
+        this.vegaView = null;
+        this.workerView = null;
+        this.signalListeners = [];
+        unregister(this);
+    }
+
     componentDidUpdate(prevProps) {
+        if (this.props.dataPatch && this.props.dataPatch !== prevProps.dataPatch) {
+            this.pendingDataPatches.push(this.props.dataPatch);
+        }
+        if (this.props.appendData && this.props.appendData !== prevProps.appendData) {
+            this.appendRows(this.props.appendData);
+        }
+        if (this.props.signalDelta && this.props.signalDelta !== prevProps.signalDelta &&
+            this.props.signalDelta.resync) {
+            // Set by a callback which missed updates, see SignalState
+            this.resyncSignals();
+        }
+        // Dash calls this method for every change of a property, including the
+        // updates of signalData which are triggered by this component. Therefore,
+        // the changes are classified to only do the work which is necessary.
+        // Changes to style and className are applied in render and never
+        // require to embed the chart again.
         if (this.props.id !== prevProps.id ||
-            this.props.svgRendererScaleFactor !== prevProps.svgRendererScaleFactor ||
-            JSON.stringify(this.props.opt) !== JSON.stringify(prevProps.opt) ||
-            JSON.stringify(this.props.spec) !== JSON.stringify(prevProps.spec) ||
-            JSON.stringify(this.props.style) !== JSON.stringify(prevProps.style) ||
-            JSON.stringify(this.props.signalsToObserve) !== JSON.stringify(prevProps.signalsToObserve) ||
-            this.props.className !== prevProps.className
+            this.specChanged(prevProps) ||
+            !deepEqual(this.props.opt, prevProps.opt) ||
+            this.props.renderInWorker !== prevProps.renderInWorker
         ) {
             this.update();
+            return;
+        }
+        if (this.props.signalValues && this.props.signalValues !== prevProps.signalValues) {
+            this.pushSignalValues(this.props.signalValues);
+        }
+        if (this.props.debounceWait !== prevProps.debounceWait ||
+            this.props.maxWait !== prevProps.maxWait ||
+            this.props.signalUpdatePolicy !== prevProps.signalUpdatePolicy ||
+            this.props.signalDataFormat !== prevProps.signalDataFormat ||
+            !deepEqual(this.props.signalsToObserve, prevProps.signalsToObserve)
+        ) {
+            this.observeSignals();
+        }
+        if (this.props.pauseWhenHidden !== prevProps.pauseWhenHidden) {
+            this.updatePaused();
+        }
+        if (this.props.geoLevels !== prevProps.geoLevels) {
+            this.observeGeoLevels();
+        }
+        if (!deepEqual(this.props.linkedSignals, prevProps.linkedSignals)) {
+            this.linkSignals();
+        }
+        if (this.props.prerendered !== prevProps.prerendered) {
+            this.showPrerendered();
+        }
+        if (this.props.svgRendererScaleFactor !== prevProps.svgRendererScaleFactor) {
+            this.scaleSvg();
+        }
+        if (this.props.lazy !== prevProps.lazy ||
+            this.props.lazyMargin !== prevProps.lazyMargin ||
+            this.props.offscreenBehavior !== prevProps.offscreenBehavior ||
+            this.props.offscreenMargin !== prevProps.offscreenMargin
+        ) {
+            this.observeVisibility();
+            if (this.deferred && this.nearViewport) {
+                this.update(true);
+            }
+        }
+        if (this.suspendedState && this.props.data !== prevProps.data) {
+            this.staleData = true;
+        }
+        if (this.props.data !== prevProps.data || this.pendingDataPatches.length) {
+            // Only the data changed. Apply it as a changeset to the live view
+            // instead of embedding the chart again which keeps the state
+            // of the view, e.g. zoom levels and selections.
+            this.updateData(this.props.data !== prevProps.data);
+        }
+    }
+
+    specChanged(prevProps) {
+        if (this.props.spec === prevProps.spec) {
+            return false;
+        }
+        // Comparing hashes is a lot cheaper than comparing large specs
+        if (this.props.specHash && prevProps.specHash) {
+            return this.props.specHash !== prevProps.specHash;
+        }
+        return !deepEqual(this.props.spec, prevProps.spec);
+    }
+
+    appendRows(appendData) {
+        // The rows are applied as a patch so that they are kept in order with
+        // the changes of dataPatch, also if the chart is rendered in a worker
+        const patch = {};
+        for (const name in appendData) {
+            const { rows, seq, ...retention } = appendData[name] || {};
+            if (seq !== undefined && seq !== null) {
+                const last = this.appendSeqs[name];
+                // Already applied, e.g. if Dash sets the same value again
+                if (last !== undefined && seq <= last) { continue; }
+                if (last !== undefined && seq > last + 1) {
+                    console.warn(`dash-vega-components: missed ${seq - last - 1} update(s) of appendData for dataset '${name}'.`);
+                }
+                this.appendSeqs[name] = seq;
+            }
+            patch[name] = { ...retention, insert: rows };
+        }
+        if (Object.keys(patch).length) {
+            this.pendingDataPatches.push(patch);
+        }
+    }
+
+    updateData(replace) {
+        if (this.workerView) {
+            // The worker applies the changes in the order in which they arrive
+            const patches = this.pendingDataPatches;
+            this.pendingDataPatches = [];
+            const workerView = this.workerView;
+            const start = now();
+            const newData = replace ? this.props.data : null;
+            workerView.updateData(newData, patches)
+                .then(() => {
+                    if (workerView !== this.workerView) { return; }
+                    this.reportStats('data', { total: now() - start }, () => ({ data: jsonSize(newData) + jsonSize(patches) }));
+                })
+                .catch((error) => console.error('dash-vega-components: could not update data.', error));
+            return;
+        }
+        if (!this.vegaView) { return; }
+        const start = now();
+        const totals = this.statsTotals;
+        this.dataUpdates = this.dataUpdates
+            .then(() => {
+                // Taken from the queue only once the previous updates are
+                // done so that the patches are applied to the current view
+                // and in the order in which they arrived
+                const view = this.vegaView;
+                if (!view) { return null; }
+                const newData = replace ? this.props.data : null;
+                const newPatches = this.pendingDataPatches;
+                this.pendingDataPatches = [];
+                return Promise.all([
+                    newData ? loadDatasets(view, newData) : null,
+                    Promise.all(newPatches.map((patch) => loadPatch(view, patch))),
+                ]).then(([loadedData, loadedPatches]) => {
+                    if (view !== this.vegaView) {
+                        // The view was replaced in the meantime. The new view
+                        // already uses the latest data but the patches are
+                        // kept for it.
+                        this.pendingDataPatches = newPatches.concat(this.pendingDataPatches);
+                        if (this.vegaView) { this.updateData(false); }
+                        return null;
+                    }
+                    const loaded = now();
+                    // One changeset per dataset, see changeData
+                    changeData(view, (changes) => {
+                        if (loadedData) {
+                            changes.replace(loadedData);
+                        }
+                        loadedPatches.forEach((patch) => changes.patch(patch));
+                    });
+                    if (!totals) {
+                        return view.runAsync();
+                    }
+                    const before = { run: totals.run, render: totals.render };
+                    return view.runAsync().then(() => {
+                        const run = totals.run - before.run;
+                        const render = totals.render - before.render;
+                        this.reportStats(
+                            'data',
+                            { load: loaded - start, run: run, render: render, dataflow: run - render, total: now() - start },
+                            () => ({ data: jsonSize(newData) + jsonSize(newPatches) })
+                        );
+                    });
+                });
+            })
+            .catch((error) => console.error('dash-vega-components: could not update data.', error));
+    }
+
+    observeVisibility() {
+        this.disconnectObservers();
+        this.nearViewport = true;
+        if (typeof IntersectionObserver === 'undefined' || !this.el) { return; }
+        if (this.props.lazy) {
+            // The first callback of the observer reports the current position
+            // and embeds the chart if it is already close to the viewport
+            this.nearViewport = false;
+            this.lazyObserver = new IntersectionObserver((entries) => {
+                if (entries[entries.length - 1].isIntersecting) {
+                    this.setNearViewport(true);
+                }
+            }, { rootMargin: this.props.lazyMargin });
+            this.lazyObserver.observe(this.el);
+        }
+        if (this.props.offscreenBehavior === 'suspend' || this.props.offscreenBehavior === 'finalize') {
+            this.offscreenObserver = new IntersectionObserver((entries) => {
+                if (!entries[entries.length - 1].isIntersecting) {
+                    this.setNearViewport(false);
+                } else if (!this.props.lazy) {
+                    this.setNearViewport(true);
+                }
+            }, { rootMargin: this.props.offscreenMargin });
+            this.offscreenObserver.observe(this.el);
+        }
+    }
+
+    disconnectObservers() {
+        if (this.lazyObserver) { this.lazyObserver.disconnect(); }
+        if (this.offscreenObserver) { this.offscreenObserver.disconnect(); }
+        this.lazyObserver = null;
+        this.offscreenObserver = null;
+    }
+
+    observeHidden() {
+        if (typeof document !== 'undefined') {
+            document.addEventListener('visibilitychange', this.updatePaused);
+        }
+        if (!this.el) { return; }
+        // Elements which are not displayed have no boxes
+        this.elementHidden = this.el.getClientRects().length === 0;
+        if (typeof ResizeObserver !== 'undefined') {
+            this.hiddenObserver = new ResizeObserver(() => {
+                this.elementHidden = this.el.getClientRects().length === 0;
+                this.updatePaused();
+            });
+            this.hiddenObserver.observe(this.el);
+        }
+        this.updatePaused();
+    }
+
+    disconnectHiddenObserver() {
+        if (typeof document !== 'undefined') {
+            document.removeEventListener('visibilitychange', this.updatePaused);
+        }
+        if (this.hiddenObserver) { this.hiddenObserver.disconnect(); }
+        this.hiddenObserver = null;
+    }
+
+    updatePaused() {
+        const paused = Boolean(this.props.pauseWhenHidden) &&
+            ((typeof document !== 'undefined' && document.hidden) || this.elementHidden);
+        if (paused === this.paused) { return; }
+        this.paused = paused;
+        // A paused view keeps its state and all changes are evaluated at once
+        // when it is resumed, without embedding the chart again
+        if (this.vegaView) {
+            if (paused) {
+                this.vegaView.pause();
+            } else {
+                this.vegaView.resume().catch((error) => console.error('dash-vega-components: could not resume the chart.', error));
+            }
+        } else if (this.workerView) {
+            this.workerView.setPaused(paused)
+                .catch((error) => console.error('dash-vega-components: could not pause the chart.', error));
+        }
+        if (!paused && this.deferred && this.nearViewport) {
+            this.update(true);
         }
     }
 
-    cleanJson(data) {
-        return JSON.parse(JSON.stringify(data))
+    setNearViewport(nearViewport) {
+        this.nearViewport = nearViewport;
+        if (nearViewport && this.deferred) {
+            this.update(true);
+        } else if (!nearViewport && (this.vegaView || this.workerView)) {
+            this.suspend();
+        }
     }
 
-    update() {
+    suspend() {
+        // With "suspend", the state of the view, e.g. selections and data which
+        // was changed with dataPatch, is restored once the chart is embedded again.
+        // With "finalize", the chart is embedded from scratch.
+        // The state of a view in a Web Worker is only available asynchronously
+        // and is therefore not kept.
+        if (this.props.offscreenBehavior === 'suspend' && this.vegaView) {
+            this.suspendedState = this.vegaView.getState();
+            this.staleData = false;
+        }
+        const height = this.el.getBoundingClientRect().height;
+        if (this.signalScheduler) { this.signalScheduler.flush(); }
+        this.unlinkSignals();
+        this.embedding += 1;
+        if (this.finalize) { this.finalize(); }
+        this.finalize = null;
+        this.vegaView = null;
+        this.workerView = null;
+        this.signalListeners = [];
+        this.svgSize = null;
+        // Free the memory of the canvas or svg elements
+        this.el.innerHTML = '';
+        this.deferred = true;
+        this.setState({ placeholderHeight: height });
+    }
+
+    update(restore = false) {
+        this.embedding += 1;
+        const embedding = this.embedding;
+        if (!restore) {
+            // The state of a suspended view does not apply to a new spec
+            this.suspendedState = null;
+            this.staleData = false;
+        }
         if (!this.props.spec) { return; }
+        // Hidden charts are embedded once they are shown
+        if (!this.nearViewport || this.paused) {
+            this.deferred = true;
+            this.showPrerendered();
+            return;
+        }
+        this.deferred = false;
+        // Selections and zoom levels are kept when the spec is replaced. If
+        // the previous view was already replaced by a view which is not
+        // embedded yet, its snapshot is still used.
+        if (!this.props.preserveState) {
+            this.preservedState = null;
+        } else if (this.vegaView) {
+            this.preservedState = snapshotState(this.vegaView, this.props.signalsToObserve);
+        }
         // Function exists if a view has been rendered before with this component
         // If so, it's better to call finalize before creating a new view to clean up
         // timers, event listeners, etc.
+        // Pending signal changes of the previous view are still reported.
+        if (this.signalScheduler) { this.signalScheduler.flush(); }
+        this.unlinkSignals();
         if (this.finalize) { this.finalize(); }
+        this.finalize = null;
+        this.vegaView = null;
+        this.workerView = null;
+        this.signalListeners = [];
+        this.svgSize = null;
+        // A suspended chart comes back with its previous state which the
+        // prerendered image does not show
+        if (!this.suspendedState) { this.showPrerendered(); }
+
+        if (this.props.renderInWorker && WorkerView.supported()) {
+            this.preservedState = null;
+            this.embedInWorker();
+            return;
+        }
 
-        vegaEmbed(this.el, this.props.spec, this.props.opt).then((result) => {
+        const state = this.suspendedState;
+        this.suspendedState = null;
+        // Vega-Lite specs are compiled once per page and reused by all charts
+        // with the same spec. Specs which were compiled on the server are
+        // embedded without loading the Vega-Lite compiler.
+        const start = now();
+        let compiled = start;
+        const totals = this.props.renderStatsSampleRate > 0 ? { parsed: start, run: 0, render: 0 } : null;
+        this.statsTotals = totals;
+        const { spec: sourceSpec, opt: sourceOpt } = this.props;
+        compileSpec(sourceSpec, this.props.specHash, sourceOpt).then((compiledSpec) => (
+            loadFormats(compiledSpec[0]).then(() => compiledSpec)
+        )).then(([vgSpec, vgOpt]) => {
+            // The spec changed again while it was compiled
+            if (embedding !== this.embedding) { return null; }
+            compiled = now();
+            this.dataNames = (vgSpec.data || []).map((source) => source.name);
+            const viewClass = pausableView(totals ? instrumentedView(totals) : View);
+            const [spec, opt] = embedArguments(sourceSpec, sourceOpt, vgSpec, vgOpt);
+            return vegaEmbed(this.el, spec, { ...opt, viewClass: viewClass });
+        }).then((result) => {
+            if (!result) { return; }
+            // The component was unmounted or the spec changed while the
+            // chart was embedded
+            if (embedding !== this.embedding) {
+                result.finalize();
+                return;
+            }
+            if (this.paused) { result.view.pause(); }
+            if (totals) {
+                const embedded = now();
+                this.reportStats('embed', {
+                    compile: compiled - start,
+                    parse: totals.parsed - compiled,
+                    run: totals.run,
+                    render: totals.render,
+                    dataflow: totals.run - totals.render,
+                    embed: embedded - compiled,
+                    total: embedded - start,
+                }, () => ({ spec: jsonSize(this.props.spec) }), result.view);
+            }
             this.finalize = result.finalize;
             this.vegaView = result.view;
-            let vegaSignals = this.vegaView.getState().signals || {};
-            // Ignore the 'unit' signal as it's rather complex,
-            // contains references which can't be serialized to JSON, and it's
-            // not useful to most users in the Dash context
-            if ('unit' in vegaSignals) {
-                delete vegaSignals.unit;
-            };
-            // Only add signals to the props if they are in the signalsToObserve
-            // list or if the list is equal to ['all'].
-            // If the list is empty, no signals will be added to the props.
-            let filteredSignals = {};
-            if (this.props.signalsToObserve[0] === 'all') {
-                filteredSignals = vegaSignals;
-            } else {
-                for (let signal in vegaSignals) {
-                    if (this.props.signalsToObserve.includes(signal)) {
-                        filteredSignals[signal] = vegaSignals[signal];
-                    }
+            if (this.preservedState) {
+                restoreState(result.view, this.preservedState);
+                this.preservedState = null;
+            }
+            // Set before the signals are observed so that they are included
+            // in the initial signalData
+            if (this.props.signalValues && setSignalValues(result.view, this.props.signalValues)) {
+                result.view.runAsync();
+            }
+            if (state) {
+                // Includes the data which was passed through the data property
+                // unless the property changed while the view was suspended
+                result.view.setState(state);
+                if (this.staleData || this.pendingDataPatches.length) {
+                    this.updateData(this.staleData);
                 }
+            } else if (this.props.data || this.pendingDataPatches.length) {
+                // Data passed through the data property takes precedence over
+                // the data in the spec.
+                this.updateData(true);
             }
-            vegaSignals = filteredSignals;
-
-            // Initially, set all signals so that the evaluated values are available
-            // even if they never change. Else, the code below would only add
-            // signals to the props if they change.
-            this.props.setProps({ signalData: vegaSignals });
-
-            const wait = this.props.debounceWait;
-            const maxWait = wait;
-
-            // Register signal listeners to update the props when signals change.
-            const signalHandler = (name, value) => {
-                // Not sure if this is needed but it's in the Jupyterchart
-                // implementation in Vega-Altair. Worth to be
-                // on the safe side for now.
-                const cleanedValue = this.cleanJson(value);
-                // Get a shallow copy of the signals. Shallow should be enough
-                // as we overwrite the top level values anyway.
-                let signalData = { ...this.props.signalData };
-                signalData[name] = cleanedValue;
-                this.props.setProps({ signalData: signalData });
-            };
-            for (let signal in vegaSignals) {
-                this.vegaView.addSignalListener(signal, debounce(signalHandler, wait, { maxWait: maxWait }));
+            this.staleData = false;
+            this.observeSignals();
+            this.linkSignals();
+            this.observeGeoLevels();
+            if (this.state.placeholderHeight !== null) {
+                this.setState({ placeholderHeight: null });
             }
 
+            this.svgSize = null;
             const options = this.props.opt || {};
             const renderer = options.renderer || 'canvas';
-            if (renderer === 'svg' && this.props.svgRendererScaleFactor !== 1) {
-                // Adjustment of width and height is based on https://github.com/vega/vega-lite/issues/1758#issuecomment-264677556
-                const svg = d3.select("#" + this.divId + " svg");
-                const scaleFactor = this.props.svgRendererScaleFactor;
-                const w = svg.attr("width");
-                const h = svg.attr("height");
-                svg.attr("width", w * scaleFactor);
-                svg.attr("height", h * scaleFactor);
+            if (renderer === 'svg') {
+                const svg = this.el.querySelector('svg');
+                this.svgSize = { width: svg.getAttribute('width'), height: svg.getAttribute('height') };
+                this.scaleSvg();
+            }
+        }).catch((error) => console.error('dash-vega-components: could not render the chart.', error));
+    }
+
+    showPrerendered() {
+        // vegaEmbed and WorkerView replace the contents of the div once the
+        // chart is embedded
+        if (!this.props.prerendered || !this.el || this.vegaView || this.workerView) { return; }
+        const image = document.createElement('img');
+        image.src = this.props.prerendered;
+        image.alt = '';
+        image.style.maxWidth = '100%';
+        this.el.innerHTML = '';
+        this.el.appendChild(image);
+    }
+
+    embedInWorker() {
+        const start = now();
+        const workerView = new WorkerView(
+            this.el, this.props.spec, this.props.specHash, this.props.opt,
+            (name, value) => {
+                this.signalEvents += 1;
+                if (this.signalScheduler) { this.signalScheduler.push(name, value); }
+            }
+        );
+        this.workerView = workerView;
+        this.statsTotals = null;
+        this.finalize = () => workerView.finalize();
+        workerView.ready.then(() => {
+            if (workerView !== this.workerView) { return; }
+            if (this.paused) { workerView.setPaused(true); }
+            this.reportStats('embed', { total: now() - start }, () => ({ spec: jsonSize(this.props.spec) }));
+            if (this.props.signalValues) {
+                workerView.setSignals(this.props.signalValues);
+            }
+            if (this.props.data || this.pendingDataPatches.length) {
+                this.updateData(true);
+            }
+            this.staleData = false;
+            this.observeSignals();
+            if (this.state.placeholderHeight !== null) {
+                this.setState({ placeholderHeight: null });
+            }
+        }).catch((error) => console.error('dash-vega-components: could not render the chart in a Web Worker.', error));
+    }
+
+    observeSignals() {
+        if (this.workerView) {
+            // The worker registers the signal listeners and sends the changes
+            // to the signal scheduler
+            const workerView = this.workerView;
+            workerView.observeSignals(this.props.signalsToObserve).then((signals) => {
+                if (workerView === this.workerView) { this.resetSignals(signals); }
+            });
+            return;
+        }
+        if (!this.vegaView) { return; }
+        this.signalListeners.forEach(([signal, listener]) => {
+            this.vegaView.removeSignalListener(signal, listener);
+        });
+        this.signalListeners = [];
+
+        const vegaSignals = filterSignals(this.vegaView.getState().signals || {}, this.props.signalsToObserve);
+        this.resetSignals(vegaSignals);
+
+        // Register signal listeners to update the props when signals change.
+        const listener = (name, value) => {
+            this.signalEvents += 1;
+            this.signalScheduler.push(name, value);
+        };
+        for (let signal in vegaSignals) {
+            this.vegaView.addSignalListener(signal, listener);
+            this.signalListeners.push([signal, listener]);
+        }
+    }
+
+    linkSignals() {
+        // Signals are linked in the browser without a round-trip to Dash.
+        // Each change of a linked signal is sent to the other charts with the
+        // same channel which set it on their views with view.signal.
+        this.unlinkSignals();
+        const view = this.vegaView;
+        if (!view || !this.props.linkedSignals) { return; }
+        for (const signal in this.props.linkedSignals) {
+            const channel = this.props.linkedSignals[signal];
+            try {
+                view.signal(signal);
+            } catch (error) {
+                console.warn(`dash-vega-components: cannot link the unknown signal '${signal}'.`);
+                continue;
+            }
+            const receive = (value) => {
+                this.linkedValues[signal] = value;
+                this.setSignals({ [signal]: value });
+            };
+            const listener = (name, value) => {
+                const received = this.linkedValues[name];
+                delete this.linkedValues[name];
+                if (!deepEqual(value, received)) {
+                    publish(channel, value, receive);
+                }
+            };
+            view.addSignalListener(signal, listener);
+            // Also sets the latest value of the channel on this view
+            const unsubscribe = subscribe(channel, receive);
+            this.signalLinks.push([signal, listener, unsubscribe]);
+        }
+    }
+
+    unlinkSignals() {
+        this.signalLinks.forEach(([signal, listener, unsubscribe]) => {
+            if (this.vegaView) { this.vegaView.removeSignalListener(signal, listener); }
+            unsubscribe();
+        });
+        this.signalLinks = [];
+        this.linkedValues = {};
+    }
+
+    observeGeoLevels() {
+        // Loads the level of detail of geographic datasets which matches the
+        // current value of their signal, e.g. the width of the chart, and
+        // switches the level when the signal changes.
+        // See dash_vega_components.geo_levels.
+        this.unobserveGeoLevels();
+        const view = this.vegaView;
+        if (!view || !this.props.geoLevels) { return; }
+        for (const name in this.props.geoLevels) {
+            const { signal = 'width', factor = 1, levels = [] } = this.props.geoLevels[name] || {};
+            if (!levels.length) { continue; }
+            const select = (value) => {
+                // The coarsest level which is at least as detailed as needed
+                const needed = (Number(value) || 0) * factor;
+                let index = levels.findIndex((level) => level.size >= needed);
+                if (index < 0) { index = levels.length - 1; }
+                if (index !== this.geoLevelIndex[name]) {
+                    this.geoLevelIndex[name] = index;
+                    this.loadGeoLevel(view, name, levels, index);
+                }
+            };
+            let value;
+            try {
+                value = view.signal(signal);
+            } catch (error) {
+                console.warn(`dash-vega-components: cannot select the level of '${name}' by the unknown signal '${signal}'.`);
+                select(0);
+                continue;
+            }
+            select(value);
+            const listener = (_, newValue) => select(newValue);
+            view.addSignalListener(signal, listener);
+            this.geoListeners.push([view, signal, listener]);
+        }
+    }
+
+    unobserveGeoLevels() {
+        this.geoListeners.forEach(([view, signal, listener]) => view.removeSignalListener(signal, listener));
+        this.geoListeners = [];
+        this.geoLevelIndex = {};
+        this.geoLevelRows = {};
+    }
+
+    loadGeoLevel(view, name, levels, index) {
+        // Levels are only loaded once, e.g. if the user zooms in and out again
+        const key = name + '/' + index;
+        if (!this.geoLevelRows[key]) {
+            this.geoLevelRows[key] = loadDataset(view, levels[index]);
+        }
+        const rows = this.geoLevelRows[key];
+        // Applied in order with the other changes of the data
+        this.dataUpdates = this.dataUpdates
+            .then(() => rows)
+            .then((loaded) => {
+                if (view !== this.vegaView || this.geoLevelIndex[name] !== index) { return null; }
+                changeData(view, (changes) => changes.replace({ [name]: loaded }));
+                return view.runAsync();
+            })
+            .catch((error) => console.error('dash-vega-components: could not load geographic data.', error));
+    }
+
+    setSignals(values) {
+        // All values which arrive in the same task are applied with a single run
+        // of the view
+        if (this.pendingSignals) {
+            Object.assign(this.pendingSignals, values);
+            return;
+        }
+        this.pendingSignals = { ...values };
+        Promise.resolve().then(() => this.applySignals());
+    }
+
+    pushSignalValues(values) {
+        // Values which were set by Dash are not reported back in signalData.
+        // The reported state is updated right away so that the scheduler
+        // drops the changes once the view reports them.
+        const signalData = { ...this.signalData };
+        let observed = false;
+        for (const name in values) {
+            if (name in signalData) {
+                signalData[name] = cleanJson(values[name]);
+                observed = true;
             }
-        })
+        }
+        if (observed) { this.signalData = signalData; }
+        this.setSignals(values);
+    }
+
+    applySignals() {
+        const values = this.pendingSignals;
+        this.pendingSignals = null;
+        if (!values) { return; }
+        if (this.workerView) {
+            this.workerView.setSignals(values)
+                .catch((error) => console.error('dash-vega-components: could not update signals.', error));
+            return;
+        }
+        const view = this.vegaView;
+        if (view && setSignalValues(view, values)) {
+            view.runAsync().catch((error) => console.error('dash-vega-components: could not update signals.', error));
+        }
+    }
+
+    resetSignals(vegaSignals) {
+        // Initially, set all signals so that the evaluated values are available
+        // even if they never change. Else, the signal listeners would only add
+        // signals to the props if they change.
+        if (this.signalScheduler) { this.signalScheduler.cancel(); }
+        this.signalData = vegaSignals;
+        this.reportSignals(vegaSignals, true);
+
+        // All changes which happen within the same debounce window, throttle
+        // interval, or animation frame are sent to Dash with a single update
+        // so that e.g. a brush which changes several signals at once only
+        // triggers one callback.
+        const wait = this.props.debounceWait;
+        this.signalScheduler = new SignalScheduler((changes) => {
+            const signalData = { ...this.signalData };
+            const delta = {};
+            for (const name in changes) {
+                const value = cleanJson(changes[name]);
+                if (!deepEqual(value, signalData[name])) {
+                    signalData[name] = value;
+                    delta[name] = value;
+                }
+            }
+            if (Object.keys(delta).length === 0) { return; }
+            this.signalData = signalData;
+            this.reportSignals(delta, false);
+        }, {
+            policy: this.props.signalUpdatePolicy,
+            wait: wait,
+            maxWait: this.props.maxWait !== undefined && this.props.maxWait !== null ? this.props.maxWait : wait,
+        });
+    }
+
+    reportSignals(changes, reset) {
+        this.signalReports += 1;
+        if (this.props.signalDataFormat === 'delta') {
+            // Only send the signals which changed. With reset, the changes
+            // contain all observed signals and replace the previous state.
+            this.signalSeq += 1;
+            this.props.setProps({
+                signalDelta: { id: this.signalStream, seq: this.signalSeq, reset: reset, signals: changes },
+            });
+        } else {
+            this.props.setProps({ signalData: this.signalData });
+        }
+    }
+
+    resyncSignals() {
+        // Send the full state of the observed signals again, including the
+        // changes which are still waiting to be reported
+        if (!this.signalScheduler) { return; }
+        this.signalScheduler.flush();
+        this.reportSignals({ ...this.signalData }, true);
+    }
+
+    reportStats(event, timings, bytes, view = this.vegaView) {
+        // Only a sample of the measurements is sent to Dash so that collecting
+        // them does not slow down dashboards with many updates
+        const rate = this.props.renderStatsSampleRate;
+        if (!(rate > 0) || Math.random() >= rate) { return; }
+        const rounded = {};
+        for (const phase in timings) {
+            rounded[phase] = Math.round(timings[phase] * 10) / 10;
+        }
+        const elapsed = (now() - this.signalWindowStart) / 1000;
+        this.statsSeq += 1;
+        this.props.setProps({
+            renderStats: {
+                seq: this.statsSeq,
+                event: event,
+                timestamp: Date.now(),
+                renderer: this.workerView ? 'worker' : (this.props.opt || {}).renderer || 'canvas',
+                timings: rounded,
+                rows: view ? datasetRows(view, this.dataNames) : {},
+                bytes: bytes(),
+                signals: {
+                    events: this.signalEvents,
+                    reports: this.signalReports,
+                    eventsPerSecond: elapsed > 0 ? Math.round(this.signalEvents / elapsed * 10) / 10 : 0,
+                },
+            },
+        });
+        this.signalEvents = 0;
+        this.signalReports = 0;
+        this.signalWindowStart = now();
+    }
+
+    memoryStats() {
+        // See memoryReport in utils/lifecycle.js
+        const view = this.vegaView;
+        let state = 'empty';
+        if (this.workerView) {
+            state = 'worker';
+        } else if (view) {
+            state = this.paused ? 'paused' : 'embedded';
+        } else if (this.deferred) {
+            state = 'deferred';
+        }
+        let canvasBytes = 0;
+        if (this.el && !this.workerView) {
+            this.el.querySelectorAll('canvas').forEach((canvas) => {
+                canvasBytes += canvas.width * canvas.height * 4;
+            });
+        }
+        return {
+            id: this.props.id || null,
+            state: state,
+            rows: view ? datasetRows(view, this.dataNames) : {},
+            items: view ? scenegraphItems(view) : 0,
+            domNodes: this.el ? this.el.getElementsByTagName('*').length : 0,
+            canvasBytes: canvasBytes,
+            signalListeners: this.signalListeners.length + this.signalLinks.length,
+            pendingDataPatches: this.pendingDataPatches.length,
+        };
+    }
+
+    scaleSvg() {
+        if (!this.svgSize) { return; }
+        // Adjustment of width and height is based on https://github.com/vega/vega-lite/issues/1758#issuecomment-264677556
+        // The size is always computed based on the original size so that
+        // the scale factor can be changed without embedding the chart again.
+        const svg = this.el.querySelector('svg');
+        if (!svg) { return; }
+        const scaleFactor = this.props.svgRendererScaleFactor;
+        svg.setAttribute('width', this.svgSize.width * scaleFactor);
+        svg.setAttribute('height', this.svgSize.height * scaleFactor);
     }
 
     render() {
@@ -114,11 +903,26 @@ export default class Vega extends Component {
         // in update, or in the constructor so let's just copy the style property.
         let style = JSON.parse(JSON.stringify(this.props.style || {}));
         style.width = style.width || '100%';
+        if (this.state.placeholderHeight !== null && !style.height) {
+            style.minHeight = this.state.placeholderHeight;
+        }
         return <div id={this.divId} ref={this.getRef} className={this.props.className} style={style} />;
     }
 }
 
-Vega.defaultProps = { svgRendererScaleFactor: 1, signalsToObserve: [], signalData: {}, debounceWait: 10 };
+/**
+ * Estimate the height of a chart before it is embedded. The actual height
+ * also includes axes and legends but this is close enough for a placeholder.
+ */
+function estimateHeight(spec) {
+    if (spec && typeof spec.height === 'number') {
+        return spec.height;
+    }
+    const view = (spec && spec.config && spec.config.view) || {};
+    return view.continuousHeight || view.height || 300;
+}
+
+Vega.defaultProps = { svgRendererScaleFactor: 1, signalsToObserve: [], signalData: {}, debounceWait: 10, signalUpdatePolicy: 'debounce', signalDataFormat: 'full', lazy: false, lazyMargin: '200px', offscreenBehavior: 'keep', offscreenMargin: '1000px', renderInWorker: false, renderStatsSampleRate: 0, preserveState: false, pauseWhenHidden: false };
 
 Vega.propTypes = {
     /**
@@ -131,6 +935,22 @@ Vega.propTypes = {
      */
     spec: PropTypes.object,
 
+    /**
+     * An optional hash of the spec, e.g. created with dash_vega_components.spec_hash.
+     * If set, it is used to detect changes of the spec instead of comparing
+     * the whole spec which is a lot faster for large specs.
+     * Always update it together with the spec.
+     */
+    specHash: PropTypes.string,
+
+    /**
+     * URL of an image of the chart, e.g. a data URL created with
+     * dash_vega_components.prerender. It is shown until the interactive chart is
+     * rendered, including while the JavaScript of this component is loaded and
+     * while a lazy chart is not embedded yet. Always update it together with the spec.
+     */
+    prerendered: PropTypes.string,
+
     /**
      * Vega-Embed options. See https://github.com/vega/vega-embed#options for more details.
      */
@@ -153,6 +973,35 @@ Vega.propTypes = {
      */
     signalsToObserve: PropTypes.arrayOf(PropTypes.string),
 
+    /**
+     * If true, the state of the interactions with the chart is kept when the spec
+     * is replaced: the observed signals, the selections, and the zoom levels of
+     * scales which are bound to a selection. Only the signals and selections which
+     * exist in the new spec are restored. Charts which are rendered in a Web Worker
+     * do not keep their state. Defaults to false.
+     */
+    preserveState: PropTypes.bool,
+
+    /**
+     * A dictionary with the name of a signal as key and its new value as value, e.g.
+     * to set a parameter of the chart from a Dash control. Every time this property
+     * is set, the values are set on the existing view without embedding the chart
+     * again. Values which are already set are skipped and all others are evaluated
+     * with a single run of the view. Changes caused by this property are not
+     * reported back in signalData or signalDelta.
+     */
+    signalValues: PropTypes.object,
+
+    /**
+     * A dictionary with the name of a signal as key and the name of a channel as value.
+     * Changes of a linked signal are set on the signals which are linked to the same
+     * channel in all other Vega components on the page, directly in the browser and
+     * without a Dash callback, e.g. to synchronize the zoom level or a parameter of
+     * several charts. Only link signals which can be set, e.g. parameters with a value.
+     * Signals of charts which are rendered in a Web Worker cannot be linked.
+     */
+    linkedSignals: PropTypes.objectOf(PropTypes.string),
+
     /**
      * A read-only dictionary of signals with the key being the name of the signal.
      * The easiest way to make sense of it is to display the whole signalData dictionary
@@ -161,6 +1010,150 @@ Vega.propTypes = {
      */
     signalData: PropTypes.object,
 
+    /**
+     * Set to "delta" to report changes of the observed signals in the signalDelta
+     * property instead of the signalData property. Defaults to "full".
+     */
+    signalDataFormat: PropTypes.oneOf(['full', 'delta']),
+
+    /**
+     * A dictionary which is updated instead of signalData if
+     * signalDataFormat is "delta". It only contains the signals which changed since
+     * the last update under the key "signals", together with an increasing sequence
+     * number "seq" and the "id" of the component instance which sent it. If "reset"
+     * is true, "signals" contains all observed signals, e.g. after the chart was
+     * rendered again.
+     * Use dash_vega_components.SignalState to merge the updates into the full state.
+     * Set it to {"resync": True} from a callback to receive all observed signals
+     * again with "reset".
+     */
+    signalDelta: PropTypes.object,
+
+    /**
+     * A dictionary with the name of a dataset as key and a list of rows
+     * (list of dictionaries) as value. If set, the values replace the contents of
+     * the named datasets in the chart. Changing this property updates
+     * the data of the existing view without re-rendering the whole chart which is
+     * a lot faster and keeps the state of the chart, e.g. the zoom level and selections.
+     * With Altair, you can create a named dataset with e.g. alt.NamedData("my_data").
+     * Instead of a list of rows, you can also pass a dictionary as created by
+     * dash_vega_components.arrow_dataset to send the data in the Apache Arrow format,
+     * or by dash_vega_components.columnar_dataset to send it as columns of JSON.
+     */
+    data: PropTypes.objectOf(PropTypes.oneOfType([PropTypes.array, PropTypes.object])),
+
+    /**
+     * A dictionary with the name of a dataset as key and levels of detail of
+     * geographic data as value, as created by dash_vega_components.geo_levels.
+     * The coarsest level which is detailed enough for the current value of a signal,
+     * e.g. the width of the chart or the scale of a projection, is loaded into
+     * the dataset and the level is switched when the signal changes. The value has
+     * the keys "signal", "factor" (the level with a "size" of at least factor times
+     * the value of the signal is loaded), and "levels" (list of datasets as described
+     * for the data property with an additional key "size", sorted by size).
+     * Not supported for charts which are rendered in a Web Worker.
+     */
+    geoLevels: PropTypes.objectOf(PropTypes.object),
+
+    /**
+     * A dictionary with the name of a dataset as key and a dictionary describing
+     * incremental changes as value. These changes are applied to the existing view
+     * every time this property is set. Supported keys are:
+     * "insert" (list of rows to add or a dataset as described for the data property),
+     * "remove" (list of rows to remove or True to remove all rows),
+     * "modify" (list of rows with new values for existing rows, requires "key"), and
+     * "key" (name or list of names of the fields identifying a row).
+     * Rows to remove can also be given as key values if "key" is a single field.
+     * If no key is given, all rows are removed which match the fields of one of the
+     * rows in "remove".
+     */
+    dataPatch: PropTypes.objectOf(PropTypes.object),
+
+    /**
+     * A dictionary with the name of a dataset as key and a dictionary describing
+     * rows to append as value, e.g. for live data. Every time this property is set,
+     * the rows are inserted into the existing view. Supported keys are
+     * "rows" (list of rows or a dataset as described for the data property),
+     * "maxRows" (maximum number of rows to keep, the oldest rows are removed first),
+     * "timeField" and "window" (rows whose timeField is more than window milliseconds
+     * older than the latest appended row are removed), and
+     * "seq" (increasing sequence number, updates which were already applied are ignored).
+     * Rows are expected to arrive in the order of timeField.
+     * Use dash_vega_components.AppendCursor to create the updates.
+     */
+    appendData: PropTypes.objectOf(PropTypes.object),
+
+    /**
+     * If true, the chart is only embedded once it comes within lazyMargin of
+     * the viewport. Until then, an empty div with the estimated height of the chart
+     * is shown. This speeds up loading pages with many charts. Defaults to false.
+     */
+    lazy: PropTypes.bool,
+
+    /**
+     * Distance to the viewport at which a lazy chart is embedded, in the format of
+     * the CSS margin property, e.g. "200px 0px". Defaults to "200px".
+     */
+    lazyMargin: PropTypes.string,
+
+    /**
+     * What happens to a chart which is further away from the viewport than
+     * offscreenMargin. "keep" (default) keeps the chart. "suspend" frees the memory
+     * of the chart and embeds it again with the same state, e.g. selections and
+     * data, once it comes back. "finalize" also frees the memory but embeds the
+     * chart from scratch.
+     */
+    offscreenBehavior: PropTypes.oneOf(['keep', 'suspend', 'finalize']),
+
+    /**
+     * Distance to the viewport beyond which offscreenBehavior applies, in the format
+     * of the CSS margin property. Defaults to "1000px".
+     */
+    offscreenMargin: PropTypes.string,
+
+    /**
+     * If true, the chart is rendered in a Web Worker to an OffscreenCanvas so that
+     * parsing and rendering large charts does not block the rest of the app.
+     * Signals are reported as usual. Tooltips are shown as plain text, bindings
+     * of parameters to input elements are not supported, and the renderer option
+     * of opt as well as the theme option for Vega specs are ignored. Browsers without support for
+     * OffscreenCanvas render the chart as usual. Defaults to false.
+     */
+    renderInWorker: PropTypes.bool,
+
+    /**
+     * If true, the chart is paused while it is hidden, i.e. while the browser tab
+     * is in the background or while the chart is not displayed, e.g. in an
+     * inactive tab or inside an element with display: none. A paused chart does
+     * not evaluate or render changes of its data and signals. They are applied
+     * at once when it is shown again, without embedding the chart again. Charts
+     * which are hidden before they are embedded are embedded once they are shown,
+     * so signalData is only reported after that. Defaults to false.
+     */
+    pauseWhenHidden: PropTypes.bool,
+
+    /**
+     * Fraction of renders and data updates, between 0 and 1, for which measurements
+     * are reported in the renderStats property. Defaults to 0 which disables
+     * the measurements.
+     */
+    renderStatsSampleRate: PropTypes.number,
+
+    /**
+     * A read-only dictionary with measurements of the latest sampled render
+     * ("event" is "embed") or data update ("event" is "data"), see renderStatsSampleRate.
+     * "timings" contains the durations in milliseconds of the phases "compile"
+     * (Vega-Lite to Vega), "parse", "run" (evaluation of the dataflow including
+     * "render"), "render", "dataflow" (run without render), "embed", and "load"
+     * (decoding data), and the "total" duration. "rows" contains the number of rows per
+     * dataset, "bytes" the approximate size of the received spec or data, and
+     * "signals" the number of signal changes ("events") and of updates of the
+     * signal properties ("reports") since the previous measurement.
+     * Charts which are rendered in a Web Worker only report the total duration.
+     * Use dash_vega_components.forward_render_stats to pass them to a function.
+     */
+    renderStats: PropTypes.object,
+
     /**
      * Generic style overrides on the Vega div
      */
@@ -177,6 +1170,23 @@ Vega.propTypes = {
      */
     debounceWait: PropTypes.number,
 
+    /**
+     * How changes of the observed signals are reported to Dash. Changes of all signals
+     * are always collected and sent with a single update of signalData.
+     * "debounce" (default) sends the changes once no signal changed for debounceWait
+     * milliseconds, but at the latest after maxWait milliseconds.
+     * "throttle" sends changes at most once every debounceWait milliseconds.
+     * "animationFrame" sends changes at most once per frame rendered by the browser.
+     * In all cases, the last state of the signals is always sent.
+     */
+    signalUpdatePolicy: PropTypes.oneOf(['debounce', 'throttle', 'animationFrame']),
+
+    /**
+     * Maximum time in milliseconds a change of a signal is delayed if
+     * signalUpdatePolicy is "debounce". Defaults to debounceWait.
+     */
+    maxWait: PropTypes.number,
+
     /**
      * Dash-assigned callback that should be called to report property changes
      * to Dash, to make them available for callbacks.
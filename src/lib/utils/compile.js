@@ -0,0 +1,174 @@
+import * as themes from 'vega-themes';
+
+// Maximum number of compiled specs which are kept per page
+const MAX_ENTRIES = 32;
+
+// Shared by all Vega components on the page. Maps a key of the Vega-Lite spec
+// to the compiled Vega spec without the datasets. A Map iterates in insertion
+// order so the first key is always the least recently used one.
+const cache = new Map();
+
+// Compiled specs of the Vega-Lite specs which are passed to vegaEmbed as they
+// are so that its actions show the original spec. vegaEmbed calls compile of
+// the stub with the same object which returns the spec from here.
+const precompiled = new WeakMap();
+
+// The Vega-Lite compiler is a separate chunk which is only loaded once a chart
+// needs it. Specs which were compiled on the server never load it.
+// 'vega-lite-compiler' is an alias of vega-lite, see webpack.config.js.
+let compiler = null;
+
+function loadCompiler() {
+    if (!compiler) {
+        compiler = import(/* webpackChunkName: "VegaLite" */ 'vega-lite-compiler');
+    }
+    return compiler;
+}
+
+function isVegaLite(spec, opt) {
+    if (typeof spec.$schema === 'string') {
+        return spec.$schema.includes('/vega-lite/');
+    }
+    // Same default as vega-embed
+    return (opt.mode || 'vega-lite') === 'vega-lite';
+}
+
+function isObject(value) {
+    return value !== null && typeof value === 'object' && !Array.isArray(value);
+}
+
+function mergeConfig(target, source) {
+    const merged = { ...target };
+    for (const key in source) {
+        merged[key] = isObject(merged[key]) && isObject(source[key])
+            ? mergeConfig(merged[key], source[key])
+            : source[key];
+    }
+    return merged;
+}
+
+/**
+ * Attach the datasets of a Vega-Lite spec to the compiled Vega spec in the
+ * same way as the Vega-Lite compiler does, i.e. as values of the data sources
+ * with the same name. The cached spec itself is never modified.
+ */
+function bindDatasets(vgSpec, datasets) {
+    if (!datasets || !vgSpec.data) {
+        return vgSpec;
+    }
+    const data = vgSpec.data.map((source) =>
+        source.name in datasets && source.values === undefined && source.url === undefined
+            ? { ...source, values: datasets[source.name] }
+            : source
+    );
+    return { ...vgSpec, data: data };
+}
+
+/**
+ * Move the inline values of the data of a Vega-Lite spec, e.g. of a layer or
+ * a lookup, to named datasets so that they are neither part of the cache key
+ * nor of the cached spec. The sources are named by their position so that
+ * specs which only differ in their data share the same key.
+ */
+function extractInlineData(spec, datasets) {
+    const inline = {};
+    let count = 0;
+    const strip = (node) => {
+        if (Array.isArray(node)) {
+            return node.map(strip);
+        }
+        if (!isObject(node)) {
+            return node;
+        }
+        const copy = {};
+        for (const key in node) {
+            const value = node[key];
+            if (key === 'data' && isObject(value) && Array.isArray(value.values)) {
+                let name;
+                do {
+                    name = 'dvc-inline-' + count;
+                    count += 1;
+                } while (datasets && name in datasets);
+                const { values, ...source } = value;
+                inline[name] = values;
+                copy[key] = { ...source, name: name };
+            } else {
+                copy[key] = strip(value);
+            }
+        }
+        return copy;
+    };
+    const stripped = strip(spec);
+    return count ? [stripped, { ...datasets, ...inline }] : [spec, datasets];
+}
+
+/**
+ * Compile a Vega-Lite spec to Vega and cache the result so that charts with
+ * the same spec, e.g. in several components or after a callback returned
+ * the same chart again, are not compiled again. The datasets and inline data
+ * of the spec are not part of the key and are bound to the compiled spec for
+ * every chart.
+ *
+ * Resolves to the spec and embed options to pass to vegaEmbed which always
+ * embeds a Vega spec. The theme and config are applied during the compilation
+ * in the same way as vega-embed does. Vega specs are returned unchanged.
+ */
+export function compileSpec(spec, specHash, opt) {
+    opt = opt || {};
+    if (!isVegaLite(spec, opt)) {
+        return Promise.resolve([spec, opt]);
+    }
+    const { datasets: specDatasets, ...specRest } = spec;
+    const { theme, config: _, ...embedOptions } = opt;
+    const themeConfig = theme ? themes[theme] : undefined;
+    const config = themeConfig || opt.config
+        ? mergeConfig(themeConfig || {}, opt.config || {})
+        : null;
+    const [rest, datasets] = extractInlineData(specRest, specDatasets);
+    // specHash avoids to serialize large specs. It also changes with the datasets
+    // which only leads to less reuse of compiled specs.
+    const key = specHash
+        ? 'hash:' + specHash + JSON.stringify(config)
+        : JSON.stringify([rest, config]);
+
+    const compiled = cache.has(key)
+        ? Promise.resolve(cache.get(key))
+        : loadCompiler().then((vegaLite) => vegaLite.compile(rest, config ? { config: config } : {}).spec);
+    return compiled.then((vgSpec) => {
+        cache.delete(key);
+        if (cache.size >= MAX_ENTRIES) {
+            cache.delete(cache.keys().next().value);
+        }
+        cache.set(key, vgSpec);
+        // The config is already part of the compiled spec
+        return [bindDatasets(vgSpec, datasets), { ...embedOptions, mode: 'vega' }];
+    });
+}
+
+export function precompiledSpec(spec) {
+    return precompiled.get(spec);
+}
+
+function hasSourceActions(opt) {
+    const actions = opt.actions;
+    if (actions === undefined || actions === true) {
+        return true;
+    }
+    return isObject(actions) && (actions.source !== false || actions.editor !== false);
+}
+
+/**
+ * Return the spec and options to pass to vegaEmbed for a spec which was
+ * compiled with compileSpec. If the View Source or Open in Vega Editor
+ * actions are shown, the original Vega-Lite spec is embedded instead of the
+ * compiled one so that the actions show it, and vega-embed gets the
+ * compiled spec from the stub of the compiler.
+ */
+export function embedArguments(spec, opt, vgSpec, vgOpt) {
+    opt = opt || {};
+    if (vgSpec === spec || !hasSourceActions(opt)) {
+        return [vgSpec, vgOpt];
+    }
+    precompiled.set(spec, vgSpec);
+    return [spec, { ...opt, mode: 'vega-lite' }];
+}
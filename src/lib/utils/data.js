@@ -0,0 +1,403 @@
+import { changeset, formats, read } from 'vega';
+
+// Allows to use {"type": "arrow"} as data format in specs as well as in the
+// data properties. The loader exposes the rows of an Arrow table as light-weight
+// proxy objects which read directly from the columns of the table. It includes
+// Apache Arrow and is therefore a separate chunk which is only loaded once a
+// chart uses the format.
+let arrowFormat = null;
+
+function loadArrow() {
+    if (!arrowFormat) {
+        arrowFormat = import(/* webpackChunkName: "Arrow" */ 'vega-loader-arrow').then((module) => {
+            formats('arrow', module.default);
+        });
+    }
+    return arrowFormat;
+}
+
+function loadFormat(format) {
+    return format && format.type === 'arrow' ? loadArrow() : Promise.resolve();
+}
+
+/**
+ * Load the data formats which are used by the datasets of a Vega spec and are
+ * not part of the main bundle. Returns a promise.
+ */
+export function loadFormats(spec) {
+    return Promise.all((spec.data || []).map((source) => loadFormat(source.format)));
+}
+
+function columnLength(column) {
+    if (Array.isArray(column)) {
+        return column.length;
+    }
+    return column.type === 'dictionary' ? column.codes.length : column.values.length;
+}
+
+// Returns a function which reads the value of a row from a column as encoded
+// by dash_vega_components.to_columnar
+function columnReader(column) {
+    if (Array.isArray(column)) {
+        return (i) => column[i];
+    }
+    if (column.type === 'dictionary') {
+        const values = columnValues(column.values);
+        return (i) => (column.codes[i] < 0 ? null : values[column.codes[i]]);
+    }
+    if (column.type === 'timestamp') {
+        if (!column.local) {
+            return (i) => column.values[i];
+        }
+        // The timestamps are the wall-clock times in UTC. Shift them so that
+        // they show the same time in the time zone of the browser.
+        return (i) => {
+            const value = column.values[i];
+            return value === null ? null : value + new Date(value).getTimezoneOffset() * 60000;
+        };
+    }
+    throw new Error('Unsupported column type: ' + column.type);
+}
+
+function columnValues(column) {
+    if (Array.isArray(column)) {
+        return column;
+    }
+    const read = columnReader(column);
+    return Array.from({ length: columnLength(column) }, (_, i) => read(i));
+}
+
+/**
+ * Expand a dataset in the columnar format of dash_vega_components.columnar_dataset
+ * to rows. The number of rows is taken from the first column so that columns can
+ * be extended with a Dash Patch.
+ */
+function columnar(data) {
+    const { columns } = typeof data === 'string' ? JSON.parse(data) : data;
+    const names = Object.keys(columns);
+    const readers = names.map((name) => columnReader(columns[name]));
+    const length = names.length ? columnLength(columns[names[0]]) : 0;
+    const rows = new Array(length);
+    for (let i = 0; i < length; i++) {
+        const row = {};
+        for (let j = 0; j < names.length; j++) {
+            row[names[j]] = readers[j](i);
+        }
+        rows[i] = row;
+    }
+    return rows;
+}
+
+formats('columnar', columnar);
+
+function decodeBase64(text) {
+    const binary = atob(text);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i);
+    }
+    return bytes;
+}
+
+/**
+ * Resolve a dataset as passed to the data properties to an array of rows.
+ * A dataset is either already an array of rows or an object with a "format"
+ * and one of "values", "base64" (binary data such as Arrow IPC) or "url".
+ * Returns a promise.
+ */
+export function loadDataset(view, dataset) {
+    if (Array.isArray(dataset)) {
+        return Promise.resolve(dataset);
+    }
+    const format = dataset.format || {};
+    return loadFormat(format).then(() => {
+        if (dataset.base64 !== undefined) {
+            return read(decodeBase64(dataset.base64), format);
+        }
+        if (dataset.url !== undefined) {
+            const response = (formats(format.type || 'json') || {}).responseType || 'text';
+            return view.loader().load(dataset.url, { response: response }).then((data) => read(data, format));
+        }
+        if (dataset.values !== undefined) {
+            return read(dataset.values, format);
+        }
+        throw new Error('Unsupported dataset: ' + JSON.stringify(Object.keys(dataset)));
+    });
+}
+
+/**
+ * Resolve all datasets of the data property, see loadDataset.
+ */
+export function loadDatasets(view, datasets) {
+    const names = Object.keys(datasets || {});
+    return Promise.all(names.map((name) => loadDataset(view, datasets[name]))).then((values) => {
+        const loaded = {};
+        names.forEach((name, i) => {
+            loaded[name] = values[i];
+        });
+        return loaded;
+    });
+}
+
+/**
+ * Resolve the rows to insert of a dataPatch, see loadDataset.
+ */
+export function loadPatch(view, patch) {
+    const names = Object.keys(patch || {});
+    return Promise.all(names.map((name) => {
+        const change = patch[name] || {};
+        if (!change.insert) {
+            return Promise.resolve(change);
+        }
+        return loadDataset(view, change.insert).then((insert) => ({ ...change, insert: insert }));
+    })).then((changes) => {
+        const loaded = {};
+        names.forEach((name, i) => {
+            loaded[name] = changes[i];
+        });
+        return loaded;
+    });
+}
+
+// Build a function which returns a hashable identity for a row based on
+// the given key field(s). Scalars are accepted as well so that a single
+// key field can be removed with e.g. `remove: [1, 2, 3]`.
+function keyAccessor(key) {
+    const fields = Array.isArray(key) ? key : [key];
+    if (fields.length === 1) {
+        const field = fields[0];
+        return (row) => (row !== null && typeof row === 'object' ? row[field] : row);
+    }
+    return (row) => JSON.stringify(fields.map((field) => row[field]));
+}
+
+// Predicate matching all tuples which correspond to one of the given rows.
+// If no key is given, a tuple matches if it has the same values for all
+// fields present in one of the rows.
+function rowMatcher(rows, key) {
+    if (key !== undefined && key !== null) {
+        const accessor = keyAccessor(key);
+        const keys = new Set(rows.map(accessor));
+        return (tuple) => keys.has(accessor(tuple));
+    }
+    return (tuple) => rows.some((row) => Object.keys(row).every((field) => tuple[field] === row[field]));
+}
+
+function timeOf(row, field) {
+    const value = row[field];
+    if (value instanceof Date) {
+        return value.getTime();
+    }
+    return typeof value === 'string' ? Date.parse(value) : value;
+}
+
+// The tuples which a changeset of the named dataset is applied to, i.e. the
+// input of the dataset before its transforms. Same as in View.change.
+function inputTuples(view, name) {
+    const dataset = view._runtime.data[name];
+    if (!dataset) {
+        throw new Error(`Unrecognized data set: ${name}`);
+    }
+    const input = dataset.input;
+    return (input.pulse && input.pulse.source) || [];
+}
+
+/**
+ * Collects the changes of one dataset and turns them into a single changeset.
+ *
+ * Vega only keeps the last changeset per dataset until the view runs, and the
+ * removals and modifications of a changeset only apply to the rows which were
+ * there before it. Therefore, the changes are applied one after the other to
+ * a model of the rows here: the existing tuples which are removed or
+ * modified, followed by the new rows.
+ */
+class DatasetChanges {
+    constructor(tuples) {
+        this.tuples = tuples;
+        this.removed = new Set();
+        this.modified = new Map();
+        this.inserted = [];
+    }
+
+    // The current rows in order, as [tuple, row] pairs. New rows have no tuple.
+    rows() {
+        const rows = [];
+        this.tuples.forEach((tuple) => {
+            if (!this.removed.has(tuple)) {
+                const changes = this.modified.get(tuple);
+                rows.push([tuple, changes ? { ...tuple, ...changes } : tuple]);
+            }
+        });
+        this.inserted.forEach((row) => rows.push([null, row]));
+        return rows;
+    }
+
+    removeWhere(predicate) {
+        this.rows().forEach(([tuple, row]) => {
+            if (tuple && predicate(row)) { this.removed.add(tuple); }
+        });
+        this.inserted = this.inserted.filter((row) => !predicate(row));
+    }
+
+    removeFirst(count) {
+        const rows = this.rows().slice(0, count);
+        const inserted = new Set();
+        rows.forEach(([tuple, row]) => (tuple ? this.removed.add(tuple) : inserted.add(row)));
+        this.inserted = this.inserted.filter((row) => !inserted.has(row));
+    }
+
+    replace(rows) {
+        this.removeWhere(() => true);
+        this.inserted = rows.slice();
+    }
+
+    modify(rows, key) {
+        if (key === undefined || key === null) {
+            throw new Error('A key is required to modify rows of a dataset.');
+        }
+        const accessor = keyAccessor(key);
+        const updates = new Map(rows.map((row) => [accessor(row), row]));
+        this.rows().forEach(([tuple, row]) => {
+            const update = updates.get(accessor(row));
+            if (!update || !tuple) { return; }
+            this.modified.set(tuple, { ...this.modified.get(tuple), ...update });
+        });
+        this.inserted = this.inserted.map((row) => {
+            const update = updates.get(accessor(row));
+            return update ? { ...row, ...update } : row;
+        });
+    }
+
+    insert(rows) {
+        this.inserted = this.inserted.concat(rows);
+    }
+
+    // Drop the rows which fall out of the retention policy of an append whose
+    // rows were just inserted. Rows older than timeWindow milliseconds before
+    // the latest appended row and the oldest rows beyond maxRows are dropped.
+    // Rows are expected to arrive in order so that only the start of the
+    // rows has to be checked.
+    retain(appended, maxRows, timeField, timeWindow) {
+        if (timeField && timeWindow && appended.length) {
+            const latest = appended.reduce((max, row) => Math.max(max, timeOf(row, timeField)), -Infinity);
+            const cutoff = latest - timeWindow;
+            const rows = this.rows();
+            let expired = 0;
+            while (expired < rows.length && timeOf(rows[expired][1], timeField) < cutoff) {
+                expired++;
+            }
+            this.removeFirst(expired);
+            const late = new Set(appended.filter((row) => timeOf(row, timeField) < cutoff));
+            this.inserted = this.inserted.filter((row) => !late.has(row));
+        }
+        if (maxRows !== undefined && maxRows !== null) {
+            const excess = this.rows().length - maxRows;
+            if (excess > 0) {
+                this.removeFirst(excess);
+            }
+        }
+    }
+
+    changeset() {
+        const cs = changeset();
+        if (this.removed.size) {
+            cs.remove(Array.from(this.removed));
+        }
+        this.modified.forEach((changes, tuple) => {
+            if (this.removed.has(tuple)) { return; }
+            Object.keys(changes).forEach((field) => cs.modify(tuple, field, changes[field]));
+        });
+        if (this.inserted.length) {
+            cs.insert(this.inserted);
+        }
+        return cs;
+    }
+}
+
+/**
+ * Collects the changes of the data properties for the datasets of a view and
+ * applies them as one changeset per dataset, see DatasetChanges.
+ */
+class DataChanges {
+    constructor(view) {
+        this.view = view;
+        this.datasets = new Map();
+    }
+
+    update(name, apply) {
+        try {
+            if (!this.datasets.has(name)) {
+                this.datasets.set(name, new DatasetChanges(inputTuples(this.view, name)));
+            }
+            apply(this.datasets.get(name));
+        } catch (error) {
+            console.error(`dash-vega-components: could not update dataset '${name}'.`, error);
+        }
+    }
+
+    /**
+     * Replace the contents of the named datasets. `data` is an object mapping
+     * dataset names to arrays of rows.
+     */
+    replace(data) {
+        Object.keys(data || {}).forEach((name) => {
+            this.update(name, (dataset) => dataset.replace(data[name] || []));
+        });
+    }
+
+    /**
+     * Apply incremental changes to the named datasets. `patch` is an object
+     * mapping dataset names to an object with the optional keys `insert`,
+     * `remove`, `modify` and `key`. See the description of the `dataPatch`
+     * property for details. The retention policy of the `appendData` property
+     * is given by `maxRows`, `timeField` and `window`.
+     */
+    patch(patch) {
+        Object.keys(patch || {}).forEach((name) => {
+            const { insert, remove, modify, key, maxRows, timeField, window: timeWindow } = patch[name] || {};
+            this.update(name, (dataset) => {
+                if (remove === true) {
+                    dataset.removeWhere(() => true);
+                } else if (remove && remove.length) {
+                    dataset.removeWhere(rowMatcher(remove, key));
+                }
+                if (modify && modify.length) {
+                    dataset.modify(modify, key);
+                }
+                const rows = insert || [];
+                dataset.insert(rows);
+                if ((maxRows !== undefined && maxRows !== null) || (timeField && timeWindow)) {
+                    dataset.retain(rows, maxRows, timeField, timeWindow);
+                }
+            });
+        });
+    }
+
+    apply() {
+        this.datasets.forEach((dataset, name) => {
+            try {
+                this.view.change(name, dataset.changeset());
+            } catch (error) {
+                console.error(`dash-vega-components: could not update dataset '${name}'.`, error);
+            }
+        });
+        this.datasets.clear();
+    }
+}
+
+/**
+ * Change the data of a view. `update` is called with a DataChanges object to
+ * which it adds the changes with `replace` and `patch`. The changes are added
+ * to the ones of a paused view and applied once it is resumed, see
+ * pausableView. Does not run the view, call `view.runAsync()` afterwards.
+ */
+export function changeData(view, update) {
+    const changes = view.pendingChanges || new DataChanges(view);
+    update(changes);
+    if (view.paused) {
+        view.pendingChanges = changes;
+        return;
+    }
+    view.pendingChanges = null;
+    changes.apply();
+}
@@ -0,0 +1,95 @@
+/**
+ * Create a subclass of a Vega View which can be paused. While it is paused,
+ * changes of signals, e.g. from events or timers, are collected by the
+ * dataflow but not evaluated or rendered. Changes of the data properties are
+ * collected in pendingChanges instead as the dataflow only keeps the last
+ * changeset per dataset, see changeData in ./data.js. Resuming applies and
+ * evaluates all of them with a single run of the view.
+ */
+export function pausableView(Base) {
+    return class PausableView extends Base {
+        constructor(runtime, options) {
+            super(runtime, options);
+            this.paused = false;
+            this.pendingChanges = null;
+        }
+
+        pause() {
+            this.paused = true;
+            return this;
+        }
+
+        resume() {
+            if (!this.paused) { return Promise.resolve(this); }
+            this.paused = false;
+            if (this.pendingChanges) {
+                const changes = this.pendingChanges;
+                this.pendingChanges = null;
+                changes.apply();
+            }
+            return this.runAsync();
+        }
+
+        evaluate(encode, prerun, postrun) {
+            // Operators which were touched in the meantime stay pending until
+            // the view runs after it is resumed
+            if (this.paused) { return Promise.resolve(this); }
+            return super.evaluate(encode, prerun, postrun);
+        }
+    };
+}
+
+// Vega components which are mounted on the page, see memoryReport
+const components = new Set();
+const counts = { mounted: 0, unmounted: 0 };
+
+export function register(component) {
+    components.add(component);
+    counts.mounted += 1;
+}
+
+export function unregister(component) {
+    if (components.delete(component)) {
+        counts.unmounted += 1;
+    }
+}
+
+/**
+ * Number of items in the scenegraph of a view, i.e. of the rendered marks.
+ */
+export function scenegraphItems(view) {
+    let items = 0;
+    const stack = [view.scenegraph().root];
+    while (stack.length) {
+        const node = stack.pop();
+        if (node && node.items) {
+            items += node.items.length;
+            node.items.forEach((item) => stack.push(item));
+        }
+    }
+    return items;
+}
+
+/**
+ * Memory accounting of all Vega components on the page, e.g. for soak tests
+ * which check that charts are released after navigating between pages.
+ * Available in the browser as window.dashVegaComponents.memoryReport().
+ */
+export function memoryReport() {
+    const views = Array.from(components).map((component) => component.memoryStats());
+    const memory = typeof performance !== 'undefined' && performance.memory;
+    return {
+        components: components.size,
+        mounted: counts.mounted,
+        unmounted: counts.unmounted,
+        views: views.filter((view) => view.state !== 'empty' && view.state !== 'deferred').length,
+        canvasBytes: views.reduce((total, view) => total + view.canvasBytes, 0),
+        // Only available in Chromium based browsers
+        heapUsed: memory ? memory.usedJSHeapSize : null,
+        perView: views,
+    };
+}
+
+if (typeof window !== 'undefined') {
+    window.dashVegaComponents = { ...(window.dashVegaComponents || {}), memoryReport: memoryReport };
+}
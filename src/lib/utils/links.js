@@ -0,0 +1,50 @@
+/**
+ * Channels through which Vega components on the same page share the values of
+ * signals, see the linkedSignals property. A channel keeps its latest value
+ * so that charts which are embedded later start with the current state.
+ */
+const channels = new Map();
+
+function getChannel(name) {
+    let channel = channels.get(name);
+    if (!channel) {
+        channel = { value: undefined, hasValue: false, subscribers: new Set() };
+        channels.set(name, channel);
+    }
+    return channel;
+}
+
+/**
+ * Call `callback` with every value which another subscriber publishes to
+ * the channel, and right away with the latest value if there is one.
+ * Returns a function which removes the subscription.
+ */
+export function subscribe(name, callback) {
+    const channel = getChannel(name);
+    channel.subscribers.add(callback);
+    if (channel.hasValue) {
+        callback(channel.value);
+    }
+    return () => {
+        channel.subscribers.delete(callback);
+        // Channels without subscribers do not keep their value
+        if (channel.subscribers.size === 0) {
+            channels.delete(name);
+        }
+    };
+}
+
+/**
+ * Send a value to all subscribers of the channel except `source`, which is
+ * the callback of the subscriber which publishes the value.
+ */
+export function publish(name, value, source) {
+    const channel = getChannel(name);
+    channel.value = value;
+    channel.hasValue = true;
+    channel.subscribers.forEach((callback) => {
+        if (callback !== source) {
+            callback(value);
+        }
+    });
+}
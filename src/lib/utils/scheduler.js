@@ -0,0 +1,94 @@
+const now = () => (typeof performance !== 'undefined' ? performance.now() : Date.now());
+
+/**
+ * Collects changes of signals and reports all pending changes at once
+ * to the flush callback. If a signal changes several times before the changes
+ * are flushed, only the latest value is reported. A scheduled flush is never
+ * dropped so that the final state of the signals is always reported.
+ *
+ * Supported policies are:
+ * - 'debounce': flush once no signal changed for `wait` milliseconds but at
+ *   the latest `maxWait` milliseconds after the first pending change.
+ * - 'throttle': flush immediately and then at most once every `wait` milliseconds.
+ * - 'animationFrame': flush at most once per animation frame of the browser.
+ */
+export default class SignalScheduler {
+    constructor(flush, { policy = 'debounce', wait = 10, maxWait = wait } = {}) {
+        this.onFlush = flush;
+        this.policy = policy;
+        this.wait = wait;
+        this.maxWait = Math.max(maxWait, wait);
+        this.pending = {};
+        this.hasPending = false;
+        this.firstPendingTime = null;
+        this.lastFlushTime = -Infinity;
+        this.timer = null;
+        this.frame = null;
+        this.flush = this.flush.bind(this);
+    }
+
+    push(name, value) {
+        this.pending[name] = value;
+        if (!this.hasPending) {
+            this.hasPending = true;
+            this.firstPendingTime = now();
+        }
+        this.schedule();
+    }
+
+    schedule() {
+        if (this.policy === 'animationFrame' && typeof requestAnimationFrame !== 'undefined') {
+            if (this.frame === null) {
+                this.frame = requestAnimationFrame(this.flush);
+            }
+            return;
+        }
+        const time = now();
+        let delay;
+        if (this.policy === 'throttle') {
+            if (this.timer !== null) {
+                return;
+            }
+            delay = Math.max(0, this.lastFlushTime + this.wait - time);
+        } else {
+            delay = Math.min(this.wait, Math.max(0, this.firstPendingTime + this.maxWait - time));
+            this.clearTimer();
+        }
+        if (delay === 0 && this.policy === 'throttle') {
+            this.flush();
+        } else {
+            this.timer = setTimeout(this.flush, delay);
+        }
+    }
+
+    clearTimer() {
+        if (this.timer !== null) {
+            clearTimeout(this.timer);
+            this.timer = null;
+        }
+        if (this.frame !== null) {
+            cancelAnimationFrame(this.frame);
+            this.frame = null;
+        }
+    }
+
+    flush() {
+        this.clearTimer();
+        if (!this.hasPending) {
+            return;
+        }
+        const changes = this.pending;
+        this.pending = {};
+        this.hasPending = false;
+        this.firstPendingTime = null;
+        this.lastFlushTime = now();
+        this.onFlush(changes);
+    }
+
+    cancel() {
+        this.clearTimer();
+        this.pending = {};
+        this.hasPending = false;
+        this.firstPendingTime = null;
+    }
+}
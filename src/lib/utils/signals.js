@@ -0,0 +1,48 @@
+import { deepEqual } from './compare';
+
+/**
+ * Select the signals to report to Dash from the state of a view.
+ * Only signals in signalsToObserve are kept, or all of them if it equals ['all'].
+ * If the list is empty, no signals are kept.
+ */
+export function filterSignals(signals, signalsToObserve) {
+    // Ignore the 'unit' signal as it's rather complex,
+    // contains references which can't be serialized to JSON, and it's
+    // not useful to most users in the Dash context
+    const filteredSignals = {};
+    for (const signal in signals) {
+        if (signal === 'unit') {
+            continue;
+        }
+        if (signalsToObserve[0] === 'all' || signalsToObserve.includes(signal)) {
+            filteredSignals[signal] = signals[signal];
+        }
+    }
+    return filteredSignals;
+}
+
+export function cleanJson(data) {
+    // Not sure if this is needed but it's in the Jupyterchart
+    // implementation in Vega-Altair. Worth to be
+    // on the safe side for now.
+    return data === undefined ? data : JSON.parse(JSON.stringify(data));
+}
+
+/**
+ * Set the values of signals on a view, skipping the ones which already have
+ * the value. Returns true if any signal changed and the view needs to run.
+ */
+export function setSignalValues(view, values) {
+    let changed = false;
+    for (const name in values) {
+        try {
+            if (!deepEqual(view.signal(name), values[name])) {
+                view.signal(name, values[name]);
+                changed = true;
+            }
+        } catch (error) {
+            console.warn(`dash-vega-components: cannot set the unknown signal '${name}'.`);
+        }
+    }
+    return changed;
+}
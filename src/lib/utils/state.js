@@ -0,0 +1,67 @@
+import { filterSignals } from './signals';
+
+// Signals which describe the layout of the chart and are defined by the spec
+const LAYOUT_SIGNALS = ['width', 'height', 'padding', 'autosize', 'background', 'cursor'];
+// Vega-Lite keeps the state of a selection in a dataset named <param>_store
+const STORE_SUFFIX = '_store';
+
+function hasSignal(view, name) {
+    try {
+        view.signal(name);
+        return true;
+    } catch (error) {
+        return false;
+    }
+}
+
+function hasData(view, name) {
+    try {
+        view.data(name);
+        return true;
+    } catch (error) {
+        return false;
+    }
+}
+
+/**
+ * Snapshot the interaction state of a view: the observed signals, the stores of
+ * the Vega-Lite selections, and the signals of these selections, e.g. the
+ * extent of an interval brush or the domain of a zoomed scale.
+ */
+export function snapshotState(view, signalsToObserve) {
+    const { data } = view.getState({
+        signals: () => false,
+        data: (name) => name.endsWith(STORE_SUFFIX),
+        recurse: false,
+    });
+    const selections = Object.keys(data || {}).map((name) => name.slice(0, -STORE_SUFFIX.length));
+    const observed = filterSignals(view.getState().signals || {}, signalsToObserve);
+    const { signals } = view.getState({
+        signals: (name) => !LAYOUT_SIGNALS.includes(name) &&
+            (name in observed || selections.some((selection) => name.startsWith(selection + '_'))),
+        data: () => false,
+        recurse: false,
+    });
+    return { signals: signals || {}, data: data || {} };
+}
+
+/**
+ * Restore a state created by snapshotState into a view which might have been
+ * created from a different spec. Only signals and datasets which exist in the
+ * view are restored. The view is evaluated again. Returns true if anything was restored.
+ */
+export function restoreState(view, state) {
+    const signals = {};
+    const data = {};
+    for (const name in state.signals) {
+        if (hasSignal(view, name)) { signals[name] = state.signals[name]; }
+    }
+    for (const name in state.data) {
+        if (hasData(view, name)) { data[name] = state.data[name]; }
+    }
+    if (!Object.keys(signals).length && !Object.keys(data).length) {
+        return false;
+    }
+    view.setState({ signals: signals, data: data });
+    return true;
+}
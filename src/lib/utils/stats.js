@@ -0,0 +1,68 @@
+import { View } from 'vega';
+
+export function now() {
+    return typeof performance !== 'undefined' ? performance.now() : Date.now();
+}
+
+/**
+ * Create a subclass of the Vega View, or of `Base`, which adds the time spent in runAsync and
+ * in the renderer to `totals.run` and `totals.render`, and sets `totals.parsed`
+ * once the spec is parsed. It is passed as the viewClass option to vegaEmbed
+ * which creates the view right after parsing the spec.
+ */
+export function instrumentedView(totals, Base = View) {
+    return class InstrumentedView extends Base {
+        constructor(runtime, options) {
+            totals.parsed = now();
+            super(runtime, options);
+        }
+
+        initialize(el, elBind) {
+            super.initialize(el, elBind);
+            const renderer = this._renderer;
+            if (renderer) {
+                const render = renderer.render;
+                renderer.render = function (...args) {
+                    const start = now();
+                    try {
+                        return render.apply(this, args);
+                    } finally {
+                        totals.render += now() - start;
+                    }
+                };
+            }
+            return this;
+        }
+
+        runAsync(...args) {
+            const start = now();
+            const done = () => { totals.run += now() - start; };
+            return super.runAsync(...args).then(
+                (result) => { done(); return result; },
+                (error) => { done(); throw error; }
+            );
+        }
+    };
+}
+
+/**
+ * Number of rows of the named datasets of a view.
+ */
+export function datasetRows(view, names) {
+    const rows = {};
+    names.forEach((name) => {
+        try {
+            rows[name] = view.data(name).length;
+        } catch (error) {
+            // The dataset is not part of the view, e.g. it is defined in a group
+        }
+    });
+    return rows;
+}
+
+/**
+ * Approximate size in bytes of a property as it was sent by Dash.
+ */
+export function jsonSize(value) {
+    return value === undefined || value === null ? 0 : JSON.stringify(value).length;
+}
@@ -0,0 +1,18 @@
+import packageJson from 'vega-lite/package.json';
+import { precompiledSpec } from './compile';
+
+/**
+ * Stand-in for vega-lite which vega-embed imports, see webpack.config.js.
+ * Vega-Lite specs are compiled by compileSpec in ./compile.js, which loads the
+ * compiler on demand. vega-embed only gets Vega-Lite specs which were
+ * compiled before, see embedArguments, and compile returns their Vega spec.
+ */
+export const version = packageJson.version;
+
+export function compile(spec) {
+    const vgSpec = precompiledSpec(spec);
+    if (!vgSpec) {
+        throw new Error('Vega-Lite specs are compiled before they are embedded, see compileSpec.');
+    }
+    return { spec: vgSpec };
+}
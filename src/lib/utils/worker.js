@@ -0,0 +1,132 @@
+// Properties of events which Vega uses to handle interactions
+const EVENT_PROPERTIES = [
+    'type', 'button', 'buttons', 'detail', 'pointerId', 'pointerType', 'timeStamp',
+    'shiftKey', 'ctrlKey', 'altKey', 'metaKey', 'deltaX', 'deltaY', 'deltaZ', 'deltaMode',
+];
+
+/**
+ * Renders a chart in a Web Worker to an OffscreenCanvas so that parsing,
+ * evaluating, and rendering a large chart do not block the main thread.
+ * Events on the canvas and the window for which the view in the worker
+ * registered listeners are forwarded to it. See ../workers/vega.worker.js.
+ */
+export default class WorkerView {
+    static supported() {
+        return typeof Worker !== 'undefined' &&
+            typeof OffscreenCanvas !== 'undefined' &&
+            typeof HTMLCanvasElement !== 'undefined' &&
+            'transferControlToOffscreen' in HTMLCanvasElement.prototype;
+    }
+
+    constructor(el, spec, specHash, opt, onSignal) {
+        this.onSignal = onSignal;
+        this.requests = {};
+        this.nextRequestId = 0;
+        this.eventListeners = [];
+
+        this.canvas = document.createElement('canvas');
+        this.canvas.setAttribute('class', 'marks');
+        el.innerHTML = '';
+        el.appendChild(this.canvas);
+
+        this.worker = new Worker(new URL(/* webpackChunkName: "async-VegaWorker" */ '../workers/vega.worker.js', import.meta.url));
+        this.worker.onmessage = (message) => this.handleMessage(message.data);
+        const offscreen = this.canvas.transferControlToOffscreen();
+        // Functions, e.g. a custom loader, cannot be sent to the worker
+        this.ready = this.request(
+            { type: 'init', spec: spec, specHash: specHash, opt: JSON.parse(JSON.stringify(opt || {})), canvas: offscreen, pixelRatio: window.devicePixelRatio || 1 },
+            [offscreen]
+        );
+    }
+
+    request(message, transfer) {
+        const id = this.nextRequestId++;
+        return new Promise((resolve, reject) => {
+            this.requests[id] = { resolve: resolve, reject: reject };
+            this.worker.postMessage({ ...message, id: id }, transfer || []);
+        });
+    }
+
+    handleMessage(message) {
+        if (message.type === 'reply') {
+            const request = this.requests[message.id];
+            delete this.requests[message.id];
+            if (message.error !== undefined) {
+                request.reject(new Error(message.error));
+            } else {
+                request.resolve(message.result);
+            }
+        } else if (message.type === 'signal') {
+            this.onSignal(message.name, message.value);
+        } else if (message.type === 'resize') {
+            this.canvas.style.width = message.width + 'px';
+            this.canvas.style.height = message.height + 'px';
+        } else if (message.type === 'attribute') {
+            if (message.name === 'cursor') {
+                this.canvas.style.cursor = message.value;
+            } else if (message.value === null) {
+                this.canvas.removeAttribute(message.name);
+            } else {
+                this.canvas.setAttribute(message.name, message.value);
+            }
+        } else if (message.type === 'listen') {
+            this.forwardEvents(message.target, message.event);
+        }
+    }
+
+    forwardEvents(target, type) {
+        const element = target === 'window' ? window : this.canvas;
+        const listener = (event) => {
+            // The view in the worker cannot prevent the default behavior of
+            // the browser, e.g. scrolling the page while zooming into the chart
+            if (type === 'wheel' && target === 'canvas') {
+                event.preventDefault();
+            }
+            const rect = this.canvas.getBoundingClientRect();
+            const forwarded = {
+                clientX: event.clientX - rect.left - this.canvas.clientLeft,
+                clientY: event.clientY - rect.top - this.canvas.clientTop,
+            };
+            EVENT_PROPERTIES.forEach((property) => {
+                if (event[property] !== undefined) {
+                    forwarded[property] = event[property];
+                }
+            });
+            this.worker.postMessage({ type: 'event', target: target, event: forwarded });
+        };
+        const options = type === 'wheel' ? { passive: false } : undefined;
+        element.addEventListener(type, listener, options);
+        this.eventListeners.push([element, type, listener]);
+    }
+
+    observeSignals(signalsToObserve) {
+        return this.request({ type: 'observe', signalsToObserve: signalsToObserve });
+    }
+
+    updateData(data, patches) {
+        return this.request({ type: 'data', data: data, patches: patches });
+    }
+
+    setSignals(values) {
+        return this.request({ type: 'signals', values: values });
+    }
+
+    setPaused(paused) {
+        return this.request({ type: 'pause', paused: paused });
+    }
+
+    getState() {
+        return this.request({ type: 'getState' });
+    }
+
+    setState(state) {
+        return this.request({ type: 'setState', state: state });
+    }
+
+    finalize() {
+        this.worker.terminate();
+        this.eventListeners.forEach(([element, type, listener]) => element.removeEventListener(type, listener));
+        this.eventListeners = [];
+        this.requests = {};
+    }
+}
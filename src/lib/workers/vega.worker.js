@@ -0,0 +1,174 @@
+/* eslint-env worker */
+import { CanvasHandler, CanvasRenderer, Renderer, View, parse, renderModule } from 'vega';
+import { compileSpec } from '../utils/compile';
+import { pausableView } from '../utils/lifecycle';
+import { changeData, loadDatasets, loadFormats, loadPatch } from '../utils/data';
+import { cleanJson, filterSignals, setSignalValues } from '../utils/signals';
+
+/**
+ * Runs a Vega view in a Web Worker and renders it to the OffscreenCanvas which
+ * is transferred by WorkerView (see ../utils/worker.js). As there is no DOM in a
+ * worker, the view uses stand-ins for the elements and the window. Their
+ * event listeners are registered on the real elements by WorkerView which
+ * forwards the events to this worker.
+ */
+
+let canvas = null;
+let pixelRatio = 1;
+let view = null;
+let signalListeners = [];
+// Changes of the data are applied in the order in which they arrive
+let dataUpdates = Promise.resolve();
+
+class EventTargetStub {
+    constructor(target) {
+        this.target = target;
+        this.listeners = {};
+    }
+
+    addEventListener(type, listener) {
+        if (!this.listeners[type]) {
+            this.listeners[type] = [];
+            self.postMessage({ type: 'listen', target: this.target, event: type });
+        }
+        this.listeners[type].push(listener);
+    }
+
+    removeEventListener(type, listener) {
+        this.listeners[type] = (this.listeners[type] || []).filter((l) => l !== listener);
+    }
+
+    dispatch(event) {
+        (this.listeners[event.type] || []).slice().forEach((listener) => listener.call(this, event));
+    }
+}
+
+// Event coordinates are forwarded relative to the canvas
+const canvasStub = new EventTargetStub('canvas');
+canvasStub.tagName = 'CANVAS';
+canvasStub.getContext = () => canvas.getContext('2d');
+canvasStub.getBoundingClientRect = () => ({ left: 0, top: 0 });
+
+const containerStub = {
+    childNodes: [canvasStub],
+    style: {},
+    getBoundingClientRect: () => ({ left: 0, top: 0 }),
+    // Used by the default tooltip handler of Vega and for aria attributes
+    setAttribute: (name, value) => {
+        if (name === 'title') {
+            self.postMessage({ type: 'attribute', name: name, value: value });
+        }
+    },
+    removeAttribute: (name) => {
+        if (name === 'title') {
+            self.postMessage({ type: 'attribute', name: name, value: null });
+        }
+    },
+};
+
+// Vega registers listeners for e.g. "window:mouseup" on the window
+self.window = new EventTargetStub('window');
+
+class OffscreenRenderer extends CanvasRenderer {
+    initialize(el, width, height, origin, scaleFactor, options) {
+        this._options = options || {};
+        this._canvas = canvas;
+        // Skip the initialization of CanvasRenderer which creates a canvas element
+        return Renderer.prototype.initialize.call(this, el, width, height, origin, pixelRatio);
+    }
+
+    resize(width, height, origin, scaleFactor) {
+        super.resize(width, height, origin, pixelRatio);
+        self.postMessage({ type: 'resize', width: this._width, height: this._height });
+        return this;
+    }
+}
+
+renderModule('offscreen', { renderer: OffscreenRenderer, headless: OffscreenRenderer, handler: CanvasHandler });
+
+function init({ spec, specHash, opt }) {
+    return compileSpec(spec, specHash, opt).then(([vgSpec, embedOptions]) => (
+        loadFormats(vgSpec).then(() => render(vgSpec, embedOptions))
+    ));
+}
+
+function render(vgSpec, embedOptions) {
+    const config = { ...(embedOptions.config || {}) };
+    // Bindings of parameters to input elements require the DOM
+    config.events = { ...(config.events || {}), bind: 'none' };
+    view = new (pausableView(View))(parse(vgSpec, config)).renderer('offscreen');
+    view.initialize(containerStub);
+    if (embedOptions.hover) {
+        view.hover();
+    }
+    return view.runAsync().then(() => null);
+}
+
+function observe({ signalsToObserve }) {
+    signalListeners.forEach(([signal, listener]) => view.removeSignalListener(signal, listener));
+    signalListeners = [];
+    const signals = filterSignals(view.getState().signals || {}, signalsToObserve);
+    const listener = (name, value) => self.postMessage({ type: 'signal', name: name, value: cleanJson(value) });
+    for (const signal in signals) {
+        view.addSignalListener(signal, listener);
+        signalListeners.push([signal, listener]);
+    }
+    return cleanJson(signals);
+}
+
+function updateData({ data, patches }) {
+    const loadedData = data ? loadDatasets(view, data) : null;
+    const loadedPatches = Promise.all(patches.map((patch) => loadPatch(view, patch)));
+    const update = dataUpdates
+        .then(() => Promise.all([loadedData, loadedPatches]))
+        .then(([datasets, changes]) => {
+            changeData(view, (dataChanges) => {
+                if (datasets) {
+                    dataChanges.replace(datasets);
+                }
+                changes.forEach((patch) => dataChanges.patch(patch));
+            });
+            return view.runAsync();
+        })
+        .then(() => null);
+    // A failed update does not prevent later updates
+    dataUpdates = update.catch(() => null);
+    return update;
+}
+
+const handlers = {
+    init: init,
+    observe: observe,
+    data: updateData,
+    signals: ({ values }) => (setSignalValues(view, values) ? view.runAsync().then(() => null) : null),
+    pause: ({ paused }) => (paused ? (view.pause(), null) : view.resume().then(() => null)),
+    getState: () => cleanJson(view.getState()),
+    setState: ({ state }) => view.setState(state).runAsync().then(() => null),
+};
+
+self.onmessage = (message) => {
+    const request = message.data;
+    if (request.type === 'event') {
+        const event = {
+            ...request.event,
+            preventDefault: () => {},
+            stopPropagation: () => {},
+        };
+        (request.target === 'window' ? self.window : canvasStub).dispatch(event);
+        return;
+    }
+    if (request.type === 'init') {
+        canvas = request.canvas;
+        pixelRatio = request.pixelRatio;
+        // Vega sets the cursor on the canvas of the renderer
+        canvas.style = {
+            set cursor(cursor) {
+                self.postMessage({ type: 'attribute', name: 'cursor', value: cursor });
+            },
+        };
+    }
+    Promise.resolve()
+        .then(() => handlers[request.type](request))
+        .then((result) => self.postMessage({ type: 'reply', id: request.id, result: result }))
+        .catch((error) => self.postMessage({ type: 'reply', id: request.id, error: String(error) }));
+};
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+from dash import no_update
+
+import dash_vega_components as dvc
+
+
+@pytest.fixture
+def telemetry():
+    return pd.DataFrame(
+        {
+            "time": pd.date_range("2024-01-01", periods=5, freq="s"),
+            "value": [1.0, 2.0, 3.0, 4.0, 5.0],
+        }
+    )
+
+
+def test_append_by_position():
+    cursor = dvc.AppendCursor("live", max_rows=100)
+    rows = [{"x": 1}, {"x": 2}]
+    assert cursor.append("s", rows) == {
+        "live": {"rows": [{"x": 1}, {"x": 2}], "seq": 1, "maxRows": 100}
+    }
+    rows.append({"x": 3})
+    assert cursor.append("s", rows) == {
+        "live": {"rows": [{"x": 3}], "seq": 2, "maxRows": 100}
+    }
+    assert cursor.append("s", rows) is no_update
+    # Other sessions start from the beginning
+    assert len(cursor.append("other", rows)["live"]["rows"]) == 3
+
+
+def test_append_by_key(telemetry):
+    cursor = dvc.AppendCursor("live", key="time", window=pd.Timedelta(seconds=30))
+    first = cursor.append("s", telemetry.iloc[:3])["live"]
+    assert [row["value"] for row in first["rows"]] == [1.0, 2.0, 3.0]
+    assert first["timeField"] == "time"
+    assert first["window"] == 30_000
+    # Older rows may be dropped by the server, only the key matters
+    second = cursor.append("s", telemetry.iloc[2:])["live"]
+    assert [row["value"] for row in second["rows"]] == [4.0, 5.0]
+    assert second["seq"] == 2
+
+
+def test_reset(telemetry):
+    cursor = dvc.AppendCursor("live", key="time")
+    cursor.append("s", telemetry.iloc[:2])
+    cursor.reset("s", telemetry.iloc[:4])
+    update = cursor.append("s", telemetry)["live"]
+    assert [row["value"] for row in update["rows"]] == [5.0]
+    # The browser ignores sequence numbers which it has already seen
+    assert update["seq"] == 2
+
+
+def test_disk_backend(tmp_path, telemetry):
+    first = dvc.AppendCursor("live", key="time", backend=dvc.DiskBackend(tmp_path))
+    first.append("s", telemetry.iloc[:2])
+    second = dvc.AppendCursor("live", key="time", backend=dvc.DiskBackend(tmp_path))
+    assert len(second.append("s", telemetry)["live"]["rows"]) == 3
+
+
+def test_window_requires_time_field():
+    with pytest.raises(ValueError, match="time_field"):
+        dvc.AppendCursor("live", window=1000)
@@ -0,0 +1,55 @@
+import base64
+
+import pandas as pd
+import pytest
+from dash import Dash, html
+
+import dash_vega_components as dvc
+
+pa = pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {
+            "x": [1.5, 2.5, 3.5],
+            "origin": pd.Categorical(["USA", "Europe", "USA"]),
+            "date": pd.to_datetime(["2020-01-01", "2020-01-02", "2020-01-03"]),
+        },
+        index=[10, 11, 12],
+    )
+
+
+def read_ipc(body):
+    return pa.ipc.open_stream(body).read_all()
+
+
+def test_to_arrow_ipc_roundtrip(df):
+    table = read_ipc(dvc.to_arrow_ipc(df))
+    assert table.column_names == ["x", "origin", "date"]
+    assert table.num_rows == 3
+    assert table.to_pandas().equals(df.reset_index(drop=True))
+
+    # pyarrow tables are passed through
+    assert read_ipc(dvc.to_arrow_ipc(pa.Table.from_pandas(df))).num_rows == 3
+
+
+def test_arrow_dataset_base64(df):
+    dataset = dvc.arrow_dataset(df)
+    assert dataset["format"] == {"type": "arrow"}
+    assert read_ipc(base64.b64decode(dataset["base64"])).num_rows == 3
+
+
+def test_arrow_dataset_served_from_store(df):
+    app = Dash(__name__)
+    app.layout = html.Div()
+    store = dvc.DatasetStore(app)
+    dataset = dvc.arrow_dataset(df, store=store)
+    assert dataset["format"] == {"type": "arrow"}
+    assert dataset["url"].endswith(".arrow")
+
+    response = app.server.test_client().get(dataset["url"])
+    assert response.status_code == 200
+    assert response.mimetype == "application/vnd.apache.arrow.stream"
+    assert read_ipc(response.data).num_rows == 3
@@ -0,0 +1,134 @@
+import altair as alt
+import pandas as pd
+
+import dash_vega_components as dvc
+
+
+def make_counting_function(**kwargs):
+    calls = []
+
+    @dvc.cached_spec(**kwargs)
+    def make_spec(origin, size=10):
+        calls.append((origin, size))
+        return {"mark": "point", "origin": origin, "size": size}
+
+    return make_spec, calls
+
+
+def test_cached_spec_uses_arguments_as_key():
+    make_spec, calls = make_counting_function()
+    assert make_spec("USA") == {"mark": "point", "origin": "USA", "size": 10}
+    make_spec("USA")
+    assert len(calls) == 1
+    make_spec("USA", size=20)
+    make_spec("Europe")
+    assert len(calls) == 3
+
+
+def test_cached_spec_normalizes_arguments():
+    make_spec, calls = make_counting_function()
+    make_spec("USA")
+    make_spec(origin="USA")
+    make_spec("USA", 10)
+    make_spec(size=10, origin="USA")
+    assert len(calls) == 1
+
+
+def test_cached_spec_converts_charts():
+    source = pd.DataFrame({"x": [1, 2, 3]})
+
+    @dvc.cached_spec
+    def make_chart():
+        return alt.Chart(source).mark_point().encode(x="x:Q")
+
+    spec = make_chart()
+    assert isinstance(spec, dict)
+    assert spec["mark"]["type"] == "point"
+
+
+def test_cached_spec_lru_eviction():
+    make_spec, calls = make_counting_function(maxsize=2)
+    make_spec("a")
+    make_spec("b")
+    make_spec("a")
+    make_spec("c")
+    assert len(make_spec.cache) == 2
+    # "b" was the least recently used entry
+    make_spec("a")
+    assert len(calls) == 3
+    make_spec("b")
+    assert len(calls) == 4
+
+
+def test_cached_spec_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("dash_vega_components._cache.time.monotonic", lambda: now[0])
+    make_spec, calls = make_counting_function(ttl=10)
+    make_spec("a")
+    now[0] += 5
+    make_spec("a")
+    assert len(calls) == 1
+    now[0] += 10
+    make_spec("a")
+    assert len(calls) == 2
+
+
+def test_cached_spec_data_fingerprint():
+    data = {"df": pd.DataFrame({"x": [1, 2, 3]})}
+    make_spec, calls = make_counting_function(data=lambda: data["df"])
+    make_spec("a")
+    make_spec("a")
+    assert len(calls) == 1
+    data["df"] = pd.DataFrame({"x": [1, 2, 4]})
+    make_spec("a")
+    assert len(calls) == 2
+
+
+def test_fingerprint():
+    df = pd.DataFrame({"x": [1, 2, 3], "y": ["a", "b", "c"]})
+    assert dvc.fingerprint(df) == dvc.fingerprint(df.copy())
+    assert dvc.fingerprint(df) != dvc.fingerprint(df.astype({"x": float}))
+    assert dvc.fingerprint(df) != dvc.fingerprint(df.iloc[:2])
+    assert dvc.fingerprint({"a": 1}) == dvc.fingerprint({"a": 1})
+
+
+def test_fingerprint_unhashable_values():
+    df = pd.DataFrame({"x": [[1, 2], [3]], "y": [{"a": 1}, {"b": 2}]})
+    assert dvc.fingerprint(df) == dvc.fingerprint(df.copy())
+    assert dvc.fingerprint(df) != dvc.fingerprint(df.iloc[:1])
+    assert dvc.fingerprint(df["x"]) != dvc.fingerprint(df["y"])
+
+
+def test_disk_backend_is_shared(tmp_path):
+    make_spec, calls = make_counting_function(backend=dvc.DiskBackend(tmp_path))
+    other_make_spec, other_calls = make_counting_function(
+        backend=dvc.DiskBackend(tmp_path)
+    )
+    make_spec("a")
+    # Both functions have the same name and module and therefore
+    # share the entries, similar to the same callback in different workers
+    assert other_make_spec("a") == make_spec("a")
+    assert len(calls) == 1
+    assert len(other_calls) == 0
+
+
+def test_disk_backend_eviction(tmp_path):
+    backend = dvc.DiskBackend(tmp_path, maxsize=2)
+    make_spec, calls = make_counting_function(backend=backend)
+    make_spec("a")
+    make_spec("b")
+    make_spec("c")
+    assert len(backend) == 2
+
+
+def test_warm_up():
+    make_spec, calls = make_counting_function()
+    assert make_spec.warm_up(["a", ("b", 20), {"origin": "c"}]) == 3
+    assert calls == [("a", 10), ("b", 20), ("c", 10)]
+    make_spec("a")
+    make_spec("b", 20)
+    make_spec(origin="c")
+    assert len(calls) == 3
+    make_spec.cache_clear()
+    make_spec("a")
+    assert len(calls) == 4
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+import dash_vega_components as dvc
+
+
+def test_numeric_columns():
+    df = pd.DataFrame(
+        {
+            "x": [1.5, np.nan, 3.0],
+            "i": [1, 2, 3],
+            "n": pd.array([1, None, 3], dtype="Int64"),
+            "b": [True, False, True],
+        },
+        index=[10, 11, 12],
+    )
+    assert dvc.to_columnar(df) == {
+        "columns": {
+            "x": [1.5, None, 3.0],
+            "i": [1, 2, 3],
+            "n": [1, None, 3],
+            "b": [True, False, True],
+        }
+    }
+
+
+def test_dictionary_encoding():
+    df = pd.DataFrame(
+        {
+            "category": pd.Categorical(["a", "b", None, "a"]),
+            "repeated": ["x", "y", "x", "x"],
+            "unique": ["p", "q", "r", None],
+        }
+    )
+    columns = dvc.to_columnar(df)["columns"]
+    assert columns["category"] == {
+        "type": "dictionary",
+        "codes": [0, 1, -1, 0],
+        "values": ["a", "b"],
+    }
+    assert columns["repeated"] == {
+        "type": "dictionary",
+        "codes": [0, 1, 0, 0],
+        "values": ["x", "y"],
+    }
+    assert columns["unique"] == ["p", "q", "r", None]
+    assert dvc.to_columnar(df, dictionary_threshold=0)["columns"]["repeated"] == [
+        "x",
+        "y",
+        "x",
+        "x",
+    ]
+
+
+def test_timestamps():
+    df = pd.DataFrame(
+        {
+            "naive": pd.to_datetime(["2020-01-01", None]),
+            "aware": pd.to_datetime(["2020-01-01T01:00", "2020-01-01T02:00"]).tz_localize(
+                "Europe/Berlin"
+            ),
+            "duration": pd.to_timedelta([1, 2], unit="s"),
+        }
+    )
+    columns = dvc.to_columnar(df)["columns"]
+    assert columns["naive"] == {
+        "type": "timestamp",
+        "values": [1577836800000, None],
+        "local": True,
+    }
+    assert columns["aware"] == {
+        "type": "timestamp",
+        "values": [1577836800000, 1577840400000],
+        "local": False,
+    }
+    assert columns["duration"] == [1000, 2000]
+
+
+def test_columnar_dataset(tmp_path):
+    df = pd.DataFrame({"x": [1, 2]})
+    assert dvc.columnar_dataset(df) == {
+        "values": {"columns": {"x": [1, 2]}},
+        "format": {"type": "columnar"},
+    }
+    store = dvc.DatasetStore()
+    dataset = dvc.columnar_dataset(df, store=store)
+    assert dataset["format"] == {"type": "columnar"}
+    assert dataset["url"].endswith(".json")
@@ -0,0 +1,45 @@
+import altair as alt
+import pandas as pd
+import pytest
+
+import dash_vega_components as dvc
+
+
+@pytest.fixture
+def chart():
+    source = pd.DataFrame({"a": ["A", "B", "C"], "b": [28, 55, 43]})
+    return alt.Chart(source).mark_bar().encode(x="a", y="b")
+
+
+def test_vega_spec_is_returned_unchanged():
+    spec = {"$schema": "https://vega.github.io/schema/vega/v5.json", "marks": []}
+    assert dvc.compile_spec(spec) is spec
+
+
+def values(vg_spec):
+    return [source["values"] for source in vg_spec["data"] if "values" in source][0]
+
+
+def test_compile_chart(chart):
+    pytest.importorskip("vl_convert")
+    vg_spec = dvc.compile_spec(chart)
+    assert "/vega/" in vg_spec["$schema"]
+    assert {"a": "B", "b": 55} in values(vg_spec)
+
+
+def test_datasets_are_bound_to_cached_spec(chart):
+    pytest.importorskip("vl_convert")
+    spec = chart.to_dict()
+    first = dvc.compile_spec(spec)
+    (name,) = spec["datasets"]
+    spec["datasets"] = {name: [{"a": "D", "b": 1}]}
+    second = dvc.compile_spec(spec)
+    assert values(first) != values(second)
+    assert values(second) == [{"a": "D", "b": 1}]
+    assert first["marks"] == second["marks"]
+
+
+def test_config_is_applied(chart):
+    pytest.importorskip("vl_convert")
+    vg_spec = dvc.compile_spec(chart, config={"background": "#123456"})
+    assert vg_spec["background"] == "#123456"
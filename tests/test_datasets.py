@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from dash import Dash, html
+
+import dash_vega_components as dvc
+
+
+def make_spec(n_rows=100):
+    values = [{"a": i, "b": i * 2} for i in range(n_rows)]
+    return {
+        "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        "datasets": {"data-123": values},
+        "data": {"name": "data-123"},
+        "mark": "point",
+        "encoding": {"x": {"field": "a", "type": "quantitative"}},
+    }
+
+
+def test_externalize_replaces_datasets_with_urls():
+    app = Dash(__name__)
+    app.layout = html.Div()
+    store = dvc.DatasetStore(app)
+    original = make_spec()
+    spec = store.externalize(original)
+
+    assert "datasets" not in spec
+    assert spec["data"]["name"] == "data-123"
+    assert spec["data"]["format"] == {"type": "json"}
+    assert spec["data"]["url"].startswith("/_dash-vega-components/datasets/")
+    # Original spec is not modified
+    assert original == make_spec()
+
+    # Same content leads to the same url
+    assert store.externalize(make_spec())["data"]["url"] == spec["data"]["url"]
+    assert store.externalize(make_spec(200))["data"]["url"] != spec["data"]["url"]
+
+
+def test_small_datasets_stay_inline():
+    store = dvc.DatasetStore(min_bytes=10_000)
+    spec = store.externalize(make_spec(n_rows=2))
+    assert spec["datasets"] == make_spec(n_rows=2)["datasets"]
+    assert spec["data"] == {"name": "data-123"}
+
+
+def test_externalize_vega_spec():
+    store = dvc.DatasetStore()
+    values = [{"a": i} for i in range(200)]
+    spec = store.externalize(
+        {"data": [{"name": "table", "values": values, "format": {"parse": "auto"}}]}
+    )
+    data = spec["data"][0]
+    assert "values" not in data
+    assert data["name"] == "table"
+    assert data["format"] == {"parse": "auto", "type": "json"}
+
+
+def test_serve_dataset_with_caching_headers(tmp_path):
+    app = Dash(__name__)
+    app.layout = html.Div()
+    store = dvc.DatasetStore(app, directory=tmp_path)
+    url = store.externalize(make_spec())["data"]["url"]
+    client = app.server.test_client()
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.json == make_spec()["datasets"]["data-123"]
+    assert "immutable" in response.headers["Cache-Control"]
+    etag = response.headers["ETag"]
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Datasets are also read from the directory, e.g. if registered
+    # by another worker process
+    other_app = Dash(__name__)
+    other_app.layout = html.Div()
+    dvc.DatasetStore(other_app, directory=tmp_path)
+    assert other_app.server.test_client().get(url).status_code == 200
+
+    assert client.get(url.rsplit("/", 1)[0] + "/unknown.json").status_code == 404
+
+
+def test_concurrent_writes_to_directory(tmp_path):
+    # Each writer uses its own temporary file, e.g. workers adding the same dataset
+    stores = [dvc.DatasetStore(directory=tmp_path) for _ in range(8)]
+    values = make_spec()["datasets"]["data-123"]
+    with ThreadPoolExecutor(8) as pool:
+        urls = set(pool.map(lambda store: store.register(values), stores))
+    assert len(urls) == 1
+    assert [path.suffix for path in tmp_path.iterdir()] == [".json"]
@@ -0,0 +1,145 @@
+import base64
+import json
+
+import altair as alt
+import pandas as pd
+import pytest
+from dash import Dash, html
+
+import dash_vega_components as dvc
+
+
+@pytest.fixture
+def chart():
+    source = pd.DataFrame({"a": ["A", "B", "C"], "b": [28, 55, 43]})
+    return alt.Chart(source).mark_bar().encode(x="a", y="b")
+
+
+def cache_image(exporter, spec, image, format="png", allowed_base_urls=None):
+    key, _ = exporter._task(spec, format, allowed_base_urls)
+    exporter._store(key, image)
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError, match="format"):
+        dvc.ChartExporter(format="jpeg")
+    with pytest.raises(ValueError, match="format"):
+        dvc.ChartExporter(processes=0).export({}, format="jpeg")
+
+
+def test_cached_images_are_not_rendered_again(chart):
+    exporter = dvc.ChartExporter(processes=0)
+    cache_image(exporter, chart, b"image")
+    assert exporter.export(chart) == b"image"
+    # The cache key includes the format
+    assert exporter._task(chart, "svg")[0] != exporter._task(chart, "png")[0]
+
+
+def test_identical_charts_are_deduplicated(chart):
+    exporter = dvc.ChartExporter(processes=0)
+    cache_image(exporter, chart.to_dict(), b"image")
+    results = dict(exporter.export_many({"a": chart, "b": chart.to_dict()}))
+    assert results == {"a": b"image", "b": b"image"}
+    assert list(exporter.export_many([chart])) == [(0, b"image")]
+
+
+def test_disk_cache(chart, tmp_path):
+    exporter = dvc.ChartExporter(processes=0, cache=dvc.DiskBackend(tmp_path))
+    cache_image(exporter, chart, b"\x89PNG")
+    other = dvc.ChartExporter(processes=0, cache=dvc.DiskBackend(tmp_path))
+    assert other.export(chart) == b"\x89PNG"
+
+
+def test_export_many_in_worker_processes(chart):
+    pytest.importorskip("vl_convert")
+    charts = {"bar": chart, "line": chart.mark_line(), "same": chart}
+    with dvc.ChartExporter(format="svg", processes=2) as exporter:
+        results = dict(exporter.export_many(charts))
+    assert set(results) == {"bar", "line", "same"}
+    assert results["bar"] == results["same"]
+    assert all(image.startswith(b"<svg") for image in results.values())
+
+
+def test_export_many_after_rendering_in_parent(chart):
+    # Forked workers deadlocked once vl-convert was used in the parent process
+    pytest.importorskip("vl_convert")
+    dvc.prerender(chart)
+    with dvc.ChartExporter(format="svg", processes=2) as exporter:
+        results = dict(exporter.export_many([chart, chart.mark_line()]))
+    assert set(results) == {0, 1}
+
+
+def test_export_many_raises_and_stays_usable(chart):
+    pytest.importorskip("vl_convert")
+    charts = [{"mark": 1}] + [chart.properties(width=w) for w in range(100, 120)]
+    with dvc.ChartExporter(format="svg", processes=1) as exporter:
+        with pytest.raises(Exception):
+            dict(exporter.export_many(charts))
+        assert exporter.export(chart).startswith(b"<svg")
+
+
+def test_errors_are_returned(chart):
+    pytest.importorskip("vl_convert")
+    exporter = dvc.ChartExporter(format="svg", processes=0)
+    results = dict(exporter.export_many({"ok": chart, "bad": {"mark": 1}}, raise_errors=False))
+    assert results["ok"].startswith(b"<svg")
+    assert isinstance(results["bad"], Exception)
+
+
+def test_route_streams_cached_images(chart):
+    app = Dash(__name__)
+    app.layout = html.Div()
+    exporter = dvc.ChartExporter(app, processes=0)
+    cache_image(exporter, chart.to_dict(), b"image", allowed_base_urls=[])
+    client = app.server.test_client()
+
+    response = client.post(exporter.route, json={"spec": chart.to_dict()})
+    assert response.status_code == 200
+    assert response.mimetype == "image/png"
+    assert response.data == b"image"
+
+    response = client.post(exporter.route, json={"charts": {"a": chart.to_dict()}})
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert lines == [
+        {
+            "name": "a",
+            "mimetype": "image/png",
+            "data": base64.b64encode(b"image").decode("ascii"),
+        }
+    ]
+
+    assert client.post(exporter.route, json={"format": "gif"}).status_code == 400
+
+
+def test_route_limits_requests(chart):
+    app = Dash(__name__)
+    app.layout = html.Div()
+    exporter = dvc.ChartExporter(app, processes=0, max_body_size=1000, max_charts=2)
+    client = app.server.test_client()
+
+    spec = chart.to_dict()
+    assert client.post(exporter.route, json={"charts": [spec] * 3}).status_code == 413
+    large = {"mark": "bar", "description": "x" * 1000}
+    assert client.post(exporter.route, json={"spec": large}).status_code == 413
+    assert client.post(exporter.route, json={"charts": "bar"}).status_code == 400
+    assert client.post(exporter.route, json=[spec]).status_code == 400
+
+
+def test_route_rejects_invalid_specs_and_remote_data():
+    pytest.importorskip("vl_convert")
+    app = Dash(__name__)
+    app.layout = html.Div()
+    exporter = dvc.ChartExporter(
+        app, format="svg", processes=0, allowed_base_urls=["https://example.com/"]
+    )
+    client = app.server.test_client()
+
+    assert client.post(exporter.route, json={"spec": {"mark": 1}}).status_code == 400
+    spec = {
+        "data": {"url": "http://127.0.0.1:9/data.csv"},
+        "mark": "point",
+        "encoding": {"x": {"field": "a", "type": "quantitative"}},
+    }
+    response = client.post(exporter.route, json={"spec": spec})
+    assert response.status_code == 400
+    assert "not allowed" in response.data.decode()
@@ -0,0 +1,164 @@
+import numpy as np
+import pytest
+
+import dash_vega_components as dvc
+
+
+def circle(cx, cy, r, n=2000):
+    angles = np.linspace(0, 2 * np.pi, n)
+    ring = np.column_stack([cx + r * np.cos(angles), cy + r * np.sin(angles)])
+    ring[-1] = ring[0]
+    return ring.tolist()
+
+
+@pytest.fixture
+def geojson():
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "properties": {"name": "big"},
+                "geometry": {"type": "Polygon", "coordinates": [circle(0, 0, 10)]},
+            },
+            {
+                "type": "Feature",
+                "properties": {"name": "tiny"},
+                "geometry": {"type": "Polygon", "coordinates": [circle(5, 5, 0.001)]},
+            },
+            {
+                "type": "Feature",
+                "properties": {"name": "city"},
+                "geometry": {"type": "Point", "coordinates": [1.23456789, 2.3456789]},
+            },
+        ],
+    }
+
+
+@pytest.fixture
+def topology():
+    # Two squares next to each other which share the arc between (1, 0)
+    # and (1, 1), where the
+    # arcs are quantized and delta-encoded
+    shared = [[1000, 0]] + [[0, 1]] * 1000
+    return {
+        "type": "Topology",
+        "transform": {"scale": [0.001, 0.001], "translate": [0, 0]},
+        "objects": {
+            "regions": {
+                "type": "GeometryCollection",
+                "geometries": [
+                    {"type": "Polygon", "arcs": [[0, 1]], "properties": {"id": "a"}},
+                    {"type": "Polygon", "arcs": [[2, -1]], "properties": {"id": "b"}},
+                    {"type": "Point", "coordinates": [600, 600]},
+                ],
+            }
+        },
+        "arcs": [
+            shared,
+            [[1000, 1000]] + [[-1, 0]] * 1000 + [[0, -1000], [1000, 0]],
+            [[1000, 0], [1000, 0], [0, 1000], [-1000, 0]],
+        ],
+    }
+
+
+def decode(arc, transform):
+    points = np.cumsum(np.asarray(arc, dtype=float), axis=0)
+    return points * transform["scale"] + transform["translate"]
+
+
+def test_geojson_is_simplified_to_the_size(geojson):
+    result = dvc.simplify_geo(geojson, 100)
+    big, tiny, city = result["features"]
+    ring = big["geometry"]["coordinates"][0]
+    assert 4 <= len(ring) < 200
+    assert ring[0] == ring[-1]
+    # Points deviate by at most a pixel, i.e. 0.2 for an extent of 20
+    radii = np.hypot(*np.asarray(ring).T)
+    assert np.all(np.abs(radii - 10) < 0.2)
+    # Small regions are kept
+    assert len(tiny["geometry"]["coordinates"][0]) == 4
+    assert city["geometry"]["coordinates"] == [1.23, 2.35]
+    assert big["properties"] == {"name": "big"}
+    assert result["bbox"] == pytest.approx([-10, -10, 10, 10], abs=0.01)
+
+
+def test_larger_sizes_keep_more_points(geojson):
+    small = dvc.simplify_geo(geojson, 100)["features"][0]["geometry"]["coordinates"][0]
+    large = dvc.simplify_geo(geojson, 1000)["features"][0]["geometry"]["coordinates"][0]
+    assert len(large) > len(small)
+
+
+def test_results_are_cached(geojson):
+    assert dvc.simplify_geo(geojson, 100) is dvc.simplify_geo(geojson, 100)
+
+
+def test_projection(geojson):
+    result = dvc.simplify_geo(geojson, 100, project=lambda x, y: (x * 2, y))
+    assert result["bbox"] == pytest.approx([-20, -10, 20, 10], abs=0.01)
+
+
+def test_topology_arcs_are_simplified_and_quantized(topology):
+    result = dvc.simplify_geo(topology, 10, precision=1)
+    transform = result["transform"]
+    assert result["bbox"] == [0, 0, 2, 1]
+    assert transform["scale"] == [0.2, 0.2]
+    # The shared arc is a straight line and both squares still use it
+    shared = decode(result["arcs"][0], transform)
+    assert shared.tolist() == [[1, 0], [1, 1]]
+    assert result["objects"]["regions"]["geometries"][1]["arcs"] == [[2, -1]]
+    assert decode(result["arcs"][1], transform)[-1].tolist() == [1, 0]
+    assert all(isinstance(v, int) for arc in result["arcs"] for p in arc for v in p)
+    assert result["objects"]["regions"]["geometries"][2]["coordinates"] == [3, 3]
+
+
+def test_topology_keeps_small_rings():
+    # An island whose ring is a single closed arc next to a large region
+    topology = {
+        "type": "Topology",
+        "objects": {
+            "regions": {
+                "type": "GeometryCollection",
+                "geometries": [
+                    {"type": "Polygon", "arcs": [[0]]},
+                    {"type": "Polygon", "arcs": [[1]]},
+                ],
+            }
+        },
+        "arcs": [
+            [[0, 0], [1000, 0], [1000, 1000], [0, 1000], [0, 0]],
+            circle(500, 500, 2, n=100),
+        ],
+    }
+    result = dvc.simplify_geo(topology, 100, precision=10)
+    ring = decode(result["arcs"][1], result["transform"])
+    assert len(ring) == 4
+    assert ring[0].tolist() == ring[-1].tolist()
+    assert len(np.unique(ring, axis=0)) == 3
+
+
+def test_geo_levels(topology, geojson):
+    levels = dvc.geo_levels(topology, sizes=(500, 100), feature="regions")
+    assert levels["signal"] == "width"
+    assert [level["size"] for level in levels["levels"]] == [100, 500]
+    assert levels["levels"][0]["format"] == {"type": "topojson", "feature": "regions"}
+
+    levels = dvc.geo_levels(geojson, sizes=(100,), signal="scale", factor=2)
+    assert levels["factor"] == 2
+    assert levels["levels"][0]["format"] == {"type": "json", "property": "features"}
+
+    with pytest.raises(ValueError, match="feature"):
+        dvc.geo_levels(topology)
+
+
+def test_geo_levels_with_store(geojson):
+    store = dvc.DatasetStore()
+    levels = dvc.geo_levels(geojson, sizes=(100, 200), store=store)
+    assert all(level["url"].startswith(store.route) for level in levels["levels"])
+    assert "values" not in levels["levels"][0]
+
+
+def test_geo_levels_property(geojson):
+    levels = dvc.geo_levels(geojson, sizes=(100,))
+    component = dvc.Vega(id="map", geoLevels={"regions": levels})
+    assert component.geoLevels["regions"]["levels"][0]["size"] == 100
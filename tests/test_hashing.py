@@ -0,0 +1,17 @@
+import altair as alt
+import pandas as pd
+
+import dash_vega_components as dvc
+
+
+def test_spec_hash():
+    spec = {"mark": "point", "data": {"values": [{"a": 1}]}}
+    same_spec = {"mark": "point", "data": {"values": [{"a": 1}]}}
+    other_spec = {"mark": "bar", "data": {"values": [{"a": 1}]}}
+    assert dvc.spec_hash(spec) == dvc.spec_hash(same_spec)
+    assert dvc.spec_hash(spec) != dvc.spec_hash(other_spec)
+
+
+def test_spec_hash_of_chart():
+    chart = alt.Chart(pd.DataFrame({"a": [1, 2]})).mark_point().encode(x="a:Q")
+    assert dvc.spec_hash(chart) == dvc.spec_hash(chart.to_dict())
@@ -0,0 +1,107 @@
+import json
+
+from dash import Dash, Input, Output, html
+
+import dash_vega_components as dvc
+
+# Bar chart of the named dataset "table" with a signal which is reported
+# through signalData
+SPEC = {
+    "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+    "data": {"name": "table"},
+    "params": [{"name": "threshold", "value": 5}],
+    "mark": "bar",
+    "encoding": {
+        "x": {"field": "a", "type": "nominal"},
+        "y": {"field": "b", "type": "quantitative"},
+    },
+}
+
+BARS = "#chart .mark-rect path"
+
+
+def rows(*names):
+    return [{"a": name, "b": i + 1} for i, name in enumerate(names)]
+
+
+def wait_for_bars(dash_duo, count):
+    # Requires selenium which is installed with dash[testing]
+    from dash.testing.wait import until
+
+    until(lambda: len(dash_duo.find_elements(BARS)) == count, timeout=10)
+
+
+def make_app():
+    app = Dash(__name__)
+    app.layout = html.Div(
+        [
+            dvc.Vega(
+                id="chart",
+                spec=SPEC,
+                opt={"renderer": "svg", "actions": False},
+                data={"table": rows("A", "B")},
+                signalsToObserve=["threshold"],
+            ),
+            html.Button("patch", id="patch"),
+            html.Button("append", id="append"),
+            html.Button("signal", id="signal"),
+            html.Div(id="signals"),
+        ]
+    )
+
+    @app.callback(
+        Output("chart", "data"),
+        Output("chart", "dataPatch"),
+        Input("patch", "n_clicks"),
+        prevent_initial_call=True,
+    )
+    def replace_and_patch(_):
+        # Both changes arrive in the same batch and have to be applied in order
+        return {"table": rows("C", "D", "E")}, {
+            "table": {"remove": ["C"], "insert": rows("F"), "key": "a"}
+        }
+
+    @app.callback(
+        Output("chart", "appendData"),
+        Input("append", "n_clicks"),
+        prevent_initial_call=True,
+    )
+    def append(n_clicks):
+        names = [f"N{n_clicks}-{i}" for i in range(4)]
+        return {"table": {"rows": rows(*names), "maxRows": 3}}
+
+    @app.callback(
+        Output("chart", "signalValues"),
+        Input("signal", "n_clicks"),
+        prevent_initial_call=True,
+    )
+    def set_signal(_):
+        return {"threshold": 7}
+
+    @app.callback(Output("signals", "children"), Input("chart", "signalData"))
+    def show_signals(signal_data):
+        return json.dumps((signal_data or {}).get("threshold"))
+
+    return app
+
+
+def test_data_properties(dash_duo):
+    dash_duo.start_server(make_app())
+    wait_for_bars(dash_duo, 2)
+
+    dash_duo.find_element("#patch").click()
+    wait_for_bars(dash_duo, 3)
+
+    # Only the latest rows are kept
+    dash_duo.find_element("#append").click()
+    wait_for_bars(dash_duo, 3)
+
+    assert dash_duo.get_logs() == []
+
+
+def test_signal_data(dash_duo):
+    dash_duo.start_server(make_app())
+    dash_duo.wait_for_text_to_equal("#signals", "5")
+
+    dash_duo.find_element("#signal").click()
+    dash_duo.wait_for_text_to_equal("#signals", "7")
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+import pytest
+from plotly.io.json import to_json_plotly
+
+import dash_vega_components as dvc
+
+
+@pytest.fixture
+def series():
+    n = 100_000
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "time": pd.date_range("2020-01-01", periods=n, freq="s"),
+            "value": np.cumsum(rng.normal(size=n)),
+        }
+    )
+
+
+@pytest.fixture
+def scatter():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"x": rng.normal(size=50_000), "y": rng.normal(size=50_000)})
+
+
+def test_lttb_keeps_the_ends_and_the_peaks():
+    x = np.arange(1000)
+    y = np.zeros(1000)
+    y[500] = 10
+
+    selected = dvc.lttb(x, y, 20)
+
+    assert len(selected) == 20
+    assert selected[0] == 0 and selected[-1] == 999
+    assert 500 in selected
+    assert (np.diff(selected) > 0).all()
+
+
+def test_lttb_returns_all_points_of_short_series():
+    assert dvc.lttb([1, 2, 3], [1, 2, 3], 10).tolist() == [0, 1, 2]
+
+
+def test_series_is_reduced_to_the_width(series):
+    lod = dvc.LevelOfDetail(series, x="time", y="value", width=500)
+
+    points = lod.data()["lod"]
+
+    assert len(points) == 500
+    assert points[0]["time"] == series["time"].iloc[0].tz_localize("UTC")
+    assert points[-1]["time"] == series["time"].iloc[-1].tz_localize("UTC")
+    # The shape of the series is kept
+    values = pd.Series([p["value"] for p in points])
+    span = series["value"].max() - series["value"].min()
+    assert values.max() - values.min() > 0.95 * span
+
+
+def test_zooming_in_returns_raw_points(series):
+    lod = dvc.LevelOfDetail(series, x="time", y="value", param="zoom", margin=0)
+    signal_data = {
+        "zoom": {"time": ["2020-01-01T00:00:00.000Z", "2020-01-01T00:01:39.000Z"]},
+        "width": 800,
+    }
+
+    points = lod.data(signal_data)["lod"]
+
+    # The 100 visible seconds plus the neighbors on the right
+    assert len(points) == 101
+    assert points[0]["time"] == series["time"].iloc[0].tz_localize("UTC")
+
+
+def test_zoom_domain_accepts_epoch_milliseconds(series):
+    lod = dvc.LevelOfDetail(series, x="time", y="value", param="zoom", margin=0)
+    start = pd.Timestamp("2020-01-01T06:00:00").value / 1e6
+    points = lod.data({"zoom": {"time": [start, start + 3_600_000]}})["lod"]
+
+    times = pd.Series([p["time"] for p in points])
+    assert times.min() >= pd.Timestamp("2020-01-01T05:59:59Z")
+    assert times.max() <= pd.Timestamp("2020-01-01T07:00:01Z")
+    assert len(points) == 800
+
+
+def test_naive_timestamps_are_sent_as_utc():
+    # The chart has to read the timestamps in the same time zone as the zoom
+    # domains which it reports
+    frame = pd.DataFrame(
+        {
+            "time": pd.date_range("2020-06-01", periods=24 * 60, freq="min"),
+            "value": np.arange(24 * 60, dtype=float),
+        }
+    )
+    lod = dvc.LevelOfDetail(frame, x="time", y="value", param="zoom", margin=0)
+    signal_data = {"zoom": {"time": ["2020-06-01T10:00:00.000Z", "2020-06-01T11:00:00.000Z"]}}
+
+    points = lod.data(signal_data)["lod"]
+    encoded = to_json_plotly(points)
+
+    # The visible hour plus the neighbors on both sides
+    assert points[0]["time"] == pd.Timestamp("2020-06-01T09:59:00Z")
+    assert points[-1]["time"] == pd.Timestamp("2020-06-01T11:01:00Z")
+    assert '"2020-06-01T10:00:00+00:00"' in encoded
+    # The data of the DataFrame is not changed
+    assert frame["time"].dt.tz is None
+
+
+def test_grid_keeps_one_point_per_cell_with_counts(scatter):
+    lod = dvc.LevelOfDetail(
+        scatter, x="x", y="y", method="grid", width=200, height=200, cell_size=10
+    )
+
+    points = lod.points()
+
+    assert len(points) <= 20 * 20
+    assert points["count"].sum() == len(scatter)
+
+
+def test_grid_zoom_counts_only_visible_points(scatter):
+    lod = dvc.LevelOfDetail(
+        scatter, x="x", y="y", method="grid", param="zoom", margin=0, cell_size=10
+    )
+
+    points = lod.data({"zoom": {"x": [0, 1], "y": [0, 1]}})["lod"]
+
+    visible = scatter[scatter.x.between(0, 1) & scatter.y.between(0, 1)]
+    assert sum(p["count"] for p in points) == len(visible)
+    assert all(0 <= p["x"] <= 1 and 0 <= p["y"] <= 1 for p in points)
+
+
+def test_results_are_cached(series):
+    lod = dvc.LevelOfDetail(series, x="time", y="value")
+    assert lod.data()["lod"] is lod.data()["lod"]
+
+
+def test_missing_values_are_dropped():
+    df = pd.DataFrame({"x": [3.0, 1.0, np.nan, 2.0], "y": [1.0, 2.0, 3.0, None]})
+    lod = dvc.LevelOfDetail(df, x="x", y="y")
+    assert lod.points()["x"].tolist() == [1.0, 3.0]
+
+
+def test_invalid_method():
+    with pytest.raises(ValueError, match="method"):
+        dvc.LevelOfDetail(pd.DataFrame({"x": [], "y": []}), x="x", y="y", method="m4")
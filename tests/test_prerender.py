@@ -0,0 +1,46 @@
+import base64
+
+import altair as alt
+import pandas as pd
+import pytest
+
+import dash_vega_components as dvc
+
+
+@pytest.fixture
+def chart():
+    source = pd.DataFrame({"a": ["A", "B", "C"], "b": [28, 55, 43]})
+    return alt.Chart(source).mark_bar().encode(x="a", y="b")
+
+
+def test_unknown_format(chart):
+    with pytest.raises(ValueError, match="format"):
+        dvc.prerender(chart, format="jpeg")
+
+
+def test_prerender_svg(chart):
+    pytest.importorskip("vl_convert")
+    url = dvc.prerender(chart)
+    prefix = "data:image/svg+xml;base64,"
+    assert url.startswith(prefix)
+    assert base64.b64decode(url[len(prefix) :]).startswith(b"<svg")
+    assert dvc.prerender(chart) == url
+
+
+def test_prerender_png(chart):
+    pytest.importorskip("vl_convert")
+    url = dvc.prerender(chart, format="png")
+    prefix = "data:image/png;base64,"
+    assert url.startswith(prefix)
+    assert base64.b64decode(url[len(prefix) :])[:4] == b"\x89PNG"
+
+
+def test_prerender_vega_spec(chart):
+    pytest.importorskip("vl_convert")
+    url = dvc.prerender(dvc.compile_spec(chart))
+    assert url.startswith("data:image/svg+xml;base64,")
+
+
+def test_prerendered_property():
+    component = dvc.Vega(id="chart", prerendered="data:image/png;base64,")
+    assert component.prerendered == "data:image/png;base64,"
@@ -0,0 +1,158 @@
+import altair as alt
+import numpy as np
+import pandas as pd
+import pytest
+
+import dash_vega_components as dvc
+
+
+@pytest.fixture
+def source():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Horsepower": rng.uniform(46, 230, 500),
+            "Origin": rng.choice(["USA", "Europe", "Japan"], 500),
+            "Year": pd.date_range("2000-01-01", periods=500, freq="W"),
+        }
+    )
+
+
+def test_bin_and_count_are_computed_on_the_server(source):
+    chart = (
+        alt.Chart(source)
+        .mark_bar()
+        .encode(alt.X("Horsepower", bin=True), y="count()")
+    )
+    pushdown = dvc.TransformPushdown(chart)
+    spec = pushdown.spec
+
+    assert spec["data"] == {"name": "pushdown"}
+    assert spec["encoding"]["x"]["bin"] == "binned"
+    assert spec["encoding"]["x2"] == {"field": "bin_maxbins_10_Horsepower_end"}
+    assert spec["encoding"]["y"]["title"] == "Count of Records"
+
+    result = pushdown.evaluate().sort_values("bin_maxbins_10_Horsepower")
+    # Same bins as Vega: extent [46, 230] with 10 bins leads to a step of 20
+    assert result["bin_maxbins_10_Horsepower"].tolist() == list(range(40, 240, 20))
+    expected = ((source["Horsepower"] // 20) * 20).value_counts().sort_index()
+    assert result["__count"].tolist() == expected.tolist()
+    assert len(spec["datasets"]["pushdown"]) == 10
+
+
+def test_filter_depending_on_param(source):
+    threshold = alt.param(name="threshold", value=100)
+    chart = (
+        alt.Chart(source)
+        .mark_bar()
+        .encode(x="Origin", y="mean(Horsepower)")
+        .add_params(threshold)
+        .transform_filter(alt.datum.Horsepower > threshold)
+    )
+    pushdown = dvc.TransformPushdown(chart)
+    assert pushdown.params == ["threshold"]
+    assert "transform" not in pushdown.spec
+
+    def expected(value):
+        filtered = source[source["Horsepower"] > value]
+        return filtered.groupby("Origin")["Horsepower"].mean().to_dict()
+
+    result = pushdown.evaluate().set_index("Origin")["mean_Horsepower"]
+    assert result.to_dict() == pytest.approx(expected(100))
+    records = pushdown.data({"threshold": 200})["pushdown"]
+    assert {r["Origin"]: r["mean_Horsepower"] for r in records} == pytest.approx(
+        expected(200)
+    )
+
+
+def test_unsupported_transforms_stay_in_the_spec(source):
+    chart = (
+        alt.Chart(source)
+        .mark_point()
+        .encode(x="Horsepower", y="count()")
+        .transform_filter(alt.FieldOneOfPredicate(field="Origin", oneOf=["USA"]))
+        .transform_calculate(double="2 * datum.Horsepower")
+    )
+    pushdown = dvc.TransformPushdown(chart)
+    assert pushdown.n_transforms == 1
+    assert pushdown.spec["transform"] == [
+        {"calculate": "2 * datum.Horsepower", "as": "double"}
+    ]
+    # The encoding is not aggregated as it depends on the remaining transforms
+    assert pushdown.spec["encoding"]["y"]["aggregate"] == "count"
+    assert (pushdown.evaluate()["Origin"] == "USA").all()
+
+
+def test_time_unit_and_predicates(source):
+    spec = {
+        "data": {"values": source.assign(Year=source["Year"].astype(str)).to_dict("records")},
+        "mark": "line",
+        "transform": [
+            {"filter": {"field": "Horsepower", "range": [100, None]}},
+            {"timeUnit": "year", "field": "Year", "as": "year"},
+            {
+                "aggregate": [{"op": "max", "field": "Horsepower", "as": "max_hp"}],
+                "groupby": ["year"],
+            },
+            {"filter": "datum.max_hp >= 150 && !(datum.year == null)"},
+        ],
+        "encoding": {
+            "x": {"field": "year", "type": "temporal"},
+            "y": {"field": "max_hp", "type": "quantitative"},
+        },
+    }
+    pushdown = dvc.TransformPushdown(spec)
+    assert pushdown.n_transforms == 4
+    assert pushdown.params == []
+    result = pushdown.evaluate()
+
+    filtered = source[source["Horsepower"] >= 100]
+    expected = filtered.groupby(filtered["Year"].dt.year)["Horsepower"].max()
+    assert result["year"].dt.year.tolist() == expected.index.tolist()
+    assert (result["year"].dt.month == 1).all()
+    assert result["max_hp"].tolist() == expected.tolist()
+
+
+def test_selection_filter(source):
+    spec = {
+        "data": {"values": source.drop(columns="Year").to_dict("records")},
+        "params": [{"name": "origin", "select": {"type": "point", "fields": ["Origin"]}}],
+        "transform": [
+            {"filter": {"param": "origin"}},
+            {"joinaggregate": [{"op": "count", "as": "n"}], "groupby": ["Origin"]},
+        ],
+        "mark": "point",
+        "encoding": {"x": {"field": "Horsepower", "type": "quantitative"}},
+    }
+    pushdown = dvc.TransformPushdown(spec)
+    assert pushdown.params == ["origin"]
+    assert len(pushdown.evaluate()) == len(source)
+    result = pushdown.evaluate({"origin": {"Origin": ["Japan"]}})
+    assert set(result["Origin"]) == {"Japan"}
+    assert (result["n"] == (source["Origin"] == "Japan").sum()).all()
+
+
+def test_non_ascii_string_literals():
+    source = pd.DataFrame({"city": ["Zürich", "Genève", "Bern"], "v": [1, 2, 3]})
+    spec = {
+        "data": {"values": source.to_dict("records")},
+        "mark": "bar",
+        "transform": [{"filter": "datum.city == 'Z\\u00fcrich' || datum['city'] == 'Genève'"}],
+        "encoding": {"x": {"field": "city", "type": "nominal"}},
+    }
+    pushdown = dvc.TransformPushdown(spec)
+    assert pushdown.n_transforms == 1
+    assert pushdown.evaluate()["city"].tolist() == ["Zürich", "Genève"]
+
+
+def test_argmax_encoding_stays_in_the_spec(source):
+    spec = {
+        "data": {"values": source.drop(columns="Year").to_dict("records")},
+        "mark": "point",
+        "encoding": {
+            "x": {"field": "Origin", "type": "nominal"},
+            "y": {"aggregate": {"argmax": "Horsepower"}, "field": "Horsepower"},
+        },
+    }
+    pushdown = dvc.TransformPushdown(spec)
+    assert pushdown.spec["encoding"]["y"]["aggregate"] == {"argmax": "Horsepower"}
@@ -0,0 +1,120 @@
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dash_vega_components as dvc
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {
+            "x": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "y": [10, 20, 30, 40, 50],
+            "origin": pd.Categorical(["USA", "Europe", "USA", "Japan", "Europe"]),
+            "date": pd.date_range("2020-01-01", periods=5, freq="D"),
+        }
+    )
+
+
+SPEC = {
+    "hconcat": [
+        {"params": [{"name": "brush", "select": "interval"}], "mark": "point"},
+        {
+            "params": [{"name": "click", "select": {"type": "point", "fields": ["origin"]}}],
+            "mark": "bar",
+        },
+    ]
+}
+
+
+def test_selection_types():
+    assert dvc.selection_types(SPEC) == {"brush": "interval", "click": "point"}
+
+
+def test_interval_selection(df):
+    signal_data = {"brush": {"x": [1.5, 4.0], "y": [0, 35]}, "other": 3}
+    result = dvc.filter_selection(df, signal_data, spec=SPEC)
+    assert result["x"].tolist() == [2.0, 3.0]
+
+
+def test_interval_selection_temporal(df):
+    start = pd.Timestamp("2020-01-02").value // 10**6
+    end = pd.Timestamp("2020-01-03").value // 10**6
+    result = dvc.filter_selection(
+        df, {"brush": {"date": [end, start]}}, selections=["brush"]
+    )
+    assert result["y"].tolist() == [20, 30]
+
+
+def test_point_selections(df):
+    result = dvc.filter_selection(
+        df, {"click": {"origin": ["Europe"], "vlPoint": {"or": [{"origin": "Europe"}]}}}, spec=SPEC
+    )
+    assert result["x"].tolist() == [2.0, 5.0]
+
+    # Multiple fields
+    result = dvc.filter_selection(
+        df, {"click": {"origin": ["USA", "Japan"], "y": [30, 30]}}, selections=["click"]
+    )
+    assert result["x"].tolist() == [3.0]
+
+    # Points without fields are identified by their position
+    with pytest.warns(UserWarning, match="_vgsid_"):
+        result = dvc.filter_selection(
+            df, {"click": {"_vgsid_": [1, 4], "vlPoint": {"or": [{"_vgsid_": 1}]}}}
+        )
+    assert result["x"].tolist() == [1.0, 4.0]
+
+
+def test_empty_selection(df):
+    assert len(dvc.filter_selection(df, {"brush": {}}, spec=SPEC)) == 5
+    assert len(dvc.filter_selection(df, {"brush": {}}, spec=SPEC, empty="none")) == 0
+    assert len(dvc.filter_selection(df, {}, spec=SPEC)) == 5
+
+
+def test_selection_index(df):
+    index = dvc.SelectionIndex(df)
+    signal_data = {
+        "brush": {"x": [1.5, 5.0]},
+        "click": {"origin": ["Europe", "Japan"]},
+    }
+    expected = dvc.filter_selection(df, signal_data, spec=SPEC)
+    result = dvc.filter_selection(df, signal_data, spec=SPEC, index=index)
+    assert result["x"].tolist() == expected["x"].tolist() == [2.0, 4.0, 5.0]
+
+
+def test_selection_index_large():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"x": rng.normal(size=10_000), "c": rng.choice(list("abc"), 10_000)})
+    index = dvc.SelectionIndex(df)
+    signal_data = {"brush": {"x": [-0.5, 0.25]}, "click": {"c": ["a", "c"]}}
+    selections = {"brush": "interval", "click": "point"}
+    np.testing.assert_array_equal(
+        dvc.selection_mask(df, signal_data, selections=selections, index=index),
+        dvc.selection_mask(df, signal_data, selections=selections),
+    )
+
+
+def test_pyarrow_table(df):
+    pa = pytest.importorskip("pyarrow")
+    table = pa.Table.from_pandas(df)
+    result = dvc.filter_selection(table, {"brush": {"x": [1.5, 4.0]}}, spec=SPEC)
+    assert result.column("x").to_pylist() == [2.0, 3.0, 4.0]
+
+
+def test_import_without_numpy_and_pandas():
+    # The helpers import numpy and pandas only once they are used
+    code = (
+        "import sys\n"
+        "class Blocker:\n"
+        "    def find_spec(self, name, path=None, target=None):\n"
+        "        if name.split('.')[0] in ('numpy', 'pandas'):\n"
+        "            raise ImportError(name)\n"
+        "sys.meta_path.insert(0, Blocker())\n"
+        "import dash_vega_components\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
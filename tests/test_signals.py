@@ -0,0 +1,70 @@
+import dash_vega_components as dvc
+
+
+def test_signal_state_merges_deltas():
+    state = dvc.SignalState()
+    signals = state.update(
+        "session-1", {"seq": 1, "reset": True, "signals": {"a": 1, "b": 2}}
+    )
+    assert signals == {"a": 1, "b": 2}
+    assert state.update("session-1", {"seq": 2, "signals": {"b": 3}}) == {
+        "a": 1,
+        "b": 3,
+    }
+    # Other sessions are independent
+    assert state.get("session-2") == {}
+    assert state.update("session-2", None) == {}
+
+
+def test_signal_state_ignores_old_updates():
+    state = dvc.SignalState()
+    state.update("s", {"id": "a", "seq": 1, "reset": True, "signals": {"a": 1}})
+    state.update("s", {"id": "a", "seq": 2, "signals": {"a": 2}})
+    assert state.update("s", {"id": "a", "seq": 2, "signals": {"a": 5}}) == {"a": 2}
+    # Late resets are dropped as well
+    assert state.update(
+        "s", {"id": "a", "seq": 1, "reset": True, "signals": {"a": 1}}
+    ) == {"a": 2}
+
+
+def test_signal_state_waits_for_resync_after_gap():
+    state = dvc.SignalState()
+    state.update("s", {"id": "a", "seq": 1, "reset": True, "signals": {"a": 1}})
+    assert state.update("s", {"id": "a", "seq": 3, "signals": {"b": 3}}) == {"a": 1}
+    assert state.needs_resync("s")
+    assert state.update("s", {"id": "a", "seq": 4, "signals": {"b": 4}}) == {"a": 1}
+    assert state.update(
+        "s", {"id": "a", "seq": 5, "reset": True, "signals": {"a": 2, "b": 4}}
+    ) == {"a": 2, "b": 4}
+    assert not state.needs_resync("s")
+
+
+def test_signal_state_compares_seq_per_component():
+    state = dvc.SignalState()
+    state.update("s", {"id": "a", "seq": 5, "reset": True, "signals": {"a": 1}})
+    # A new component, e.g. after a page reload, starts with a reset
+    assert state.update(
+        "s", {"id": "b", "seq": 1, "reset": True, "signals": {"a": 2}}
+    ) == {"a": 2}
+    # Late updates of the replaced component are dropped
+    assert state.update("s", {"id": "a", "seq": 6, "signals": {"a": 3}}) == {"a": 2}
+    assert state.update(
+        "s", {"id": "a", "seq": 7, "reset": True, "signals": {"a": 3}}
+    ) == {"a": 2}
+    # Without a reset, the state of an unknown component can't be merged
+    assert state.update("s", {"id": "c", "seq": 2, "signals": {"b": 1}}) == {"a": 2}
+
+
+def test_signal_state_reset():
+    state = dvc.SignalState()
+    state.update("s", {"seq": 1, "reset": True, "signals": {"a": 1}})
+    state.update("s", {"seq": 2, "signals": {"b": 1}})
+    assert state.update("s", {"seq": 3, "reset": True, "signals": {"c": 1}}) == {
+        "c": 1
+    }
+
+
+def test_signal_state_disk_backend(tmp_path):
+    delta = {"seq": 1, "reset": True, "signals": {"a": 1}}
+    dvc.SignalState(backend=dvc.DiskBackend(tmp_path)).update("s", delta)
+    assert dvc.SignalState(backend=dvc.DiskBackend(tmp_path)).get("s") == {"a": 1}
@@ -0,0 +1,36 @@
+import dash_vega_components as dvc
+
+STATS = {
+    "seq": 3,
+    "event": "embed",
+    "timestamp": 1700000000000,
+    "renderer": "canvas",
+    "timings": {"compile": 12.5, "parse": 3.1, "total": 40.2},
+    "rows": {"data_0": 1000},
+    "bytes": {"spec": 52000},
+    "signals": {"events": 10, "reports": 2, "eventsPerSecond": 1.5},
+}
+
+
+def test_render_stats_metrics():
+    metrics = dvc.render_stats_metrics(STATS, prefix="app")
+    assert metrics["app.embed.timings.compile"] == 12.5
+    assert metrics["app.embed.rows.data_0"] == 1000
+    assert metrics["app.embed.bytes.spec"] == 52000
+    assert metrics["app.embed.signals.eventsPerSecond"] == 1.5
+    # Only the measurements are included
+    assert not any("seq" in name or "timestamp" in name for name in metrics)
+    assert dvc.render_stats_metrics(None) == {}
+
+
+def test_forward_render_stats():
+    received = []
+    forward = dvc.forward_render_stats("stats-chart", received.append)
+    forward(STATS)
+    forward(None)
+    assert received == [STATS]
+
+    flattened = []
+    forward = dvc.forward_render_stats("stats-chart-2", flattened.append, flatten=True)
+    forward(STATS)
+    assert flattened[0]["dvc.embed.timings.total"] == 40.2
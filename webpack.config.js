@@ -5,6 +5,10 @@ const packagejson = require('./package.json');
 
 const dashLibraryName = packagejson.name.replace(/-/g, '_');
 
+// The Web Worker used by the renderInWorker property has its own runtime
+// and therefore has to contain all of its modules
+const isWorkerChunk = (chunk) => chunk.name === 'async-VegaWorker';
+
 module.exports = (env, argv) => {
 
     let mode;
@@ -60,6 +64,15 @@ module.exports = (env, argv) => {
             }
         },
         externals,
+        resolve: {
+            alias: {
+                // vega-embed imports the Vega-Lite compiler which is large. Charts are
+                // compiled before they are embedded (src/lib/utils/compile.js) which
+                // loads the compiler as a separate chunk under another name.
+                'vega-lite$': path.resolve(__dirname, 'src/lib/utils/vega-lite-stub.js'),
+                'vega-lite-compiler$': require.resolve('vega-lite'),
+            },
+        },
         module: {
             rules: [
                 {
@@ -87,14 +100,14 @@ module.exports = (env, argv) => {
                 name: '[name].js',
                 cacheGroups: {
                     async: {
-                        chunks: 'async',
+                        chunks: (chunk) => !chunk.canBeInitial() && !isWorkerChunk(chunk),
                         minSize: 0,
                         name(module, chunks, cacheGroupKey) {
                             return `${cacheGroupKey}-${chunks[0].name}`;
                         }
                     },
                     shared: {
-                        chunks: 'all',
+                        chunks: (chunk) => !isWorkerChunk(chunk),
                         minSize: 0,
                         minChunks: 2,
                         name: 'dash_vega_components-shared'